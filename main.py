@@ -1,14 +1,53 @@
 import os
 import argparse
 from datetime import datetime
-from src.dependencies import install_dependencies
 from src.url_utils import extract_username_from_url, validate_username
 
+def parse_person_data(person, person_output_dir, typed=False):
+    """
+    Parse the downloaded profile, stats and portfolio pages of a user into JSON and Markdown.
+
+    JSON API responses captured during the download ({page}.api.json) are
+    used first; the HTML pages are parsed when there are none or they hold
+    no usable data.
+
+    Args:
+        person: eToro username
+        person_output_dir: Folder holding the downloaded HTML pages
+        typed: Write numeric values as ``{'raw', 'value', 'unit'}`` (see src/normalize.py)
+    """
+    from src.pipeline import extract_person_data, save_caches, write_person_data
+
+    write_person_data(person, person_output_dir, extract_person_data(person, person_output_dir, typed=typed))
+    save_caches()
+
+
 def main():
     parser = argparse.ArgumentParser(description='EtoroHelper - Extract and parse eToro data')
     parser.add_argument('--user', type=str, help='eToro username directly (e.g., scherenhaenden)')
     parser.add_argument('--user-url', type=str, help='eToro user profile URL (e.g., https://www.etoro.com/people/username)')
     parser.add_argument('--base-dir', type=str, help='Base directory for input/output (default: current date)')
+    parser.add_argument('--users-file', type=str, help='Text file with one eToro username or profile URL per line (batch mode)')
+    parser.add_argument('--workers', type=int, default=2, help='Number of browsers used in parallel in batch mode (default: 2)')
+    parser.add_argument('--parallel-tabs', action='store_true', help='Load all pages of a user concurrently in separate browser tabs')
+    parser.add_argument('--capture-network', action='store_true', help="Also record the pages' JSON API responses and parse those first")
+    parser.add_argument('--http-first', action='store_true', help='Try each page over plain HTTP first and only start a browser when that is not enough')
+    parser.add_argument('--recycle-after', type=int, default=50, help='Pages a browser may load before it is restarted in batch mode (default: 50)')
+    parser.add_argument('--pages', type=str, default='all', help="Comma-separated pages to download: profile, stats, portfolio, chart or 'all' (default: all)")
+    parser.add_argument('--ttl', action='append', metavar='PAGE=DURATION', help="Reuse snapshots younger than this, e.g. profile=30m or all=2h (repeatable; defaults: profile/stats 1h, portfolio/chart 1d)")
+    parser.add_argument('--refresh-all', action='store_true', help='Ignore existing snapshots and download every selected page')
+    parser.add_argument('--snapshot-store', action='store_true', help='Save pages compressed and deduplicated in downloads/.snapshots instead of plain HTML files')
+    parser.add_argument('--block-resources', nargs='?', const='default', metavar='CATEGORIES', help="Don't load images, fonts, media and trackers; optionally pick categories, e.g. images,trackers")
+    parser.add_argument('--slim-html', action='store_true', help='Save pages without scripts, styles, SVG and other markup the parsers ignore')
+    parser.add_argument('--rate', type=float, default=2.0, help='Initial page requests per second in batch mode; adapts automatically, 0 disables pacing (default: 2)')
+    parser.add_argument('--max-retries', type=int, default=2, help='Retries per failed page in batch mode (default: 2)')
+    parser.add_argument('--parse-workers', type=int, help='Parse processes used alongside the downloads in batch mode, or by --reparse (default: CPU count)')
+    parser.add_argument('--html-backend', choices=['auto', 'lxml', 'html.parser'], default='auto', help="HTML parser used by the extractors: auto (fastest installed), lxml or html.parser (default: auto)")
+    parser.add_argument('--typed-values', action='store_true', help="Write numbers in the JSON outputs as {'raw', 'value', 'unit'} objects instead of plain values")
+    parser.add_argument('--no-parse-cache', action='store_true', help='Parse every page again instead of reusing cached results for unchanged pages')
+    parser.add_argument('--reparse', nargs='?', const='downloads', metavar='DOWNLOADS_ROOT', help="Re-run the parsers over every downloaded {user}/{date} folder (default root: downloads); limited to --user/--users-file when given")
+    parser.add_argument('--daemon', action='store_true', help='Run as a daemon that keeps browsers warm for later runs')
+    parser.add_argument('--no-daemon', action='store_true', help='Do not hand downloads to a running daemon')
 
     args = parser.parse_args()
 
@@ -39,15 +78,68 @@ def main():
             print(f"Error parsing URL: {e}")
             return
 
-    # Install all dependencies first
-    install_dependencies()
-
-    # Import modules after dependencies are confirmed
-    from src.parser import extract_portfolio_data, generate_json, generate_markdown
-    from src.downloader import download_person_data
-    from src.performance_parser import extract_performance_data as extract_person_performance
-    from src.performance_parser import generate_performance_json, generate_performance_markdown
-    from src.stats_parser import extract_stats_data, generate_stats_json, generate_stats_markdown
+    from src.refresh import parse_pages, parse_ttls
+    from src.resource_policy import parse_block_option
+    try:
+        pages = parse_pages(args.pages)
+        ttls = None if args.refresh_all else parse_ttls(args.ttl)
+        block_resources = parse_block_option(args.block_resources) if args.block_resources else None
+    except ValueError as e:
+        print(f"Error: {e}")
+        return
+
+    # Batch mode: many users from a file
+    usernames = None
+    if args.users_file:
+        from src.batch import load_usernames
+        try:
+            usernames = load_usernames(args.users_file)
+        except OSError as e:
+            print(f"Error reading users file: {e}")
+            return
+        print(f"Loaded {len(usernames)} username(s) from {args.users_file}")
+
+    if args.html_backend != 'auto':
+        # Picked up by the extractors, also in parse worker processes.
+        os.environ['ETOROHELPER_HTML_BACKEND'] = args.html_backend
+
+    if args.no_parse_cache:
+        # Read by the extraction code, also in parse worker processes.
+        os.environ['ETOROHELPER_PARSE_CACHE'] = 'off'
+
+    if args.reparse:
+        # Parsing only: no browser or other download dependencies needed.
+        from src.dependencies import PARSE_PACKAGES, install_dependencies
+        install_dependencies(PARSE_PACKAGES)
+        from src.reparse import reparse_downloads
+        users = usernames if usernames is not None else ([username] if username else None)
+        reparse_downloads(args.reparse, workers=args.parse_workers, users=users, typed=args.typed_values)
+        return
+
+    # Imported here so parse-only and daemon-client runs don't pay for it at startup.
+    from src.dependencies import install_dependencies
+
+    if args.daemon:
+        install_dependencies()
+        from src.daemon import BrowserDaemon
+        BrowserDaemon(downloads_root='downloads', workers=args.workers, max_pages_per_driver=args.recycle_after,
+                      capture_network=args.capture_network).serve_forever()
+        return
+
+    # A running daemon already has a verified environment and warm browsers.
+    daemon = None
+    if usernames is None and not args.no_daemon:
+        from src.daemon import find_daemon
+        daemon = find_daemon()
+        if daemon is not None:
+            print("Using running EtoroHelper daemon for downloads.")
+
+    # Install all dependencies first; with a daemon, only what parsing needs
+    if daemon is None:
+        install_dependencies()
+    else:
+        from src.dependencies import PARSE_PACKAGES
+        install_dependencies(PARSE_PACKAGES)
 
     # Base directory for the current run
     # base_dir = "2025-12-15"
@@ -64,18 +156,36 @@ def main():
                 break
 
         if input_file:
-            with open(input_file, 'r', encoding='utf-8') as f:
-                html_content = f.read()
+            from src.normalize import raw_values
+            from src.parse_cache import get_parse_cache
+            from src.parser import generate_json, generate_markdown
+            from src.portfolio_stream import iter_portfolio_rows
 
-            portfolio = extract_portfolio_data(html_content)
+            cache = get_parse_cache()
+            read_rows = lambda: list(iter_portfolio_rows(input_file, typed=args.typed_values))
+            extractor = 'portfolio.html.typed' if args.typed_values else 'portfolio.html'
+            portfolio = cache.cached(cache.file_digest(input_file), extractor, read_rows) if cache else read_rows()
 
             os.makedirs(output_dir, exist_ok=True)
             generate_json(portfolio, os.path.join(output_dir, 'portfolio.json'))
-            generate_markdown(portfolio, os.path.join(output_dir, 'portfolio.md'))
+            generate_markdown(raw_values(portfolio), os.path.join(output_dir, 'portfolio.md'))
             print("Portfolio parsing complete. Outputs generated.")
         else:
             print("No input file found in 'input' directory for parsing.")
 
+    if usernames is not None:
+        from src.pipeline import run_pipeline
+
+        print(f"\nStarting batch download of {len(usernames)} user(s) with {args.workers} browser(s)...")
+        # Users are parsed in worker processes while the next ones download.
+        run_pipeline(usernames, downloads_root='downloads', parse_workers=args.parse_workers, typed=args.typed_values,
+                     workers=args.workers, max_pages_per_driver=args.recycle_after,
+                     parallel_tabs=args.parallel_tabs, capture_network=args.capture_network,
+                     http_first=args.http_first, pages=pages, ttls=ttls, snapshot_store=args.snapshot_store,
+                     block_resources=block_resources, rate=args.rate or None,
+                     max_attempts=args.max_retries + 1, slim_pages=args.slim_html)
+        return
+
     # --- Part 2: Download and Parse Person Data ---
     # Check if we have a username from arguments or from legacy person.txt file
     person = username
@@ -93,41 +203,24 @@ def main():
 
         print(f"\nStarting person data download for {person}...")
         print(f"Saving to: {download_dir}")
-        download_person_data(person, download_dir)
+        download_options = {'parallel_tabs': args.parallel_tabs, 'capture_network': args.capture_network,
+                            'http_first': args.http_first, 'pages': pages, 'ttls': ttls,
+                            'snapshot_store': args.snapshot_store, 'block_resources': block_resources,
+                            'slim_pages': args.slim_html}
+        if daemon is not None:
+            from src.daemon import DaemonError
+            try:
+                daemon.download(person, download_dir, **download_options)
+            except DaemonError as e:
+                print(f"Daemon download failed, downloading locally: {e}")
+                daemon = None
+                install_dependencies()
+        if daemon is None:
+            from src.downloader import download_person_data
+            download_person_data(person, download_dir, **download_options)
         print("Person data download process complete.")
 
-        person_output_dir = download_dir
-
-        # Parse Performance Data
-        profile_html_path = os.path.join(person_output_dir, 'profile.html')
-        if not os.path.exists(profile_html_path):
-            profile_html_path = os.path.join(person_output_dir, f'{person}.html') # Fallback
-
-        if os.path.exists(profile_html_path):
-            print(f"Parsing performance data for {person}...")
-            with open(profile_html_path, 'r', encoding='utf-8') as f:
-                html_content = f.read()
-
-            performance_data = extract_person_performance(html_content)
-            generate_performance_json(performance_data, os.path.join(person_output_dir, 'performance.json'))
-            generate_performance_markdown(performance_data, os.path.join(person_output_dir, 'performance.md'))
-            print(f"Performance data for {person} parsed and saved.")
-        else:
-            print(f"Could not find profile HTML for {person} to parse.")
-
-        # Parse Stats Data
-        stats_html_path = os.path.join(person_output_dir, 'stats.html')
-        if os.path.exists(stats_html_path):
-            print(f"Parsing stats data for {person}...")
-            with open(stats_html_path, 'r', encoding='utf-8') as f:
-                html_content = f.read()
-
-            stats_data = extract_stats_data(html_content)
-            generate_stats_json(stats_data, os.path.join(person_output_dir, 'stats.json'))
-            generate_stats_markdown(stats_data, os.path.join(person_output_dir, 'stats.md'))
-            print(f"Stats data for {person} parsed and saved.")
-        else:
-            print(f"Could not find stats HTML for {person} to parse.")
+        parse_person_data(person, download_dir, typed=args.typed_values)
     else:
         print("No username provided via --user, --user-url or person.txt file found.")
 
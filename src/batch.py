@@ -0,0 +1,335 @@
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+from src.url_utils import extract_username_from_url, validate_username
+
+
+def load_usernames(path):
+    """
+    Read eToro usernames from a text file, one per line.
+
+    Lines may hold a bare username or a profile URL. Blank lines and lines
+    starting with '#' are ignored, invalid entries are reported and skipped,
+    and duplicates are dropped while keeping the original order.
+
+    Args:
+        path: Path to the users file
+
+    Returns:
+        List of validated usernames
+    """
+    usernames = []
+    seen = set()
+    with open(path, 'r', encoding='utf-8') as f:
+        for line_number, line in enumerate(f, start=1):
+            entry = line.strip()
+            if not entry or entry.startswith('#'):
+                continue
+            try:
+                if '://' in entry:
+                    username = extract_username_from_url(entry)
+                else:
+                    username = validate_username(entry)
+            except ValueError as e:
+                print(f"Skipping line {line_number} in {path}: {e}")
+                continue
+            if username not in seen:
+                seen.add(username)
+                usernames.append(username)
+    return usernames
+
+
+class DriverLease:
+    """
+    A WebDriver checked out of a DriverPool.
+
+    Callers add the number of pages they loaded to ``pages`` and set
+    ``healthy`` to False when the browser should not be reused.
+    """
+
+    def __init__(self, driver, pages=0):
+        self.driver = driver
+        self.pages = pages
+        self.healthy = True
+
+
+class DriverPool:
+    """
+    Bounded pool of long-lived WebDrivers.
+
+    At most ``size`` browsers exist at once. Browsers are started lazily on
+    first use, handed out one caller at a time and quit (recycled) once they
+    have loaded ``max_pages_per_driver`` pages or were reported unhealthy.
+    ``driver_kwargs`` are passed to create_driver() for the default factory.
+    """
+
+    def __init__(self, size=2, max_pages_per_driver=50, driver_factory=None, driver_kwargs=None):
+        if size < 1:
+            raise ValueError("size must be at least 1")
+        if max_pages_per_driver < 1:
+            raise ValueError("max_pages_per_driver must be at least 1")
+        self.size = size
+        self.max_pages_per_driver = max_pages_per_driver
+        self.drivers_started = 0
+        self.drivers_recycled = 0
+        self._driver_factory = driver_factory
+        self._driver_kwargs = dict(driver_kwargs or {})
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+
+    def _get_factory(self):
+        with self._lock:
+            if self._driver_factory is None:
+                # Resolve chromedriver once for the whole pool instead of once per browser.
+                from webdriver_manager.chrome import ChromeDriverManager
+                from src.downloader import create_driver
+
+                driver_path = ChromeDriverManager().install()
+                self._driver_factory = lambda: create_driver(driver_path, **self._driver_kwargs)
+            return self._driver_factory
+
+    def acquire(self):
+        """
+        Check out a driver, starting a new browser if none is idle.
+        Blocks while all ``size`` drivers are in use.
+        """
+        self._slots.acquire()
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        try:
+            driver = self._get_factory()()
+        except Exception:
+            self._slots.release()
+            raise
+        with self._lock:
+            self.drivers_started += 1
+        return DriverLease(driver)
+
+    def warm_up(self, count=None):
+        """
+        Start browsers ahead of time so the first jobs do not pay for the launch.
+        """
+        leases = []
+        try:
+            for _ in range(min(count or self.size, self.size)):
+                leases.append(self.acquire())
+        finally:
+            for lease in leases:
+                self.release(lease)
+
+    def release(self, lease):
+        """
+        Return a driver to the pool, quitting it if it is worn out or unhealthy.
+        """
+        try:
+            if lease.healthy and lease.pages < self.max_pages_per_driver:
+                self._idle.put(lease)
+            else:
+                self._quit(lease.driver)
+                with self._lock:
+                    self.drivers_recycled += 1
+        finally:
+            self._slots.release()
+
+    @contextmanager
+    def lease(self):
+        """Context manager around acquire()/release()."""
+        lease = self.acquire()
+        try:
+            yield lease
+        except Exception:
+            lease.healthy = False
+            raise
+        finally:
+            self.release(lease)
+
+    def close(self):
+        """Quit every idle driver."""
+        while True:
+            try:
+                lease = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._quit(lease.driver)
+
+    @staticmethod
+    def _quit(driver):
+        try:
+            driver.quit()
+        except Exception as e:
+            print(f"Error closing WebDriver: {e}")
+
+
+def download_with_pool(pool, username, download_dir, **download_options):
+    """
+    Download one user's pages, checking a browser out of the pool only when needed.
+
+    Args:
+        pool: DriverPool to lease the browser from
+        username: eToro username
+        download_dir: Folder for the user's pages
+        download_options: Extra keyword arguments for download_person_data
+
+    Returns:
+        Per-page results from download_person_data (empty on failure)
+    """
+    from src.downloader import download_person_data
+
+    leases = []
+
+    def provide_driver():
+        lease = pool.acquire()
+        leases.append(lease)
+        return lease.driver
+
+    pages = {}
+    try:
+        pages = download_person_data(username, download_dir, driver_provider=provide_driver,
+                                     **download_options)
+    except Exception as e:
+        print(f"Failed to download data for {username}: {e}")
+        for lease in leases:
+            lease.healthy = False
+    finally:
+        browser_pages = [page for page in pages.values() if page.get('source') == 'selenium']
+        for lease in leases:
+            lease.pages += len(browser_pages)
+            # A browser that failed every page is most likely broken.
+            if browser_pages and all(page['status'] != 'ok' for page in browser_pages):
+                lease.healthy = False
+            pool.release(lease)
+    return pages
+
+
+def download_users(usernames, downloads_root='downloads', date=None, workers=2,
+                   max_pages_per_driver=50, driver_factory=None, parallel_tabs=False,
+                   capture_network=False, http_first=False, pages=None, ttls=None,
+                   snapshot_store=False, block_resources=None, rate=2.0, max_attempts=3,
+                   retry_delay=2.0, on_result=None, slim_pages=False):
+    """
+    Download the eToro pages of many users through a shared pool of browsers.
+
+    A browser is only checked out of the pool once a user's page actually
+    needs one, so with ``http_first`` users served entirely over HTTP never
+    start Chrome. Page requests of all users are paced by one adaptive
+    token bucket, and failed pages are retried with jittered exponential
+    backoff after every user had its first attempt.
+
+    Args:
+        usernames: Iterable of validated eToro usernames
+        downloads_root: Root folder; pages go to {downloads_root}/{user}/{date}/
+        date: Date folder name (default: today as yyyy-MM-dd)
+        workers: Number of browsers used in parallel
+        max_pages_per_driver: Pages a browser may load before it is recycled
+        driver_factory: Optional callable returning a new WebDriver
+        parallel_tabs: Load each user's pages concurrently in separate tabs
+        capture_network: Also record each page's JSON API responses
+        http_first: Try every page over a shared keep-alive HTTP session first
+        pages: Page types to download (default: all)
+        ttls: TTL overrides for the refresh planner (see download_person_data)
+        snapshot_store: Save pages into the compressed, deduplicated snapshot store
+        block_resources: Resource blocking setting (see download_person_data)
+        rate: Initial page requests per second across all users; the limiter
+              adapts it to the highest rate that does not make pages fail.
+              None disables pacing.
+        max_attempts: Tries per page, including the first one
+        retry_delay: Base delay in seconds of the retry backoff
+        on_result: Optional callable ``(username, download_dir, pages)`` called
+                   from the download thread after each attempt of a user, e.g.
+                   to hand the pages to the parse stage of a pipeline
+        slim_pages: Save parsed pages without markup no extractor reads
+                    (see download_person_data)
+
+    Returns:
+        Summary dict with per-user page results, success counts, retries,
+        the final request rate and the throughput in users per minute.
+    """
+    usernames = list(usernames)
+    date = date or datetime.now().strftime('%Y-%m-%d')
+    pool = DriverPool(size=workers, max_pages_per_driver=max_pages_per_driver,
+                      driver_factory=driver_factory,
+                      driver_kwargs={'capture_network': capture_network or bool(block_resources)})
+
+    http_fetcher = None
+    if http_first:
+        from src.http_fetcher import HttpFetcher
+        http_fetcher = HttpFetcher(pool_size=max(10, workers))
+
+    from src.pages import PAGE_TYPES
+    from src.scheduler import AdaptiveRateLimiter, RetryScheduler
+
+    pacer = AdaptiveRateLimiter(rate=rate, burst=max(2, workers)) if rate else None
+    scheduler = RetryScheduler(max_attempts=max_attempts, base_delay=retry_delay)
+    results = {username: {} for username in usernames}
+    results_lock = threading.Lock()
+
+    def download_one(username, job_pages, attempt):
+        download_dir = os.path.join(downloads_root, username, date)
+        user_pages = download_with_pool(pool, username, download_dir, parallel_tabs=parallel_tabs,
+                                        capture_network=capture_network, http_first=http_first,
+                                        http_fetcher=http_fetcher, pages=job_pages, ttls=ttls,
+                                        snapshot_store=snapshot_store, block_resources=block_resources,
+                                        pacer=pacer, slim_pages=slim_pages)
+        with results_lock:
+            results[username].update(user_pages)
+        if on_result is not None:
+            on_result(username, download_dir, user_pages)
+        # Pages that failed (or were never reached) go back to the scheduler.
+        return [page_type for page_type in job_pages or PAGE_TYPES
+                if user_pages.get(page_type, {}).get('status') != 'ok']
+
+    for username in usernames:
+        scheduler.submit(username, pages)
+
+    started = time.monotonic()
+    try:
+        scheduler.run(download_one, workers=workers)
+    finally:
+        pool.close()
+        if http_fetcher is not None:
+            http_fetcher.close()
+    elapsed = time.monotonic() - started
+    results = {
+        username: {page_type: user_pages[page_type] for page_type in PAGE_TYPES if page_type in user_pages}
+        for username, user_pages in results.items()
+    }
+
+    succeeded = sum(
+        1 for user_pages in results.values()
+        if user_pages and all(page['status'] == 'ok' for page in user_pages.values())
+    )
+    pages_by_source = {}
+    for user_pages in results.values():
+        for page in user_pages.values():
+            source = page.get('source', 'selenium')
+            pages_by_source[source] = pages_by_source.get(source, 0) + 1
+    users_per_minute = len(usernames) / elapsed * 60 if elapsed > 0 else 0.0
+    summary = {
+        'users': len(usernames),
+        'date': date,
+        'succeeded': succeeded,
+        'failed': len(usernames) - succeeded,
+        'pages': sum(len(user_pages) for user_pages in results.values()),
+        'pages_by_source': pages_by_source,
+        'elapsed_seconds': round(elapsed, 3),
+        'users_per_minute': round(users_per_minute, 2),
+        'drivers_started': pool.drivers_started,
+        'drivers_recycled': pool.drivers_recycled,
+        'retries': scheduler.retries,
+        'final_rate': round(pacer.rate, 2) if pacer is not None else None,
+        'results': results,
+    }
+    print(f"Downloaded {succeeded}/{len(usernames)} users in {elapsed:.1f}s "
+          f"({users_per_minute:.1f} users/min, {pool.drivers_started} browser(s) started, "
+          f"{scheduler.retries} retr{'y' if scheduler.retries == 1 else 'ies'})")
+    if pacer is not None:
+        print(f"Request rate settled at {pacer.rate:.2f} pages/s")
+    return summary
@@ -0,0 +1,286 @@
+import argparse
+import json
+import os
+import socket
+import socketserver
+import threading
+
+
+DEFAULT_HOST = '127.0.0.1'
+# Only used where there are no Unix sockets (Windows).
+DEFAULT_PORT = int(os.environ.get('ETOROHELPER_DAEMON_PORT', '47621'))
+SOCKET_NAME = 'daemon.sock'
+
+# Keyword arguments of download_person_data a client may set for a job.
+DOWNLOAD_OPTIONS = ('parallel_tabs', 'capture_network', 'http_first', 'timeout', 'quiet_period', 'pages', 'ttls',
+                    'snapshot_store', 'block_resources', 'slim_pages')
+
+
+class DaemonError(Exception):
+    """Raised when the daemon rejects a request or cannot be reached."""
+
+
+def default_address():
+    """
+    Where the daemon listens: a Unix socket in the cache directory, readable
+    and writable by the current user only, or a localhost port on systems
+    without Unix sockets.
+
+    Returns:
+        The socket path, or a (host, port) tuple
+    """
+    if hasattr(socket, 'AF_UNIX'):
+        from src.dependencies import cache_dir
+        return os.path.join(cache_dir(), SOCKET_NAME)
+    return (DEFAULT_HOST, DEFAULT_PORT)
+
+
+class BrowserDaemon:
+    """
+    Long-lived local process that keeps warm browsers for repeated CLI runs.
+
+    The daemon resolves chromedriver once, keeps a DriverPool of started
+    browsers and accepts jobs on a Unix socket only its user can open (a
+    localhost TCP port where there are none). Each connection sends one JSON
+    request line and receives one JSON response line:
+
+        {"command": "ping"}
+        {"command": "download", "user": "...", "download_dir": "...", "options": {...}}
+        {"command": "shutdown"}
+
+    Downloads are only written below ``downloads_root``.
+
+    Args:
+        address: Socket path or (host, port) tuple (default: default_address())
+        downloads_root: Folder every job's download_dir must be in
+
+    Raises:
+        DaemonError: If another daemon is already listening on the socket
+    """
+
+    def __init__(self, address=None, downloads_root='downloads', workers=2, max_pages_per_driver=50,
+                 driver_factory=None, capture_network=False):
+        from src.batch import DriverPool
+
+        address = address or default_address()
+        self.downloads_root = os.path.realpath(downloads_root)
+        self.pool = DriverPool(size=workers, max_pages_per_driver=max_pages_per_driver,
+                               driver_factory=driver_factory,
+                               driver_kwargs={'capture_network': capture_network})
+        self.capture_network = capture_network
+        self.jobs_served = 0
+        self._lock = threading.Lock()
+        if isinstance(address, str):
+            if os.path.exists(address):
+                if DaemonClient(address).is_running():
+                    raise DaemonError(f"A daemon is already listening on {address}")
+                # Left behind by a daemon that did not shut down cleanly
+                os.remove(address)
+            os.makedirs(os.path.dirname(address) or '.', exist_ok=True)
+            server_class = socketserver.ThreadingUnixStreamServer
+        else:
+            server_class = socketserver.ThreadingTCPServer
+        self._server = server_class(address, self._make_handler(), bind_and_activate=False)
+        self._server.allow_reuse_address = True
+        self._server.daemon_threads = True
+        self._server.server_bind()
+        if isinstance(address, str):
+            # Before listen(): nobody can connect until only the owner may.
+            os.chmod(address, 0o600)
+        self._server.server_activate()
+
+    @property
+    def address(self):
+        address = self._server.server_address
+        return address if isinstance(address, str) else tuple(address[:2])
+
+    def serve_forever(self, warm_up=True):
+        """Serve jobs until a shutdown request arrives."""
+        if warm_up:
+            try:
+                self.pool.warm_up()
+            except Exception as e:
+                print(f"Could not start browsers ahead of time: {e}")
+        print(f"EtoroHelper daemon listening on {_describe(self.address)} (pid {os.getpid()})")
+        try:
+            self._server.serve_forever(poll_interval=0.1)
+        finally:
+            self._server.server_close()
+            if isinstance(self.address, str) and os.path.exists(self.address):
+                os.remove(self.address)
+            self.pool.close()
+
+    def shutdown(self):
+        # serve_forever() must be stopped from another thread.
+        threading.Thread(target=self._server.shutdown, daemon=True).start()
+
+    def handle_request(self, request):
+        command = request.get('command')
+        if command == 'ping':
+            return {'ok': True, 'pid': os.getpid(), 'jobs_served': self.jobs_served,
+                    'drivers_started': self.pool.drivers_started}
+        if command == 'download':
+            return self._download(request)
+        if command == 'shutdown':
+            self.shutdown()
+            return {'ok': True}
+        return {'ok': False, 'error': f"Unknown command: {command}"}
+
+    def _download(self, request):
+        from src.batch import download_with_pool
+        from src.url_utils import validate_username
+
+        try:
+            username = validate_username(request.get('user'))
+        except ValueError as e:
+            return {'ok': False, 'error': str(e)}
+        download_dir = request.get('download_dir')
+        if not download_dir:
+            return {'ok': False, 'error': "download_dir is required"}
+        download_dir = os.path.realpath(download_dir)
+        if os.path.commonpath([download_dir, self.downloads_root]) != self.downloads_root:
+            return {'ok': False, 'error': f"download_dir must be inside {self.downloads_root}"}
+
+        options = {key: value for key, value in (request.get('options') or {}).items()
+                   if key in DOWNLOAD_OPTIONS}
+        if options.get('capture_network') and not self.capture_network:
+            # Pooled browsers were started without the performance log.
+            options['capture_network'] = False
+
+        print(f"Job: downloading {username} to {download_dir}")
+        results = download_with_pool(self.pool, username, download_dir, **options)
+        with self._lock:
+            self.jobs_served += 1
+        return {'ok': True, 'results': results}
+
+    def _make_handler(self):
+        daemon = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                line = self.rfile.readline()
+                try:
+                    response = daemon.handle_request(json.loads(line))
+                except Exception as e:
+                    response = {'ok': False, 'error': str(e)}
+                self.wfile.write(json.dumps(response).encode('utf-8') + b'\n')
+
+        return Handler
+
+
+def _describe(address):
+    return address if isinstance(address, str) else f"{address[0]}:{address[1]}"
+
+
+class DaemonClient:
+    """
+    Client for a BrowserDaemon running on this machine.
+
+    Args:
+        address: Socket path or (host, port) tuple (default: default_address())
+    """
+
+    def __init__(self, address=None, connect_timeout=0.5):
+        self.address = address or default_address()
+        self.connect_timeout = connect_timeout
+
+    def _connect(self):
+        if isinstance(self.address, str):
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                sock.settimeout(self.connect_timeout)
+                sock.connect(self.address)
+            except OSError:
+                sock.close()
+                raise
+            return sock
+        return socket.create_connection(self.address, timeout=self.connect_timeout)
+
+    def request(self, payload, timeout=None):
+        """
+        Send one request and return the decoded response.
+
+        Raises:
+            DaemonError: If the daemon is not reachable or reports an error
+        """
+        try:
+            with self._connect() as sock:
+                sock.settimeout(timeout)
+                sock.sendall(json.dumps(payload).encode('utf-8') + b'\n')
+                with sock.makefile('rb') as stream:
+                    line = stream.readline()
+        except OSError as e:
+            raise DaemonError(f"Daemon not reachable at {_describe(self.address)}: {e}") from e
+        if not line:
+            raise DaemonError("Daemon closed the connection without answering")
+        response = json.loads(line)
+        if not response.get('ok'):
+            raise DaemonError(response.get('error', 'Unknown daemon error'))
+        return response
+
+    def is_running(self):
+        try:
+            self.request({'command': 'ping'}, timeout=self.connect_timeout)
+            return True
+        except DaemonError:
+            return False
+
+    def download(self, user, download_dir, **options):
+        """
+        Have the daemon download a user's pages.
+
+        Returns:
+            Per-page results, as returned by download_person_data
+        """
+        response = self.request({'command': 'download', 'user': user,
+                                 'download_dir': os.path.abspath(download_dir), 'options': options})
+        return response['results']
+
+    def shutdown(self):
+        self.request({'command': 'shutdown'})
+
+
+def find_daemon(address=None):
+    """
+    Return a DaemonClient if a daemon answers at address (default:
+    default_address()), otherwise None.
+    """
+    client = DaemonClient(address)
+    return client if client.is_running() else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='EtoroHelper browser daemon')
+    parser.add_argument('action', choices=['serve', 'status', 'stop'], help='Start, query or stop the daemon')
+    parser.add_argument('--socket', help='Unix socket to listen on (default: daemon.sock in the cache directory)')
+    parser.add_argument('--downloads-root', default='downloads', help='Folder jobs may download into (default: downloads)')
+    parser.add_argument('--workers', type=int, default=2, help='Number of warm browsers (default: 2)')
+    parser.add_argument('--recycle-after', type=int, default=50, help='Pages a browser may load before it is restarted (default: 50)')
+    parser.add_argument('--capture-network', action='store_true', help='Start browsers with the performance log for network capture')
+    args = parser.parse_args()
+
+    client = DaemonClient(args.socket)
+    if args.action == 'status':
+        try:
+            info = client.request({'command': 'ping'})
+            print(f"Daemon running (pid {info['pid']}, {info['jobs_served']} job(s) served, "
+                  f"{info['drivers_started']} browser(s) started)")
+        except DaemonError as e:
+            print(e)
+        return
+    if args.action == 'stop':
+        try:
+            client.shutdown()
+            print("Daemon stopped.")
+        except DaemonError as e:
+            print(e)
+        return
+
+    from src.dependencies import install_dependencies
+    install_dependencies()
+    BrowserDaemon(args.socket, downloads_root=args.downloads_root, workers=args.workers,
+                  max_pages_per_driver=args.recycle_after, capture_network=args.capture_network).serve_forever()
+
+
+if __name__ == "__main__":
+    main()
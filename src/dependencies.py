@@ -1,18 +1,36 @@
+import hashlib
 import importlib
+import importlib.util
+import json
+import os
 import subprocess
 import sys
+from importlib import metadata
+
+# (pip package, import name) pairs needed to download and parse pages.
+REQUIRED_PACKAGES = (
+    ("beautifulsoup4", "bs4"),
+    ("requests", "requests"),
+    ("selenium", "selenium"),
+    ("webdriver-manager", "webdriver_manager"),
+)
+# The subset needed to parse pages that are already downloaded.
+PARSE_PACKAGES = (
+    ("beautifulsoup4", "bs4"),
+)
 
 def install_if_not_exists(package, import_name=None):
     """
     Installs a package if it's not already installed.
+
+    The package is located with importlib.util.find_spec() rather than
+    imported, so checking for heavy packages such as selenium stays cheap.
     """
     if import_name is None:
         import_name = package
-    try:
-        importlib.import_module(import_name)
+    if importlib.util.find_spec(import_name) is not None:
         return  # Package is already installed
-    except ImportError:
-        print(f"Could not find '{import_name}'. Attempting to install '{package}'.")
+    print(f"Could not find '{import_name}'. Attempting to install '{package}'.")
 
     try:
         # Try to install the package using pip
@@ -32,11 +50,75 @@ def install_if_not_exists(package, import_name=None):
             print("Please ensure your Python environment is correctly set up with pip.", file=sys.stderr)
             sys.exit(1)
 
-def install_dependencies():
-    install_if_not_exists("beautifulsoup4", "bs4")
-    install_if_not_exists("requests")
-    install_if_not_exists("selenium")
-    install_if_not_exists("webdriver-manager")
+    importlib.invalidate_caches()
+
+def cache_dir():
+    """
+    Directory for EtoroHelper's local caches ($ETOROHELPER_CACHE_DIR or ~/.cache/etorohelper).
+    """
+    return os.environ.get('ETOROHELPER_CACHE_DIR') or os.path.join(os.path.expanduser('~'), '.cache', 'etorohelper')
+
+def environment_key(packages=REQUIRED_PACKAGES):
+    """
+    Describe the current interpreter and the installed versions of packages.
+
+    Versions are read from the installed distribution metadata, without
+    importing the packages.
+
+    Returns:
+        Dict identifying the environment, or None if a package is not installed
+    """
+    versions = {}
+    for package, _ in packages:
+        try:
+            versions[package] = metadata.version(package)
+        except metadata.PackageNotFoundError:
+            return None
+    return {'executable': sys.executable, 'python': sys.version, 'packages': versions}
+
+def environment_stamp_path(packages=REQUIRED_PACKAGES):
+    names = ','.join(package for package, _ in packages)
+    digest = hashlib.sha1(f"{sys.executable}|{names}".encode('utf-8')).hexdigest()[:12]
+    return os.path.join(cache_dir(), f"environment-{digest}.json")
+
+def environment_verified(packages=REQUIRED_PACKAGES):
+    """
+    Return True if a previous run verified this exact interpreter and package set.
+    """
+    key = environment_key(packages)
+    if key is None:
+        return False
+    try:
+        with open(environment_stamp_path(packages), 'r', encoding='utf-8') as f:
+            return json.load(f) == key
+    except (OSError, ValueError):
+        return False
+
+def save_environment_stamp(packages=REQUIRED_PACKAGES):
+    key = environment_key(packages)
+    if key is None:
+        return
+    path = environment_stamp_path(packages)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(key, f, indent=2)
+    except OSError as e:
+        print(f"Could not cache the environment check: {e}")
+
+def install_dependencies(packages=REQUIRED_PACKAGES):
+    """
+    Make sure every required package is installed.
+
+    The full check only runs when the interpreter or one of the package
+    versions changed since the last verified run; otherwise the cached
+    stamp is enough and nothing is probed.
+    """
+    if environment_verified(packages):
+        return
+    for package, import_name in packages:
+        install_if_not_exists(package, import_name)
+    save_environment_stamp(packages)
 
 def install_test_dependencies():
     """Install dependencies needed for testing."""
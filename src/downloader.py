@@ -1,3 +1,4 @@
+import json
 import os
 import time
 from selenium import webdriver
@@ -7,8 +8,351 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from webdriver_manager.chrome import ChromeDriverManager
 
+from src.network_capture import NetworkCapture, save_api_responses
+from src.pages import ETORO_BASE_URL, PAGE_TYPES, REQUIRED_SELECTORS, USER_AGENT, build_page_urls
+from src.readiness import (
+    DEFAULT_POLL_INTERVAL,
+    DEFAULT_QUIET_PERIOD,
+    DEFAULT_TIMEOUT,
+    ReadinessTracker,
+    probe,
+    wait_until_ready,
+)
+from src.resource_policy import apply_policy, build_policy, format_bytes
+from src.html_slim import SLIM_PAGE_TYPES, slim_html
+from src.snapshot_store import SnapshotStore, default_store_root, save_page_snapshot
 
-def download_person_data(person, download_dir):
+
+def build_chrome_options(capture_network=False):
+    """
+    Build the headless Chrome options used for every download.
+
+    Args:
+        capture_network: Enable the DevTools performance log needed to record
+                         the pages' JSON API responses
+    """
+    options = webdriver.ChromeOptions()
+    options.add_argument('--headless')
+    options.add_argument('--no-sandbox')
+    options.add_argument('--disable-dev-shm-usage')
+    options.add_argument('--window-size=1920,1080')
+    options.add_argument(f'--user-agent={USER_AGENT}')
+    if capture_network:
+        options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+    return options
+
+
+def create_driver(driver_path=None, capture_network=False):
+    """
+    Start a headless Chrome WebDriver.
+
+    Args:
+        driver_path: Path to an already installed chromedriver. When omitted,
+                     webdriver-manager resolves (and if needed downloads) it.
+        capture_network: Enable the performance log used by NetworkCapture
+
+    Returns:
+        A ready-to-use selenium WebDriver instance.
+    """
+    if driver_path is None:
+        driver_path = ChromeDriverManager().install()
+    service = Service(driver_path)
+    return webdriver.Chrome(service=service, options=build_chrome_options(capture_network))
+
+
+def wait_for_presence(driver, page_type, timeout=DEFAULT_TIMEOUT):
+    """
+    Fallback wait for drivers that cannot run the readiness probe: only the
+    page's main container has to appear.
+    """
+    started = time.monotonic()
+    WebDriverWait(driver, timeout).until(
+        EC.presence_of_element_located((By.CSS_SELECTOR, REQUIRED_SELECTORS[page_type][0]))
+    )
+    return {'ready': True, 'time_to_ready': round(time.monotonic() - started, 3),
+            'method': 'presence', 'missing': []}
+
+
+def check_readiness(page_type, readiness, timeout):
+    """
+    Report the outcome of a readiness wait.
+
+    Raises:
+        TimeoutError: If the page's main container never appeared
+    """
+    main_selector = REQUIRED_SELECTORS[page_type][0]
+    if readiness['ready']:
+        print(f"Page '{page_type}' ready after {readiness['time_to_ready']:.2f}s")
+    elif main_selector in readiness['missing']:
+        raise TimeoutError(f"'{main_selector}' did not appear within {timeout}s")
+    else:
+        print(f"Page '{page_type}' not settled after {timeout}s "
+              f"(missing: {', '.join(readiness['missing']) or 'none'}), saving anyway")
+    return readiness
+
+
+def wait_for_page(driver, page_type, timeout=DEFAULT_TIMEOUT, quiet_period=DEFAULT_QUIET_PERIOD):
+    """
+    Wait until the page loaded in the driver has finished rendering.
+
+    Returns as soon as the page's required selectors are present and the DOM
+    has stopped changing, or after ``timeout`` seconds at most.
+
+    Returns:
+        Readiness result dict with the time-to-ready in seconds
+
+    Raises:
+        TimeoutError: If the page's main container never appeared
+    """
+    readiness = wait_until_ready(driver, page_type, timeout=timeout, quiet_period=quiet_period)
+    if readiness is None:
+        return wait_for_presence(driver, page_type, timeout)
+    return check_readiness(page_type, readiness, timeout)
+
+
+def write_page(output_dir, page_type, html_content, store=None, slim=False):
+    """
+    Write a page to {output_dir}/{page_type}.html, or into the snapshot store.
+
+    Args:
+        store: SnapshotStore to save the page to instead of a plain HTML file
+        slim: Strip scripts, styles, SVG and other markup no extractor reads
+              (see src.html_slim) from parsed page types before saving
+
+    Returns:
+        Path of the HTML file, or of the folder's manifest for stored pages
+    """
+    if slim and page_type in SLIM_PAGE_TYPES:
+        html_content = slim_html(html_content)
+    if store is not None:
+        return save_page_snapshot(output_dir, page_type, html_content, store=store)
+
+    file_path = os.path.join(output_dir, f"{page_type}.html")
+    with open(file_path, 'w', encoding='utf-8') as f:
+        f.write(html_content)
+    return file_path
+
+
+def save_page(driver, output_dir, page_type, store=None, slim=False):
+    """
+    Write the driver's current page to {output_dir}/{page_type}.html.
+    """
+    file_path = write_page(output_dir, page_type, driver.page_source, store=store, slim=slim)
+    print(f"Successfully downloaded and saved to {file_path}")
+    return file_path
+
+
+def save_failed_page(driver, output_dir, page_type):
+    """
+    Save whatever the driver currently shows as {page_type}_failed.html for debugging.
+    """
+    try:
+        file_path = os.path.join(output_dir, f"{page_type}_failed.html")
+        with open(file_path, 'w', encoding='utf-8') as f:
+            f.write(driver.page_source)
+        print(f"Saved partial content to {file_path}")
+    except Exception:
+        pass
+
+
+def save_captured_responses(capture, output_dir, page_type, result, document_urls=None):
+    """
+    Store the JSON responses captured for a page as {page_type}.api.json and
+    record the page's network traffic in its result.
+    """
+    try:
+        capture.poll()
+        if capture.collect_responses:
+            responses = capture.collect(document_urls)
+            result['api_path'] = save_api_responses(responses, output_dir, page_type)
+            result['api_responses'] = len(responses)
+        result['traffic'] = capture.traffic(document_urls)
+    except Exception as e:
+        print(f"Failed to capture network responses for {page_type}: {e}")
+
+
+def record_outcome(pacer, result):
+    """Tell the rate limiter whether a browser page load succeeded."""
+    if pacer is not None:
+        if result['status'] == 'ok':
+            pacer.record_success()
+        else:
+            pacer.record_failure()
+
+
+def block_resources_for_page(driver, policy, page_type):
+    """
+    Apply a page type's block list to the current tab; a browser without CDP
+    support just loads everything.
+    """
+    try:
+        apply_policy(driver, policy.get(page_type, ()))
+    except Exception as e:
+        print(f"Could not block resources for {page_type}: {e}")
+
+
+def download_pages_sequentially(driver, urls, output_dir, timeout=DEFAULT_TIMEOUT,
+                                quiet_period=DEFAULT_QUIET_PERIOD, capture=None, store=None, policy=None,
+                                pacer=None, slim=False):
+    """
+    Load the pages one after another in the driver's current tab.
+    """
+    results = {}
+    for url, page_type in urls:
+        started = time.monotonic()
+        try:
+            print(f"Downloading {url} with Selenium...")
+            if capture is not None:
+                capture.reset()
+            if policy is not None:
+                block_resources_for_page(driver, policy, page_type)
+            if pacer is not None:
+                pacer.acquire()
+            driver.get(url)
+            readiness = wait_for_page(driver, page_type, timeout=timeout, quiet_period=quiet_period)
+            file_path = save_page(driver, output_dir, page_type, store=store, slim=slim)
+            results[page_type] = {'status': 'ok', 'source': 'selenium', 'path': file_path,
+                                  'readiness': readiness}
+            if capture is not None:
+                save_captured_responses(capture, output_dir, page_type, results[page_type])
+
+        except Exception as e:
+            print(f"Failed to download {url}: {e}")
+            results[page_type] = {'status': 'failed', 'source': 'selenium', 'path': None}
+            save_failed_page(driver, output_dir, page_type)
+        results[page_type]['seconds'] = round(time.monotonic() - started, 3)
+        record_outcome(pacer, results[page_type])
+    return results
+
+
+def download_pages_in_tabs(driver, urls, output_dir, timeout=DEFAULT_TIMEOUT,
+                           quiet_period=DEFAULT_QUIET_PERIOD, poll_interval=DEFAULT_POLL_INTERVAL,
+                           capture=None, store=None, policy=None, pacer=None, slim=False):
+    """
+    Load all pages at once, each in its own tab of the same browser.
+
+    Every tab is opened up front so the browser fetches and renders the pages
+    concurrently. The tabs are then polled round-robin and each page is saved
+    and its tab closed as soon as it is ready, so the total time approaches
+    that of the slowest page instead of the sum of all of them.
+    """
+    controller = driver.current_window_handle
+    tabs = []
+    results = {}
+    if capture is not None:
+        capture.reset()
+    try:
+        for url, page_type in urls:
+            print(f"Opening {url} in a new tab...")
+            if pacer is not None:
+                pacer.acquire()
+            known_handles = set(driver.window_handles)
+            # With a policy the tab starts blank: blocking is set per tab and
+            # must be in place before the page starts loading.
+            driver.execute_script("window.open(arguments[0], '_blank');", 'about:blank' if policy else url)
+            new_handles = [h for h in driver.window_handles if h not in known_handles]
+            if not new_handles:
+                print(f"Failed to open a tab for {url}")
+                results[page_type] = {'status': 'failed', 'source': 'selenium', 'path': None, 'seconds': 0.0}
+                record_outcome(pacer, results[page_type])
+                continue
+            if policy is not None:
+                driver.switch_to.window(new_handles[0])
+                block_resources_for_page(driver, policy, page_type)
+                driver.execute_script("window.location.href = arguments[0];", url)
+            tabs.append({
+                'handle': new_handles[0],
+                'url': url,
+                'page_type': page_type,
+                'tracker': ReadinessTracker(page_type, timeout=timeout, quiet_period=quiet_period),
+                'started': time.monotonic(),
+            })
+
+        pending = list(tabs)
+        while pending:
+            for tab in list(pending):
+                page_type = tab['page_type']
+                tracker = tab['tracker']
+                try:
+                    driver.switch_to.window(tab['handle'])
+                    snapshot = probe(driver, tracker.required)
+                    if snapshot is None:
+                        readiness = wait_for_presence(driver, page_type, timeout)
+                    elif tracker.update(snapshot) or tracker.expired():
+                        readiness = check_readiness(page_type, tracker.result(), timeout)
+                    else:
+                        continue
+                    file_path = save_page(driver, output_dir, page_type, store=store, slim=slim)
+                    results[page_type] = {'status': 'ok', 'source': 'selenium', 'path': file_path,
+                                          'readiness': readiness}
+                    if capture is not None:
+                        # All tabs share one performance log; keep the requests made by this page.
+                        save_captured_responses(capture, output_dir, page_type, results[page_type],
+                                                document_urls={tab['url'], driver.current_url})
+                except Exception as e:
+                    print(f"Failed to download {tab['url']}: {e}")
+                    results[page_type] = {'status': 'failed', 'source': 'selenium', 'path': None}
+                    save_failed_page(driver, output_dir, page_type)
+
+                results[page_type]['seconds'] = round(time.monotonic() - tab['started'], 3)
+                record_outcome(pacer, results[page_type])
+                pending.remove(tab)
+                try:
+                    driver.close()
+                except Exception:
+                    pass
+                tabs.remove(tab)
+            if pending:
+                time.sleep(poll_interval)
+    finally:
+        # Never leave stray tabs behind in a reused browser.
+        for tab in tabs:
+            try:
+                driver.switch_to.window(tab['handle'])
+                driver.close()
+            except Exception:
+                pass
+        driver.switch_to.window(controller)
+
+    # Report pages in the usual order regardless of which finished first.
+    return {page_type: results[page_type] for _, page_type in urls if page_type in results}
+
+
+def download_pages_over_http(fetcher, urls, output_dir, store=None, pacer=None, slim=False):
+    """
+    Try to fetch pages without a browser.
+
+    Each page is requested through the HttpFetcher and kept only if its raw
+    HTML already contains all of the page's required selectors.
+
+    Returns:
+        Tuple (results, remaining_urls): results for the pages served over
+        HTTP and the (url, page_type) pairs that still need a browser
+    """
+    results = {}
+    remaining = []
+    for url, page_type in urls:
+        started = time.monotonic()
+        if pacer is not None:
+            pacer.acquire()
+        html_content, missing = fetcher.fetch_page(url, page_type)
+        if html_content is None:
+            print(f"HTTP fast path not usable for {url} (missing: {', '.join(missing)})")
+            remaining.append((url, page_type))
+            continue
+
+        file_path = write_page(output_dir, page_type, html_content, store=store, slim=slim)
+        print(f"Successfully downloaded {url} over HTTP and saved to {file_path}")
+        results[page_type] = {'status': 'ok', 'source': 'http', 'path': file_path,
+                              'seconds': round(time.monotonic() - started, 3)}
+    return results, remaining
+
+
+def download_person_data(person, download_dir, driver=None, timeout=DEFAULT_TIMEOUT,
+                         quiet_period=DEFAULT_QUIET_PERIOD, parallel_tabs=False,
+                         base_url=ETORO_BASE_URL, capture_network=False, http_first=False,
+                         http_fetcher=None, driver_provider=None, pages=None, ttls=None,
+                         snapshot_store=False, block_resources=None, pacer=None, slim_pages=False):
     """
     Download eToro profile pages for a given user.
 
@@ -16,78 +360,155 @@ def download_person_data(person, download_dir):
         person: eToro username (e.g. 'scherenhaenden')
         download_dir: Directory where the downloaded HTML files will be saved
                       (e.g. './downloads/scherenhaenden/2026-02-23')
+        driver: Optional already running WebDriver to reuse. It is left open
+                for the caller; when omitted a new browser is started and
+                quit once all pages are saved.
+        timeout: Hard cap in seconds on the wait for each page to render
+        quiet_period: Seconds without DOM changes after which a page is ready
+        parallel_tabs: Load all pages concurrently in separate tabs
+        base_url: Site root (override to download from a local stand-in)
+        capture_network: Also record the JSON API responses each page loads
+                         into {page_type}.api.json. A reused driver must have
+                         been created with create_driver(capture_network=True).
+        http_first: Try each page over plain HTTP first and only start a
+                    browser for pages whose HTML lacks their required selectors
+        http_fetcher: HttpFetcher to use for the HTTP fast path (shared
+                      between calls to reuse its connection pool)
+        driver_provider: Callable returning a WebDriver, called only once a
+                         browser is actually needed. The driver is left open.
+        pages: Page types to download (default: all)
+        ttls: Enables the refresh planner: pages with a snapshot younger than
+              their TTL (overrides in seconds over DEFAULT_TTLS, ``{}`` for the
+              defaults) are reused instead of downloaded. None downloads
+              every selected page.
+        snapshot_store: Save pages compressed and deduplicated in the shared
+                        snapshot store ({downloads_root}/.snapshots) and list
+                        them in the folder's manifest.json instead of writing
+                        plain {page_type}.html files
+        block_resources: Stop the browser from loading images, fonts, media
+                         and trackers: True for the per-page defaults, or a
+                         list of categories (see src.resource_policy). The
+                         blocked requests and transferred bytes are recorded
+                         per page under ``traffic``.
+        pacer: Rate limiter shared between downloads (an AdaptiveRateLimiter):
+               one token is taken before every page request, and browser
+               page outcomes adjust its rate
+        slim_pages: Save the profile, stats and portfolio pages without
+                    scripts, styles, SVG, Angular attributes and inline blobs
+                    (see src.html_slim); the chart page is kept whole
+
+    Returns:
+        Dict mapping each page type to its result (``{'status': 'ok' | 'failed',
+        'source': 'http' | 'selenium' | 'cache', 'path': ..., 'seconds': ..., 'readiness': ...}``),
+        also written to ``download_stats.json``. Pages that needed a browser
+        are missing if the WebDriver could not be started.
     """
     if not person:
         raise ValueError("person must be a non-empty username")
     if not download_dir:
         raise ValueError("download_dir must be a non-empty path")
 
-    urls = [
-        (f"https://www.etoro.com/people/{person}", "profile"),
-        (f"https://www.etoro.com/people/{person}/stats", "stats"),
-        (f"https://www.etoro.com/people/{person}/portfolio", "portfolio"),
-        (f"https://www.etoro.com/people/{person}/chart", "chart")
-    ]
-
-    wait_selectors = {
-        "profile": '[automation-id="user-stats-chart-container"]',
-        "stats": 'et-card-content',
-        "portfolio": 'et-portfolio-group-list',
-        "chart": 'et-chart-container',
-    }
+    urls = build_page_urls(person, base_url=base_url, pages=pages)
 
     output_dir = download_dir
     os.makedirs(output_dir, exist_ok=True)
 
-    # Setup selenium webdriver
-    options = webdriver.ChromeOptions()
-    options.add_argument('--headless')
-    options.add_argument('--no-sandbox')
-    options.add_argument('--disable-dev-shm-usage')
-    options.add_argument('--window-size=1920,1080')
-    options.add_argument('--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36')
-    
-    driver = None
+    store = SnapshotStore(default_store_root(output_dir)) if snapshot_store else None
+
+    results = {}
+    if ttls is not None:
+        from src.refresh import plan_refresh, reuse_snapshots
+
+        plan = plan_refresh(output_dir, pages=[page_type for _, page_type in urls], ttls=ttls)
+        results = reuse_snapshots(plan, output_dir)
+        urls = [(url, page_type) for url, page_type in urls if plan[page_type]['action'] == 'fetch']
+        if not urls:
+            write_download_stats(results, output_dir)
+            return results
+
+    if http_first:
+        owns_fetcher = http_fetcher is None
+        if owns_fetcher:
+            from src.http_fetcher import HttpFetcher
+            http_fetcher = HttpFetcher()
+        try:
+            http_results, urls = download_pages_over_http(http_fetcher, urls, output_dir, store=store,
+                                                                 pacer=pacer, slim=slim_pages)
+            results.update(http_results)
+        finally:
+            if owns_fetcher:
+                http_fetcher.close()
+        if not urls:
+            results = {page_type: results[page_type] for page_type in PAGE_TYPES if page_type in results}
+            write_download_stats(results, output_dir)
+            return results
+
+    policy = build_policy(block_resources)
+    owns_driver = driver is None and driver_provider is None
     try:
-        service = Service(ChromeDriverManager().install())
-        driver = webdriver.Chrome(service=service, options=options)
+        if owns_driver:
+            driver = create_driver(capture_network=capture_network or policy is not None)
+        elif driver is None:
+            driver = driver_provider()
     except Exception as e:
         print(f"Error setting up WebDriver: {e}")
         print("Please ensure Google Chrome is installed.")
-        return
+        if results:
+            write_download_stats(results, output_dir)
+        return results
 
     try:
-        for url, page_type in urls:
+        capture = None
+        if capture_network or policy is not None:
+            capture = NetworkCapture(driver, collect_responses=capture_network)
             try:
-                print(f"Downloading {url} with Selenium...")
-                driver.get(url)
+                capture.reset()
+            except Exception as e:
+                if capture_network:
+                    print(f"Network capture unavailable, saving HTML only: {e}")
+                capture = None
 
-                selector = wait_selectors.get(page_type)
-                if selector:
-                    WebDriverWait(driver, 30).until(
-                        EC.presence_of_element_located((By.CSS_SELECTOR, selector))
-                    )
+        if parallel_tabs:
+            results.update(download_pages_in_tabs(driver, urls, output_dir, timeout=timeout,
+                                                  quiet_period=quiet_period, capture=capture, store=store,
+                                                  policy=policy, pacer=pacer, slim=slim_pages))
+        else:
+            results.update(download_pages_sequentially(driver, urls, output_dir, timeout=timeout,
+                                                       quiet_period=quiet_period, capture=capture,
+                                                       store=store, policy=policy, pacer=pacer,
+                                                       slim=slim_pages))
+    finally:
+        if owns_driver:
+            driver.quit()
 
-                # Give late-loaded sections a chance to render.
-                time.sleep(5)
+    if policy is not None:
+        traffic = [result['traffic'] for result in results.values() if 'traffic' in result]
+        if traffic:
+            print(f"Resource blocking: {sum(t['blocked_requests'] for t in traffic)} request(s) blocked, "
+                  f"{format_bytes(sum(t['bytes'] for t in traffic))} transferred "
+                  f"in {sum(t['requests'] for t in traffic)} request(s)")
 
-                html_content = driver.page_source
-                file_path = os.path.join(output_dir, f"{page_type}.html")
+    # Keep the usual page order whichever path served each page.
+    results = {page_type: results[page_type] for page_type in PAGE_TYPES if page_type in results}
+    write_download_stats(results, output_dir)
+    return results
 
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    f.write(html_content)
-                print(f"Successfully downloaded and saved to {file_path}")
 
-            except Exception as e:
-                print(f"Failed to download {url}: {e}")
-                # Save what we have for debugging.
-                try:
-                    file_path = os.path.join(output_dir, f"{page_type}_failed.html")
-                    with open(file_path, 'w', encoding='utf-8') as f:
-                        f.write(driver.page_source)
-                    print(f"Saved partial content to {file_path}")
-                except Exception:
-                    pass
-    finally:
-        if driver is not None:
-            driver.quit()
+def write_download_stats(results, output_dir):
+    """
+    Save per-page download results (timings, time-to-ready) as download_stats.json.
+
+    Entries of pages not in results (e.g. pages left out by ``--pages``) are
+    kept from the existing file.
+    """
+    stats_path = os.path.join(output_dir, 'download_stats.json')
+    try:
+        with open(stats_path, 'r', encoding='utf-8') as f:
+            previous = json.load(f)
+    except (OSError, ValueError):
+        previous = {}
+    if isinstance(previous, dict):
+        merged = {**previous, **results}
+        results = {page_type: merged[page_type] for page_type in PAGE_TYPES if page_type in merged}
+    with open(stats_path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2, ensure_ascii=False)
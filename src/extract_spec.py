@@ -0,0 +1,395 @@
+import argparse
+import time
+
+# Marks the end of an element's children during the traversal.
+_END = object()
+
+_BY_AUTOMATION_ID, _BY_CLASS, _BY_TAG = range(3)
+
+
+class Select:
+    """
+    One selector step: an element's tag name, automation-id and class.
+
+    Args:
+        name: Tag name (None for any)
+        automation_id: Required ``automation-id`` value
+        class_: Required class name, or a predicate called with each class name
+        child: Index among the previous step's direct children matching the
+               rest of the selector (like ``find_all(..., recursive=False)[child]``);
+               None to match any descendant
+    """
+
+    __slots__ = ('name', 'automation_id', 'class_', 'child', 'kind', 'key')
+
+    def __init__(self, name=None, automation_id=None, class_=None, child=None):
+        self.name = name
+        self.automation_id = automation_id
+        self.class_ = class_
+        self.child = child
+        # What the traversal files the step under: its automation-id, else
+        # its class, else its tag name (see CompiledSpec.extract)
+        if automation_id is not None:
+            self.kind, self.key = _BY_AUTOMATION_ID, automation_id
+        elif isinstance(class_, str):
+            self.kind, self.key = _BY_CLASS, class_
+        else:
+            self.kind, self.key = _BY_TAG, name
+
+    def matches(self, tag):
+        if self.name is not None and tag.name != self.name:
+            return False
+        if self.automation_id is not None and tag.get('automation-id') != self.automation_id:
+            return False
+        if self.class_ is not None:
+            classes = tag.get('class') or ()
+            if callable(self.class_):
+                return any(self.class_(name) for name in classes)
+            return self.class_ in classes
+        return True
+
+    def _find_args(self):
+        # class_=None would ask BeautifulSoup for elements without a class
+        args = {'attrs': {'automation-id': self.automation_id} if self.automation_id is not None else {}}
+        if self.class_ is not None:
+            args['class_'] = self.class_
+        return args
+
+    def find(self, node):
+        """Resolve the step below ``node`` with find()/find_all() (see CompiledSpec.lookup)."""
+        if self.child is None:
+            return node.find(self.name, **self._find_args())
+        children = node.find_all(self.name, recursive=False, **self._find_args())
+        return children[self.child] if len(children) > self.child else None
+
+    def find_all(self, node):
+        return node.find_all(self.name, **self._find_args())
+
+
+class Field:
+    """A field of a spec; built with field() or records()."""
+
+    __slots__ = ('paths', 'names', 'value', 'many', 'spec', 'build', 'strategy_field')
+
+    def __init__(self, paths, names=None, value=None, many=False, spec=None, build=None, strategy_field=None):
+        self.paths = paths
+        self.names = names
+        self.value = value
+        self.many = many
+        self.spec = spec
+        self.build = build
+        self.strategy_field = strategy_field
+
+
+def sel(name=None, automation_id=None, class_=None, child=None):
+    """Shorthand for Select(...)."""
+    return Select(name, automation_id, class_, child)
+
+
+def text(tag):
+    """The default value of a field: the element's stripped text."""
+    return tag.text.strip()
+
+
+def _path(path):
+    return (path,) if isinstance(path, Select) else tuple(path)
+
+
+def field(*paths, value=text, many=False, strategy_field=None):
+    """
+    Declare a field found by following a path of selectors.
+
+    Each step is looked up inside the first match of the step before it,
+    like chained ``find()`` calls. Further paths are fallbacks, tried in
+    order when the ones before them find nothing.
+
+    Args:
+        paths: Selects or tuples of Selects; with ``strategy_field``,
+               ``(strategy name, path)`` pairs
+        value: Function turning the found element into the field's value
+               (default: its stripped text; None keeps the element)
+        many: Collect every match of the last step instead of the first
+        strategy_field: Order the fallbacks by their hit rates under this
+                        name (see src/strategy_cache.py)
+
+    Returns:
+        A Field for a spec dict; missing fields come out as None ([] with ``many``)
+    """
+    names = None
+    if strategy_field is not None:
+        names = [name for name, _ in paths]
+        paths = [path for _, path in paths]
+    return Field([_path(path) for path in paths], names=names, value=value, many=many,
+                 strategy_field=strategy_field)
+
+
+def records(path, fields, build=None):
+    """
+    Declare a list of records, one per match of ``path``.
+
+    Args:
+        path: Select or tuple of Selects whose every match starts a record
+        fields: Spec dict (or CompiledSpec) of the record's fields, looked up inside the match
+        build: Function turning a record's field dict into the value to
+               keep, or None to drop it (default: keep the dict)
+    """
+    spec = fields if isinstance(fields, CompiledSpec) else compile_spec(fields)
+    return Field([_path(path)], many=True, spec=spec, build=build)
+
+
+class _Cursor:
+    """Progress of one path of a running spec: the step it waits for and where."""
+
+    __slots__ = ('run', 'slot', 'steps', 'step', 'depth', 'count', 'live')
+
+    def __init__(self, run, slot, steps, depth):
+        self.run = run
+        self.slot = slot
+        self.steps = steps
+        self.step = 0
+        self.depth = depth   # depth of the element the next step is looked up in
+        self.count = 0       # matching direct children seen, for ``child`` steps
+        self.live = True
+
+
+class _Run:
+    """A spec applied below one element: the matches found for each path."""
+
+    def __init__(self, spec):
+        self.spec = spec
+        self.found = [[] if spec.fields[field_index].many else None for field_index, _ in spec.paths]
+
+    def start(self, waiting, scoped, depth):
+        for slot, (_, steps) in enumerate(self.spec.paths):
+            cursor = _Cursor(self, slot, steps, depth)
+            waiting[steps[0].kind].setdefault(steps[0].key, []).append(cursor)
+            scoped.setdefault(depth, []).append(cursor)
+
+    def result(self, cache=None):
+        from src.strategy_cache import run_strategies
+
+        data = {}
+        slots = iter(self.found)
+        for key, field in zip(self.spec.keys, self.spec.fields):
+            found = [next(slots) for _ in field.paths]
+            if field.many:
+                matches = next((matches for matches in found if matches), [])
+                if field.spec is not None:
+                    # Records are runs of the sub-spec, or already their results (lookup())
+                    values = (run.result(cache) if isinstance(run, _Run) else run for run in matches)
+                    data[key] = [value for value in map(field.build or _keep, values) if value is not None]
+                else:
+                    data[key] = [field.value(match) for match in matches] if field.value else matches
+                continue
+            if field.strategy_field is not None:
+                match = run_strategies(field.strategy_field,
+                                       [(name, lambda match=match: match) for name, match in zip(field.names, found)],
+                                       cache)
+            else:
+                match = next((match for match in found if match is not None), None)
+            data[key] = field.value(match) if match is not None and field.value else match
+        return data
+
+
+def _keep(value):
+    return value
+
+
+class CompiledSpec:
+    """
+    A declarative extraction spec compiled into a single traversal.
+
+    All paths of all fields are followed at once: one walk over the tree
+    hands every element to the paths whose next step is filed under its
+    tag name, automation-id or classes, so the cost is one pass however
+    many fields the spec has, instead of one ``find()`` per step. Nodes
+    only need ``name``, ``contents`` and ``get()``, so BeautifulSoup trees
+    and the row trees of src/portfolio_stream.py both work.
+
+    Args:
+        spec: Dict of output key to a Field (see field() and records())
+    """
+
+    def __init__(self, spec):
+        self.keys = list(spec)
+        self.fields = list(spec.values())
+        self.paths = [(field_index, steps) for field_index, field in enumerate(self.fields)
+                      for steps in field.paths]
+
+    def extract(self, root, cache=None):
+        """
+        Extract the spec's fields from the descendants of ``root``.
+
+        Args:
+            root: BeautifulSoup object, Tag or row node
+            cache: StrategyCache for fields with ``strategy_field`` (default: the shared one)
+
+        Returns:
+            Dict of the spec's keys to their values
+        """
+        run = _Run(self)
+        # Cursors by their next step's automation-id, class or tag name
+        waiting = ({}, {}, {})
+        by_automation_id, by_class, by_tag = waiting
+        scoped = {}   # depth of an open element -> the cursors looking inside it
+        run.start(waiting, scoped, 0)
+
+        children = [iter(root.contents)]
+        while children:
+            tag = next(children[-1], _END)
+            if tag is _END:
+                children.pop()
+                depth = len(children)
+                for cursor in scoped.pop(depth, ()):
+                    if cursor.live and cursor.depth == depth:
+                        cursor.live = False
+                        _unfile(waiting, cursor)
+                continue
+            if isinstance(tag, str):
+                continue
+            depth = len(children)
+            children.append(iter(tag.contents))
+            candidates = by_tag.get(tag.name, [])[:]
+            if None in by_tag:
+                candidates += by_tag[None]
+            if by_automation_id:
+                automation_id = tag.get('automation-id')
+                if automation_id is not None:
+                    candidates += by_automation_id.get(automation_id, ())
+            if by_class:
+                for class_name in dict.fromkeys(tag.get('class') or ()):
+                    candidates += by_class.get(class_name, ())
+            for cursor in candidates:
+                step = cursor.steps[cursor.step]
+                if step.child is not None:
+                    if depth != cursor.depth + 1 or not step.matches(tag):
+                        continue
+                    cursor.count += 1
+                    if cursor.count <= step.child:
+                        continue
+                elif not step.matches(tag):
+                    continue
+                _advance(cursor, tag, depth, waiting, scoped)
+        return run.result(cache)
+
+    def lookup(self, root, cache=None):
+        """
+        Extract the same fields with one chain of find() calls per path.
+
+        This is how the extractors were written by hand; it gives the same
+        result as extract() and serves as its reference and benchmark baseline.
+        """
+        run = _Run(self)
+        for slot, (field_index, steps) in enumerate(self.paths):
+            field = self.fields[field_index]
+            node = root
+            for step in steps[:-1]:
+                node = step.find(node)
+                if node is None:
+                    break
+            else:
+                if not field.many:
+                    run.found[slot] = steps[-1].find(node)
+                elif field.spec is not None:
+                    run.found[slot] = [field.spec.lookup(match, cache) for match in steps[-1].find_all(node)]
+                else:
+                    run.found[slot] = steps[-1].find_all(node)
+        return run.result(cache)
+
+
+def _advance(cursor, tag, depth, waiting, scoped):
+    run, field_index = cursor.run, cursor.run.spec.paths[cursor.slot][0]
+    field = run.spec.fields[field_index]
+    if cursor.step < len(cursor.steps) - 1:
+        # Look for the next step inside this element
+        _unfile(waiting, cursor)
+        cursor.step += 1
+        cursor.depth = depth
+        cursor.count = 0
+        step = cursor.steps[cursor.step]
+        waiting[step.kind].setdefault(step.key, []).append(cursor)
+        scoped.setdefault(depth, []).append(cursor)
+    elif field.spec is not None:
+        # Every match starts a record, extracted from inside it
+        record = _Run(field.spec)
+        record.start(waiting, scoped, depth)
+        run.found[cursor.slot].append(record)
+    elif field.many:
+        run.found[cursor.slot].append(tag)
+    else:
+        run.found[cursor.slot] = tag
+        cursor.live = False
+        _unfile(waiting, cursor)
+
+
+def _unfile(waiting, cursor):
+    step = cursor.steps[cursor.step]
+    cursors = waiting[step.kind][step.key]
+    cursors.remove(cursor)
+    if not cursors:
+        del waiting[step.kind][step.key]
+
+
+def compile_spec(spec):
+    """Compile a spec dict of output key to Field into a CompiledSpec."""
+    return CompiledSpec(spec)
+
+
+def benchmark(pages, runs=5):
+    """
+    Time the extractors' compiled specs against one find() chain per field.
+
+    Args:
+        pages: Dict of page type ('profile', 'stats', 'portfolio') to HTML
+        runs: Runs per variant; the best is reported
+
+    Returns:
+        Dict of page type to ``{'seconds', 'lookup_seconds', 'same'}``,
+        ``same`` telling whether both gave the same fields
+    """
+    from src.html_backend import make_soup
+    from src.parser import PORTFOLIO_SPEC
+    from src.performance_parser import PERFORMANCE_SPEC
+    from src.stats_parser import STATS_SPEC
+    from src.strategy_cache import StrategyCache
+
+    specs = {'profile': PERFORMANCE_SPEC, 'stats': STATS_SPEC, 'portfolio': PORTFOLIO_SPEC}
+    results = {}
+    for page_type, html in pages.items():
+        spec, soup = specs[page_type], make_soup(html)
+        # Keep the benchmark's attempts out of the shared hit rates
+        cache = StrategyCache()
+        timings = []
+        for method in (spec.extract, spec.lookup):
+            best = None
+            for _ in range(runs):
+                started = time.perf_counter()
+                method(soup, cache)
+                elapsed = time.perf_counter() - started
+                best = elapsed if best is None else min(best, elapsed)
+            timings.append(best)
+        results[page_type] = {
+            'seconds': timings[0],
+            'lookup_seconds': timings[1],
+            'same': spec.extract(soup, cache) == spec.lookup(soup, cache),
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare the single-traversal extractors with per-field find() lookups')
+    parser.add_argument('folder', nargs='?', help='Download folder with profile/stats/portfolio pages (default: the example pages)')
+    parser.add_argument('--runs', type=int, default=5, help='Runs per variant; the best is reported (default: 5)')
+    args = parser.parse_args()
+
+    from src.pages import load_pages
+
+    for page_type, result in benchmark(load_pages(args.folder), runs=args.runs).items():
+        print(f"{page_type:<10} traversal {result['seconds'] * 1000:7.1f} ms, "
+              f"find() lookups {result['lookup_seconds'] * 1000:7.1f} ms "
+              f"({result['lookup_seconds'] / result['seconds']:.1f}x)"
+              f"{'' if result['same'] else '  ! results differ'}")
+
+
+if __name__ == "__main__":
+    main()
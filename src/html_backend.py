@@ -0,0 +1,133 @@
+import argparse
+import importlib.util
+import os
+import time
+
+from bs4 import BeautifulSoup
+
+# BeautifulSoup tree builders, fastest first, with the module each one needs.
+BACKENDS = {
+    "lxml": "lxml",
+    "html.parser": None,
+}
+
+BACKEND_ENV = 'ETOROHELPER_HTML_BACKEND'
+
+_selected = None
+
+
+def available_backends():
+    """Return the installed backends, fastest first."""
+    return [name for name, module in BACKENDS.items()
+            if module is None or importlib.util.find_spec(module) is not None]
+
+
+def resolve_backend(name=None):
+    """
+    Turn a backend setting into an installed backend name.
+
+    Args:
+        name: A key of BACKENDS, or None/'auto' for the fastest installed one
+
+    Raises:
+        ValueError: If the backend is unknown or not installed
+    """
+    available = available_backends()
+    if not name or name == 'auto':
+        return available[0]
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown HTML backend '{name}' (choose from auto, {', '.join(BACKENDS)})")
+    if name not in available:
+        raise ValueError(f"HTML backend '{name}' is not installed (pip install {BACKENDS[name]})")
+    return name
+
+
+def set_backend(name):
+    """
+    Select the backend used by all extractors ('auto' for the fastest).
+
+    The choice is also exported through $ETOROHELPER_HTML_BACKEND so parse
+    worker processes use it too.
+    """
+    global _selected
+    _selected = resolve_backend(name)
+    os.environ[BACKEND_ENV] = _selected
+    return _selected
+
+
+def get_backend():
+    """Return the selected backend, resolving $ETOROHELPER_HTML_BACKEND or 'auto' on first use."""
+    global _selected
+    if _selected is None:
+        _selected = resolve_backend(os.environ.get(BACKEND_ENV))
+    return _selected
+
+
+def make_soup(html_content, backend=None):
+    """
+    Parse HTML with the selected (or the given) backend.
+    """
+    return BeautifulSoup(html_content, backend or get_backend())
+
+
+def benchmark(repeat=20, runs=3):
+    """
+    Time the three extractors on an enlarged copy of the example pages per backend.
+
+    The portfolio page is built by repeating the example's rows ``repeat``
+    times, which gives a page of several megabytes.
+
+    Returns:
+        Dict of backend to ``{'seconds', 'bytes'}`` (best of ``runs``)
+    """
+    from src.parser import extract_portfolio_data
+    from src.performance_parser import extract_performance_data
+    from src.stats_parser import extract_stats_data
+
+    example_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'example')
+    with open(os.path.join(example_dir, 'input', 'InputContent.txt'), encoding='utf-8') as f:
+        portfolio = f.read()
+    with open(os.path.join(example_dir, 'portfolio', 'person-url-1.txt'), encoding='utf-8') as f:
+        profile = f.read()
+    with open(os.path.join(example_dir, 'portfolio', 'person-url-statts.txt'), encoding='utf-8') as f:
+        stats = f.read()
+    portfolio = portfolio * repeat
+    size = len(portfolio.encode('utf-8')) + len(profile.encode('utf-8')) + len(stats.encode('utf-8'))
+
+    results = {}
+    previous = get_backend()
+    try:
+        for name in available_backends():
+            set_backend(name)
+            best = None
+            for _ in range(runs):
+                started = time.perf_counter()
+                extract_portfolio_data(portfolio)
+                extract_performance_data(profile)
+                extract_stats_data(stats)
+                elapsed = time.perf_counter() - started
+                best = elapsed if best is None else min(best, elapsed)
+            results[name] = {'seconds': best, 'bytes': size}
+    finally:
+        set_backend(previous)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the HTML backends on the example pages')
+    parser.add_argument('--repeat', type=int, default=20, help='Copies of the portfolio rows in the test page (default: 20)')
+    parser.add_argument('--runs', type=int, default=3, help='Runs per backend; the best is reported (default: 3)')
+    args = parser.parse_args()
+
+    # Run through the imported module: under ``python -m`` this file is
+    # __main__, a separate copy from the src.html_backend the extractors use.
+    from src import html_backend
+    results = html_backend.benchmark(repeat=args.repeat, runs=args.runs)
+    slowest = max(result['seconds'] for result in results.values())
+    for name, result in results.items():
+        print(f"{name:<12} {result['seconds']:.3f}s for {result['bytes'] / 1024 / 1024:.1f} MB "
+              f"({slowest / result['seconds']:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+import argparse
+import re
+import time
+
+# Page types whose saved HTML may be slimmed: the parsed ones. The chart page
+# is kept whole, its SVG is the chart.
+SLIM_PAGE_TYPES = ("profile", "stats", "portfolio")
+
+# Regions and attributes no extractor reads. Elements with automation-ids,
+# classes and text are left alone; only these are cut out. Alternatives are
+# grouped by their first character, and matching is case-sensitive because
+# browsers serialize tag and attribute names in lower case - both keep the
+# single pass fast.
+_SLIM_PATTERN = re.compile(
+    r'<(?:'
+    r'(?:script|style|svg|noscript)(?=[\s/>])[^>]*/>'          # self-closing <svg .../>
+    r'|(script|style|svg|noscript)(?=[\s/>]).*?</\1\s*>'      # whole script/style/svg/noscript elements
+    r'|!--\s*-->'                                               # Angular's empty placeholder comments
+    r')'
+    r'|\s(?:'
+    r'_ng(?:content|host)-[\w-]+=""'                            # Angular component ids
+    r'|ng-reflect-[\w-]+="[^"]*"'                               # Angular debug bindings
+    r'|style="[^"]*"'                                           # inline styles
+    r')'
+    r'|data:[\w/+.-]+;base64,[A-Za-z0-9+/=]+',                  # inline (base64) images and fonts
+    re.DOTALL,
+)
+# The tag name must end there: custom elements like <svg-icon> are kept.
+_REGION_START = re.compile(r'<(script|style|svg|noscript)(?=[\s/>])')
+
+
+def slim_html(html):
+    """
+    Remove scripts, styles, SVG, empty comments, Angular attributes, inline
+    styles and base64 blobs from a page.
+
+    Returns:
+        The slimmed HTML; every element the extractors look at is kept
+    """
+    return _SLIM_PATTERN.sub('', html)
+
+
+def _safe_cut(buffer):
+    """
+    Return how much of the buffer can be slimmed without splitting a region:
+    up to the first script/style/svg/noscript that is still open, else up to
+    the last '<' (a tag that may be incomplete).
+    """
+    cut = buffer.rfind('<')
+    if cut <= 0:
+        return 0
+    pos = 0
+    while True:
+        start = _REGION_START.search(buffer, pos, cut)
+        if start is None:
+            return cut
+        region = _SLIM_PATTERN.match(buffer, start.start())
+        if region is None or region.end() > cut:
+            return start.start()
+        pos = region.end()
+
+
+def iter_slim_html(chunks):
+    """
+    Slim HTML arriving in chunks, yielding slimmed pieces as soon as they are safe.
+
+    Text is held back only while a removable region or a tag is incomplete,
+    so memory stays bounded by the largest script/style/SVG region. The
+    joined output equals slim_html() of the joined input.
+
+    Args:
+        chunks: Iterable of HTML strings (e.g. reads of a file)
+    """
+    held, pieces, size = '', [], 0
+    for chunk in chunks:
+        pieces.append(chunk)
+        size += len(chunk)
+        # Rescan held-back text only once as much new text arrived, which
+        # keeps the total work linear while a long region is still open.
+        if size < len(held):
+            continue
+        buffer = held + ''.join(pieces)
+        pieces, size = [], 0
+        cut = _safe_cut(buffer)
+        if cut:
+            yield slim_html(buffer[:cut])
+        held = buffer[cut:]
+    buffer = held + ''.join(pieces)
+    if buffer:
+        yield slim_html(buffer)
+
+
+def benchmark(pages, runs=3):
+    """
+    Compare parse-and-extract time and size of pages with and without slimming.
+
+    Args:
+        pages: Dict of page type ('profile', 'stats', 'portfolio') to HTML
+        runs: Runs per variant; the best is reported
+
+    Returns:
+        Dict of page type to ``{'bytes', 'slim_bytes', 'seconds', 'slim_seconds', 'slim_time'}``,
+        ``slim_time`` being the cost of slimming itself
+    """
+    from src.parsed_page import ParsedPage
+
+    extractors = {'profile': 'performance', 'stats': 'stats', 'portfolio': 'portfolio'}
+    results = {}
+    for page_type, html in pages.items():
+        started = time.perf_counter()
+        slimmed = slim_html(html)
+        slim_time = time.perf_counter() - started
+
+        timings = []
+        for variant in (html, slimmed):
+            best = None
+            for _ in range(runs):
+                started = time.perf_counter()
+                ParsedPage(variant, slim=False).extract(extractors[page_type])
+                elapsed = time.perf_counter() - started
+                best = elapsed if best is None else min(best, elapsed)
+            timings.append(best)
+        results[page_type] = {
+            'bytes': len(html.encode('utf-8')),
+            'slim_bytes': len(slimmed.encode('utf-8')),
+            'seconds': timings[0],
+            'slim_seconds': timings[1],
+            'slim_time': slim_time,
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure how much slimming shrinks saved pages and speeds up parsing')
+    parser.add_argument('folder', nargs='?', help='Download folder with profile/stats/portfolio.html (default: the example pages)')
+    parser.add_argument('--runs', type=int, default=3, help='Runs per variant; the best is reported (default: 3)')
+    args = parser.parse_args()
+
+    from src.pages import load_pages
+
+    pages = load_pages(args.folder, SLIM_PAGE_TYPES)
+
+    for page_type, result in benchmark(pages, runs=args.runs).items():
+        print(f"{page_type:<10} {result['bytes'] / 1024:8.1f} KB -> {result['slim_bytes'] / 1024:8.1f} KB "
+              f"({100 - 100 * result['slim_bytes'] / result['bytes']:.0f}% smaller), "
+              f"parse {result['seconds'] * 1000:.1f} ms -> {result['slim_seconds'] * 1000:.1f} ms "
+              f"(slimming took {result['slim_time'] * 1000:.1f} ms)")
+
+
+if __name__ == "__main__":
+    main()
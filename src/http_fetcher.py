@@ -0,0 +1,66 @@
+import requests
+from requests.adapters import HTTPAdapter
+
+from src.pages import REQUIRED_SELECTORS, USER_AGENT, missing_selectors
+
+
+DEFAULT_HEADERS = {
+    'User-Agent': USER_AGENT,
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.9',
+}
+
+
+class HttpFetcher:
+    """
+    Fetches pages over a pooled, keep-alive requests.Session.
+
+    Used as a fast path before falling back to a browser: a page is only
+    accepted when the raw HTML already contains every selector the page
+    needs, i.e. when it does not depend on JavaScript to render its data.
+    The session can be shared between threads.
+    """
+
+    def __init__(self, pool_size=10, timeout=15, session=None):
+        self.timeout = timeout
+        self.session = session or requests.Session()
+        self.session.headers.update(DEFAULT_HEADERS)
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def fetch_page(self, url, page_type, required=None):
+        """
+        Fetch a page and check it against its required selectors.
+
+        Args:
+            url: Page URL
+            page_type: Key into REQUIRED_SELECTORS
+            required: Override for the required selector set
+
+        Returns:
+            Tuple (html, missing). ``html`` is None unless the request
+            succeeded and no required selector is missing.
+        """
+        required = REQUIRED_SELECTORS.get(page_type, ()) if required is None else required
+        try:
+            response = self.session.get(url, timeout=self.timeout)
+        except requests.RequestException as e:
+            print(f"HTTP fetch of {url} failed: {e}")
+            return None, list(required)
+
+        if response.status_code != 200:
+            return None, list(required)
+
+        html = response.text
+        missing = missing_selectors(html, required)
+        return (None if missing else html), missing
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
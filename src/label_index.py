@@ -0,0 +1,58 @@
+import re
+
+from bs4 import NavigableString
+
+# How a label has to occur in a text node, as the predicate soup.find(string=...) used.
+LABEL_MATCHES = {
+    'contains': lambda label, text: label in text,
+    'icontains': lambda label, text: label.lower() in text.lower(),
+    'exact': lambda label, text: text == label,
+}
+
+
+class LabelIndex:
+    """
+    First text node containing each of a set of labels, found in one pass.
+
+    Replaces one ``soup.find(string=...)`` scan per label: every text node
+    (comments included, as with soup.find) is tested once against a single
+    case-insensitive regex of all labels. Only the rare nodes that hit are
+    checked against the individual labels, so the scan stays linear in the
+    document whatever the number of labels.
+
+    Args:
+        soup: BeautifulSoup document to scan
+        labels: Iterable of ``(label, match)`` pairs, ``match`` being a key
+                of LABEL_MATCHES
+    """
+
+    def __init__(self, soup, labels):
+        self._first = {}
+        pending = []
+        for label, match in labels:
+            if match not in LABEL_MATCHES:
+                raise ValueError(f"Unknown label match '{match}' (choose from {', '.join(LABEL_MATCHES)})")
+            if (label, match) not in self._first:
+                self._first[(label, match)] = None
+                pending.append((label, match))
+        if not pending:
+            return
+
+        prefilter = re.compile('|'.join(re.escape(label) for label, _ in pending), re.IGNORECASE)
+        for element in soup.descendants:
+            if not isinstance(element, NavigableString) or not prefilter.search(element):
+                continue
+            for key in [key for key in pending if LABEL_MATCHES[key[1]](key[0], element)]:
+                self._first[key] = element
+                pending.remove(key)
+            if not pending:
+                break
+
+    def first(self, label, match='contains'):
+        """
+        Return the first text node matching a label, or None.
+
+        Raises:
+            KeyError: If the label was not given to the index
+        """
+        return self._first[(label, match)]
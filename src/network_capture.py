@@ -0,0 +1,217 @@
+import base64
+import json
+import os
+from urllib.parse import parse_qs, urlparse
+
+
+class NetworkCapture:
+    """
+    Records the JSON responses a page fetches, using Chrome's performance log.
+
+    The driver must be started with performance logging enabled (see
+    ``create_driver(capture_network=True)``). ``poll()`` reads the Network.*
+    DevTools events logged so far; ``collect()`` then fetches the bodies of
+    finished JSON responses through ``Network.getResponseBody``, and
+    ``traffic()`` sums up what was transferred and what was blocked.
+
+    Args:
+        driver: WebDriver with the performance log enabled
+        collect_responses: Whether the JSON response bodies are wanted; when
+                           False the log is only used for traffic accounting
+    """
+
+    def __init__(self, driver, collect_responses=True):
+        self.driver = driver
+        self.collect_responses = collect_responses
+        self._requests = {}
+        self._documents = {}
+        self._traffic = []
+
+    def reset(self):
+        """Discard everything logged so far, e.g. before navigating to a new page."""
+        self.driver.get_log('performance')
+        self._requests.clear()
+        self._documents.clear()
+        self._traffic.clear()
+
+    def poll(self):
+        """Read new performance log entries into the request table."""
+        for entry in self.driver.get_log('performance'):
+            try:
+                message = json.loads(entry['message'])['message']
+            except (KeyError, TypeError, ValueError):
+                continue
+            self._handle_event(message.get('method'), message.get('params') or {})
+
+    def _handle_event(self, method, params):
+        request_id = params.get('requestId')
+        if not request_id:
+            return
+        if method == 'Network.requestWillBeSent':
+            self._documents[request_id] = params.get('documentURL')
+            request = self._requests.setdefault(request_id, {'finished': False})
+            request['url'] = params.get('request', {}).get('url')
+            request['documentURL'] = params.get('documentURL')
+        elif method == 'Network.responseReceived':
+            response = params.get('response', {})
+            request = self._requests.setdefault(request_id, {'finished': False})
+            request['url'] = response.get('url', request.get('url'))
+            request['status'] = response.get('status')
+            request['mimeType'] = response.get('mimeType', '')
+        elif method == 'Network.loadingFinished':
+            if request_id in self._requests:
+                self._requests[request_id]['finished'] = True
+            self._traffic.append((self._documents.get(request_id), params.get('encodedDataLength') or 0, False))
+        elif method == 'Network.loadingFailed':
+            self._requests.pop(request_id, None)
+            if params.get('blockedReason'):
+                self._traffic.append((self._documents.get(request_id), 0, True))
+
+    def traffic(self, document_urls=None):
+        """
+        Sum up the requests seen since the last reset.
+
+        Args:
+            document_urls: Only count requests made by documents with one of these URLs
+
+        Returns:
+            Dict with the number of loaded ``requests``, the ``bytes`` they
+            transferred and the number of ``blocked_requests``
+        """
+        loaded, transferred, blocked = 0, 0, 0
+        for document_url, size, was_blocked in self._traffic:
+            if document_urls is not None and document_url not in document_urls:
+                continue
+            if was_blocked:
+                blocked += 1
+            else:
+                loaded += 1
+                transferred += size
+        return {'requests': loaded, 'bytes': int(transferred), 'blocked_requests': blocked}
+
+    def collect(self, document_urls=None):
+        """
+        Fetch the bodies of the finished JSON responses seen so far.
+
+        Args:
+            document_urls: Only collect requests made by documents with one of
+                           these URLs (used when several tabs share the log).
+
+        Returns:
+            List of ``{'url', 'status', 'body'}`` dicts with decoded JSON bodies
+        """
+        responses = []
+        for request_id, request in list(self._requests.items()):
+            if not request['finished'] or 'json' not in (request.get('mimeType') or ''):
+                continue
+            if document_urls is not None and request.get('documentURL') not in document_urls:
+                continue
+            del self._requests[request_id]
+            try:
+                result = self.driver.execute_cdp_cmd('Network.getResponseBody', {'requestId': request_id})
+                body = result.get('body', '')
+                if result.get('base64Encoded'):
+                    body = base64.b64decode(body).decode('utf-8')
+                responses.append({
+                    'url': request.get('url'),
+                    'status': request.get('status'),
+                    'body': json.loads(body),
+                })
+            except Exception as e:
+                print(f"Could not read response body of {request.get('url')}: {e}")
+        return responses
+
+
+def api_responses_path(page_dir, page_type):
+    return os.path.join(page_dir, f"{page_type}.api.json")
+
+
+def save_api_responses(responses, page_dir, page_type):
+    """
+    Save captured JSON responses next to the page HTML as {page_type}.api.json.
+    """
+    file_path = api_responses_path(page_dir, page_type)
+    with open(file_path, 'w', encoding='utf-8') as f:
+        json.dump(responses, f, indent=2, ensure_ascii=False)
+    print(f"Captured {len(responses)} JSON response(s) to {file_path}")
+    return file_path
+
+
+def load_api_responses(page_dir, page_type):
+    """
+    Load the JSON responses captured for a page.
+
+    Returns:
+        List of response dicts, or None if nothing was captured for the page
+    """
+    file_path = api_responses_path(page_dir, page_type)
+    if not os.path.exists(file_path):
+        return None
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def find_api_responses(responses, url_fragment):
+    """
+    Return the successful captured responses whose (lower-cased) URL contains url_fragment.
+    """
+    return [
+        response for response in responses or []
+        if url_fragment in (response.get('url') or '').lower()
+        and (response.get('status') or 200) < 400
+        and response.get('body') is not None
+    ]
+
+
+def url_param(url, name):
+    """Return a query parameter of a URL, matching the name case-insensitively."""
+    for key, values in parse_qs(urlparse(url or '').query).items():
+        if key.lower() == name.lower():
+            return values[0]
+    return None
+
+
+def first_field(payload, *names):
+    """
+    Return the first non-null value among the given keys of a dict payload.
+    """
+    if not isinstance(payload, dict):
+        return None
+    for name in names:
+        value = payload.get(name)
+        if value is not None:
+            return value
+    return None
+
+
+def format_percent(value, signed=False):
+    """Format a numeric API value the way eToro renders percentages."""
+    if not isinstance(value, (int, float)):
+        return None
+    return f"{value:+.2f}%" if signed else f"{value:.2f}%"
+
+
+# URL fragments of the eToro API endpoints the Angular pages load their data from.
+GAIN_ENDPOINT = '/userstats/gain/'
+RANKINGS_ENDPOINT = '/rankings/'
+PORTFOLIO_ENDPOINT = '/portfolios'
+INSTRUMENTS_ENDPOINT = '/instrumentsmetadata/'
+
+DEFAULT_RANKINGS_PERIOD = 'oneyearago'
+
+
+def rankings_by_period(responses):
+    """
+    Map each captured rankings response to its period.
+
+    Returns:
+        Dict of lower-cased period name (e.g. 'oneyearago', 'twoyearsago')
+        to the ranking's ``Data`` dict
+    """
+    rankings = {}
+    for response in find_api_responses(responses, RANKINGS_ENDPOINT):
+        data = first_field(response['body'], 'Data', 'data')
+        if isinstance(data, dict):
+            period = (url_param(response['url'], 'Period') or DEFAULT_RANKINGS_PERIOD).lower()
+            rankings.setdefault(period, data)
+    return rankings
@@ -0,0 +1,189 @@
+import re
+from decimal import Decimal
+from functools import lru_cache
+
+# Thousands and decimal separator per locale; 'auto' decides per value.
+LOCALES = {
+    "en": (",", "."),
+    "de": (".", ","),
+}
+
+# Currency symbols to ISO codes; codes like 'SEK' stand for themselves.
+CURRENCIES = {
+    "$": "USD",
+    "US$": "USD",
+    "HK$": "HKD",
+    "A$": "AUD",
+    "C$": "CAD",
+    "NZ$": "NZD",
+    "S$": "SGD",
+    "R$": "BRL",
+    "€": "EUR",
+    "£": "GBP",
+    "¥": "JPY",
+}
+
+# K/M/B suffixes as eToro shows them, and their German forms.
+SUFFIXES = {
+    "k": 10 ** 3,
+    "tsd": 10 ** 3,
+    "m": 10 ** 6,
+    "mio": 10 ** 6,
+    "b": 10 ** 9,
+    "bn": 10 ** 9,
+    "mrd": 10 ** 9,
+}
+
+_CURRENCY = r'[A-Z]{0,2}[$€£¥]|[A-Z]{3}'
+_NUMBER = re.compile(
+    r'^\s*(?P<sign>[-+\u2212\u2013]?)\s*'
+    rf'(?P<prefix>{_CURRENCY})?\s*'
+    r'(?P<sign2>[-+\u2212\u2013]?)\s*'
+    r"(?P<digits>\d(?:[\d.,'\u00a0\u202f ]*\d)?)"
+    r'\s*(?P<suffix>(?i:k|tsd|mio|mrd|bn|m|b)\.?)?'
+    rf'\s*(?P<unit>%|{_CURRENCY})?\s*$'
+)
+_NEGATIVE = frozenset(('-', '\u2212', '\u2013'))
+
+# Per locale: thousands separators (and spaces, apostrophes) dropped, the decimal separator turned into '.'.
+_GROUPING = "'\u00a0\u202f "
+_TRANSLATIONS = {locale: str.maketrans(decimal, '.', thousands + _GROUPING)
+                 for locale, (thousands, decimal) in LOCALES.items()}
+
+
+def _digits_locale(digits):
+    """
+    Guess the locale of a number's digits.
+
+    The separator that comes last is the decimal one when both appear; a
+    separator that appears more than once groups thousands. A lone '.' is
+    a decimal point, and a lone ',' too unless exactly three digits follow
+    it ("1,234" is read as 1234, "12,5" as 12.5). Pass the locale
+    explicitly for German thousands like "1.234".
+    """
+    comma, dot = digits.rfind(','), digits.rfind('.')
+    if comma >= 0 and dot >= 0:
+        return "en" if dot > comma else "de"
+    if dot >= 0:
+        return "de" if digits.count('.') > 1 else "en"
+    if comma >= 0:
+        if digits.count(',') > 1 or len(digits) - comma - 1 == 3:
+            return "en"
+        return "de"
+    return "en"
+
+
+@lru_cache(maxsize=65536)
+def _parse(text, locale):
+    match = _NUMBER.match(text)
+    if match is None:
+        return None
+    digits = match['digits']
+    translated = digits.translate(_TRANSLATIONS[_digits_locale(digits) if locale == 'auto' else locale])
+    try:
+        number = Decimal(translated)
+    except ArithmeticError:
+        return None
+    suffix = (match['suffix'] or '').rstrip('.').lower()
+    if suffix:
+        number *= SUFFIXES[suffix]
+    if match['sign'] in _NEGATIVE or match['sign2'] in _NEGATIVE:
+        number = -number
+    unit = match['unit'] or match['prefix']
+    if unit and unit != '%':
+        unit = CURRENCIES.get(unit, unit)
+    return float(number), unit
+
+
+def parse_number(text, locale='auto'):
+    """
+    Parse a number as eToro displays it.
+
+    Understands signs, currency symbols or codes before or after the number,
+    a trailing '%', K/M/B (and Tsd./Mio./Mrd.) suffixes, and thousands and
+    decimal separators of English and German pages.
+
+    Args:
+        text: The displayed text, e.g. '+12.34%', '$1.2K' or '1.234,50 €'
+        locale: 'en', 'de' or 'auto' to decide from the text
+
+    Returns:
+        The number as a float (12.34 for '12.34%'), or None if the text is not a number
+
+    Raises:
+        ValueError: If the locale is unknown
+    """
+    parsed = parse_value(text, locale)
+    return parsed[0] if parsed else None
+
+
+def parse_value(text, locale='auto'):
+    """
+    Like parse_number, but also returns the unit.
+
+    Returns:
+        Tuple (number, unit), unit being '%', a currency code like 'USD' or
+        None; or None if the text is not a number
+    """
+    if locale != 'auto' and locale not in LOCALES:
+        raise ValueError(f"Unknown locale '{locale}' (choose from auto, {', '.join(LOCALES)})")
+    if not isinstance(text, str):
+        return None
+    # Results are cached: the same few thousand strings recur across snapshots
+    return _parse(text, locale)
+
+
+def typed_value(value, locale='auto'):
+    """
+    Turn a displayed value into ``{'raw', 'value', 'unit'}``.
+
+    Numeric strings get their parsed number next to the raw text; numbers
+    (e.g. from the JSON APIs) get ``raw`` None. Anything else, including
+    text that is not a number, is returned unchanged.
+    """
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, (int, float)):
+        return {'raw': None, 'value': float(value), 'unit': None}
+    parsed = parse_value(value, locale)
+    if parsed is None:
+        return value
+    return {'raw': value, 'value': parsed[0], 'unit': parsed[1]}
+
+
+def typed_values(data, locale='auto', keys=None):
+    """
+    Apply typed_value() to the leaves of extracted data (dicts and lists).
+
+    Args:
+        data: An extractor's output
+        locale: See parse_number
+        keys: Only convert values under these dict keys (default: all)
+
+    Returns:
+        A copy of ``data`` with typed values
+    """
+    if isinstance(data, dict):
+        return {key: typed_values(value, locale, keys) if isinstance(value, (dict, list))
+                else typed_value(value, locale) if keys is None or key in keys else value
+                for key, value in data.items()}
+    if isinstance(data, list):
+        return [typed_values(item, locale, keys) if isinstance(item, (dict, list))
+                else typed_value(item, locale) for item in data]
+    return typed_value(data, locale)
+
+
+def raw_values(data):
+    """
+    Undo typed_values(): give each typed value's raw text again, or its
+    number where there was none (values from the JSON APIs).
+
+    Data without typed values comes back unchanged.
+    """
+    if isinstance(data, dict):
+        if data.keys() == {'raw', 'value', 'unit'}:
+            return data['value'] if data['raw'] is None else data['raw']
+        return {key: raw_values(value) for key, value in data.items()}
+    if isinstance(data, list):
+        return [raw_values(item) for item in data]
+    return data
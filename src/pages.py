@@ -0,0 +1,124 @@
+import os
+import re
+
+
+ETORO_BASE_URL = "https://www.etoro.com"
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+
+# Page types in download order, mapped to their path below /people/{user}.
+PAGE_PATHS = {
+    "profile": "",
+    "stats": "/stats",
+    "portfolio": "/portfolio",
+    "chart": "/chart",
+}
+
+PAGE_TYPES = tuple(PAGE_PATHS)
+
+# CSS selectors that must be present before a page counts as rendered. The
+# first entry is the page's main container; the rest are the elements the
+# extractors read, so a page is not saved before its data has arrived.
+REQUIRED_SELECTORS = {
+    "profile": (
+        '[automation-id="user-stats-chart-container"]',
+        '[automation-id="stats-chart-full-month"]',
+        '[automation-id="return-ytd-data-value-parameter"]',
+        '[automation-id="stats-chart-profitable-weeks-parameter"]',
+    ),
+    "stats": (
+        'et-card-content',
+        '[automation-id="compare-user-performance-value"]',
+    ),
+    "portfolio": (
+        'et-portfolio-group-list',
+    ),
+    "chart": (
+        'et-chart-container',
+    ),
+}
+
+# Example pages in example/ by page type, for benchmarks.
+EXAMPLE_PAGES = {
+    "profile": ("portfolio", "person-url-1.txt"),
+    "stats": ("portfolio", "person-url-statts.txt"),
+    "portfolio": ("input", "InputContent.txt"),
+}
+
+
+def load_pages(folder=None, page_types=tuple(EXAMPLE_PAGES)):
+    """
+    Load pages to benchmark against.
+
+    Args:
+        folder: Download folder to read the pages from (plain or snapshot
+                store); None for the example pages
+        page_types: Page types to load
+
+    Returns:
+        Dict of page type to HTML, for the pages that were found
+    """
+    pages = {}
+    if folder:
+        from src.snapshot_store import load_page
+        for page_type in page_types:
+            html = load_page(folder, page_type)
+            if html is not None:
+                pages[page_type] = html
+        return pages
+
+    example_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'example')
+    for page_type in page_types:
+        with open(os.path.join(example_dir, *EXAMPLE_PAGES[page_type]), encoding='utf-8') as f:
+            pages[page_type] = f.read()
+    return pages
+
+
+def build_page_urls(person, base_url=ETORO_BASE_URL, pages=None):
+    """
+    Build the list of (url, page_type) pairs to download for a user.
+
+    Args:
+        person: eToro username
+        base_url: Site root, overridable to point at a local stand-in server
+        pages: Page types to include (default: all)
+
+    Returns:
+        List of (url, page_type) tuples in download order
+    """
+    base_url = base_url.rstrip('/')
+    return [(f"{base_url}/people/{person}{path}", page_type) for page_type, path in PAGE_PATHS.items()
+            if pages is None or page_type in pages]
+
+
+_ATTRIBUTE_SELECTOR = re.compile(r'^\[([\w-]+)="([^"]*)"\]$')
+_TAG_SELECTOR = re.compile(r'^[a-zA-Z][\w-]*$')
+
+
+def missing_selectors(html, selectors):
+    """
+    Return the selectors that do not match anything in an HTML string.
+
+    The attribute (``[name="value"]``) and tag selectors used in
+    REQUIRED_SELECTORS are checked with a plain text search, so validating a
+    page does not require parsing it. Other selectors are resolved with
+    BeautifulSoup.
+    """
+    missing = []
+    soup = None
+    for selector in selectors:
+        attribute = _ATTRIBUTE_SELECTOR.match(selector)
+        if attribute:
+            name, value = attribute.groups()
+            pattern = rf'\s{re.escape(name)}\s*=\s*["\']{re.escape(value)}["\']'
+            found = re.search(pattern, html) is not None
+        elif _TAG_SELECTOR.match(selector):
+            found = re.search(rf'<{re.escape(selector)}[\s/>]', html, re.IGNORECASE) is not None
+        else:
+            if soup is None:
+                from src.html_backend import make_soup
+                soup = make_soup(html)
+            found = soup.select_one(selector) is not None
+        if not found:
+            missing.append(selector)
+    return missing
@@ -0,0 +1,279 @@
+import argparse
+import hashlib
+import importlib.util
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from functools import lru_cache
+
+CACHE_FILE_NAME = 'parse_cache.sqlite'
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# The modules whose code decides an extractor's output: changing any of them
+# gives the extractor a new version, which invalidates its cached results.
+EXTRACTOR_MODULES = {
+    'performance': ('src.performance_parser',),
+    'stats': ('src.stats_parser', 'src.performance_parser', 'src.strategy_cache'),
+    'portfolio': ('src.parser', 'src.portfolio_stream', 'src.portfolio_types'),
+}
+SHARED_MODULES = ('src.extract_spec', 'src.normalize', 'src.parsed_page', 'src.html_slim', 'src.label_index',
+                  'src.html_backend', 'src.network_capture')
+
+# Files changed this recently may still change within the same mtime tick,
+# so their hash is not remembered.
+RACY_SECONDS = 2.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY, mtime_ns INTEGER NOT NULL, size INTEGER NOT NULL, digest TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS results (
+    digest TEXT NOT NULL, extractor TEXT NOT NULL, version TEXT NOT NULL,
+    data BLOB NOT NULL, size INTEGER NOT NULL, accessed REAL NOT NULL,
+    PRIMARY KEY (digest, extractor, version)
+);
+CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed);
+"""
+
+_MISSING = object()
+
+_default = None
+_default_lock = threading.Lock()
+
+
+@lru_cache(maxsize=None)
+def extractor_version(extractor):
+    """
+    Version of an extractor: a hash of the source of the modules it runs.
+
+    Args:
+        extractor: 'performance', 'stats' or 'portfolio', optionally with a
+                   suffix naming the input ('stats.api', 'stats.html')
+
+    Raises:
+        KeyError: If the extractor is unknown
+    """
+    digest = hashlib.sha256()
+    for name in EXTRACTOR_MODULES[extractor.split('.')[0]] + SHARED_MODULES:
+        with open(importlib.util.find_spec(name).origin, 'rb') as f:
+            digest.update(name.encode('utf-8') + b'\0' + f.read())
+    return digest.hexdigest()[:16]
+
+
+class ParseCache:
+    """
+    Persistent cache of extraction results, keyed by (content hash, extractor, extractor version).
+
+    Unchanged pages are not parsed again: the content hash of a plain file
+    is remembered with its mtime and size, so a rerun only stats the file,
+    and pages in the snapshot store already carry their hash in the
+    manifest. Results are stored as compressed JSON in a SQLite database
+    that several processes (the pipeline's and reparse's workers) can share.
+    Once the results take more than ``max_bytes``, the least recently used
+    are evicted; results of outdated extractor versions are never used
+    again and so go first.
+
+    Args:
+        path: SQLite file (None for an in-memory cache)
+        max_bytes: Size budget of the stored results
+    """
+
+    def __init__(self, path=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._db = None
+
+    def _connect(self):
+        if self._db is None:
+            if self.path is not None:
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            try:
+                self._db = self._open()
+            except sqlite3.DatabaseError as e:
+                # A cache is disposable: start over rather than fail the parse
+                print(f"Parse cache {self.path} is unreadable ({e}); starting a new one.")
+                os.remove(self.path)
+                self._db = self._open()
+        return self._db
+
+    def _open(self):
+        db = sqlite3.connect(self.path or ':memory:', timeout=30, check_same_thread=False)
+        try:
+            # WAL lets processes read while another writes; NORMAL sync is enough for a cache
+            db.execute('PRAGMA journal_mode=WAL')
+            db.execute('PRAGMA synchronous=NORMAL')
+            db.executescript(_SCHEMA)
+        except sqlite3.DatabaseError:
+            db.close()
+            raise
+        return db
+
+    def file_digest(self, path):
+        """
+        Return the SHA-256 of a file's bytes, re-hashing it only when its mtime or size changed.
+        """
+        stat = os.stat(path)
+        path = os.path.abspath(path)
+        with self._lock:
+            row = self._connect().execute('SELECT mtime_ns, size, digest FROM files WHERE path = ?',
+                                          (path,)).fetchone()
+        if row is not None and row[0] == stat.st_mtime_ns and row[1] == stat.st_size:
+            return row[2]
+
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+        digest = digest.hexdigest()
+        if time.time() - stat.st_mtime > RACY_SECONDS:
+            with self._lock, self._connect() as db:
+                db.execute('INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?)',
+                           (path, stat.st_mtime_ns, stat.st_size, digest))
+        return digest
+
+    def page_digest(self, download_dir, page_type):
+        """
+        Return the content hash of a downloaded page (see snapshot_store.page_source), or None if there is none.
+        """
+        from src.snapshot_store import page_source
+
+        source = page_source(download_dir, page_type)
+        if source is None:
+            return None
+        kind, location = source
+        return self.file_digest(location) if kind == 'file' else location
+
+    def get(self, digest, extractor, default=None):
+        """Return the cached result of an extractor for some content, or ``default``."""
+        version = extractor_version(extractor)
+        with self._lock, self._connect() as db:
+            row = db.execute('SELECT data FROM results WHERE digest = ? AND extractor = ? AND version = ?',
+                             (digest, extractor, version)).fetchone()
+            if row is None:
+                self.misses += 1
+                return default
+            db.execute('UPDATE results SET accessed = ? WHERE digest = ? AND extractor = ? AND version = ?',
+                       (time.time(), digest, extractor, version))
+            self.hits += 1
+        return json.loads(zlib.decompress(row[0]))
+
+    def put(self, digest, extractor, value):
+        """Store an extractor's (JSON-serializable) result for some content."""
+        data = zlib.compress(json.dumps(value, ensure_ascii=False).encode('utf-8'), 1)
+        with self._lock, self._connect() as db:
+            db.execute('INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?)',
+                       (digest, extractor, extractor_version(extractor), data, len(data), time.time()))
+
+    def cached(self, digest, extractor, compute):
+        """
+        Return the cached result for some content, or compute and store it.
+
+        Args:
+            digest: Content hash of the extractor's input
+            extractor: Extractor name, see extractor_version()
+            compute: Callable running the extractor
+        """
+        value = self.get(digest, extractor, _MISSING)
+        if value is _MISSING:
+            value = compute()
+            self.put(digest, extractor, value)
+        return value
+
+    def evict(self, max_bytes=None):
+        """
+        Drop the least recently used results until they fit the size budget
+        (``max_bytes``, default: the cache's). Run once per run, see
+        pipeline.save_caches().
+
+        Returns:
+            Number of results dropped
+        """
+        budget = self.max_bytes if max_bytes is None else max_bytes
+        with self._lock, self._connect() as db:
+            total = db.execute('SELECT COALESCE(SUM(size), 0) FROM results').fetchone()[0]
+            dropped = []
+            for digest, extractor, version, size in db.execute(
+                    'SELECT digest, extractor, version, size FROM results ORDER BY accessed'):
+                if total <= budget:
+                    break
+                dropped.append((digest, extractor, version))
+                total -= size
+            db.executemany('DELETE FROM results WHERE digest = ? AND extractor = ? AND version = ?', dropped)
+        return len(dropped)
+
+    def stats(self):
+        """
+        Returns:
+            Dict with the number of ``results`` and their ``bytes``, the
+            remembered ``files``, the size budget and this process's hits and misses
+        """
+        with self._lock:
+            db = self._connect()
+            results, size = db.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results').fetchone()
+            files = db.execute('SELECT COUNT(*) FROM files').fetchone()[0]
+        return {'results': results, 'bytes': size, 'max_bytes': self.max_bytes, 'files': files,
+                'hits': self.hits, 'misses': self.misses}
+
+    def clear(self):
+        with self._lock, self._connect() as db:
+            db.execute('DELETE FROM results')
+            db.execute('DELETE FROM files')
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+
+def default_cache_path():
+    from src.dependencies import cache_dir
+
+    return os.path.join(cache_dir(), CACHE_FILE_NAME)
+
+
+def get_parse_cache():
+    """
+    Return the process-wide ParseCache, stored in the EtoroHelper cache directory.
+
+    Returns None when $ETOROHELPER_PARSE_CACHE is 'off' (main.py --no-parse-cache).
+    The size budget is $ETOROHELPER_PARSE_CACHE_MB megabytes (default: 256).
+    """
+    global _default
+    if os.environ.get('ETOROHELPER_PARSE_CACHE', '').lower() in ('0', 'off', 'false', 'no'):
+        return None
+    with _default_lock:
+        if _default is None:
+            megabytes = os.environ.get('ETOROHELPER_PARSE_CACHE_MB')
+            max_bytes = int(float(megabytes) * 1024 * 1024) if megabytes else DEFAULT_MAX_BYTES
+            _default = ParseCache(default_cache_path(), max_bytes)
+        return _default
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Show or trim the cache of extraction results')
+    parser.add_argument('--clear', action='store_true', help='Drop all cached results')
+    parser.add_argument('--max-mb', type=float, help='Evict least recently used results down to this many megabytes')
+    args = parser.parse_args()
+
+    cache = get_parse_cache() or ParseCache(default_cache_path())
+    if args.clear:
+        cache.clear()
+        print(f"Cleared {cache.path}")
+        return
+    if args.max_mb is not None:
+        dropped = cache.evict(int(args.max_mb * 1024 * 1024))
+        print(f"Evicted {dropped} result(s)")
+    stats = cache.stats()
+    print(f"{cache.path}: {stats['results']} result(s), {stats['bytes'] / 1024 / 1024:.2f} MB "
+          f"of {stats['max_bytes'] / 1024 / 1024:.0f} MB, {stats['files']} file hash(es) remembered")
+
+
+if __name__ == "__main__":
+    main()
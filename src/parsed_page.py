@@ -0,0 +1,171 @@
+import importlib
+from collections.abc import Mapping
+
+from src.html_backend import make_soup
+from src.html_slim import slim_html
+from src.label_index import LabelIndex
+
+# Extractors runnable by name against a ParsedPage, as 'module:function' so
+# registering one doesn't import it (or BeautifulSoup) until it is used.
+EXTRACTORS = {
+    "portfolio": "src.parser:extract_portfolio_data",
+    "performance": "src.performance_parser:extract_performance_data",
+    "stats": "src.stats_parser:extract_stats_data",
+}
+
+
+def register_extractor(name, extractor):
+    """
+    Make an extractor available to ParsedPage.extract().
+
+    Args:
+        name: Name the extractor is run by
+        extractor: Callable taking a ParsedPage, or its 'module:function' path
+    """
+    EXTRACTORS[name] = extractor
+
+
+def get_extractor(name):
+    """
+    Raises:
+        KeyError: If no extractor is registered under the name
+    """
+    extractor = EXTRACTORS[name]
+    if isinstance(extractor, str):
+        module, function = extractor.split(':')
+        extractor = EXTRACTORS[name] = getattr(importlib.import_module(module), function)
+    return extractor
+
+
+class ParsedPage:
+    """
+    One HTML page, parsed at most once and shared by every extractor.
+
+    The tree, label indexes and the fields of compiled extraction specs are
+    built on first use and kept, so running several extractors against the
+    same page costs a single parse and a single walk per index or spec.
+    Markup no extractor reads is cut out (src/html_slim.py) before parsing.
+
+    Args:
+        html: The page's HTML
+        source: Where the page came from (path or description), for messages
+        backend: HTML backend to parse with (default: the selected one)
+        slim: Slim the HTML before parsing it
+    """
+
+    def __init__(self, html, source=None, backend=None, slim=True):
+        self.html = html
+        self.source = source
+        self.backend = backend
+        self.slim = slim
+        self._soup = None
+        self._labels = {}
+        self._fields = {}
+
+    @classmethod
+    def from_file(cls, path, backend=None):
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(f.read(), source=path, backend=backend)
+
+    @classmethod
+    def from_download(cls, download_dir, page_type, backend=None):
+        """
+        Load a downloaded page from {page_type}.html or the snapshot store.
+
+        Returns:
+            A ParsedPage, or None if the folder holds no such page
+        """
+        from src.snapshot_store import load_page
+
+        html = load_page(download_dir, page_type)
+        if html is None:
+            return None
+        return cls(html, source=f"{download_dir}/{page_type}", backend=backend)
+
+    @property
+    def soup(self):
+        if self._soup is None:
+            self._soup = make_soup(slim_html(self.html) if self.slim else self.html, self.backend)
+        return self._soup
+
+    def labels(self, labels):
+        """
+        Return the LabelIndex of a set of ``(label, match)`` pairs, built once per set.
+        """
+        key = tuple(labels)
+        if key not in self._labels:
+            self._labels[key] = LabelIndex(self.soup, key)
+        return self._labels[key]
+
+    def fields(self, spec):
+        """
+        Return the fields of a CompiledSpec (src/extract_spec.py), extracted once per spec.
+        """
+        if spec not in self._fields:
+            self._fields[spec] = spec.extract(self.soup)
+        return self._fields[spec]
+
+    def extract(self, *names):
+        """
+        Run registered extractors against this one parse.
+
+        Args:
+            names: Names of registered extractors (default: all of them)
+
+        Returns:
+            Dict of extractor name to its result
+        """
+        return {name: get_extractor(name)(self) for name in (names or list(EXTRACTORS))}
+
+
+def as_parsed_page(page):
+    """Accept either HTML or a ParsedPage and return a ParsedPage."""
+    return page if isinstance(page, ParsedPage) else ParsedPage(page)
+
+
+class LazySections(Mapping):
+    """
+    Read-only mapping of section name to extracted data, computed on first access.
+
+    Each section is extracted from the shared ParsedPage when it is first
+    read and then cached, so a caller that only reads one section only pays
+    for that one. ``dict(sections)`` extracts them all, in the given order.
+
+    Args:
+        page: The ParsedPage to extract from
+        extractors: Ordered dict of section name to a function taking the page
+        sections: Names of the sections to offer (default: all of ``extractors``)
+
+    Raises:
+        ValueError: If a section name is unknown
+    """
+
+    def __init__(self, page, extractors, sections=None):
+        if sections is None:
+            sections = list(extractors)
+        else:
+            unknown = [name for name in sections if name not in extractors]
+            if unknown:
+                raise ValueError(f"Unknown section: {', '.join(unknown)} (choose from {', '.join(extractors)})")
+        self.page = page
+        # Output order follows ``extractors``, whatever order the sections were asked for in.
+        self._names = [name for name in extractors if name in sections]
+        self._extractors = extractors
+        self._cache = {}
+
+    def __getitem__(self, name):
+        if name not in self._names:
+            raise KeyError(name)
+        if name not in self._cache:
+            self._cache[name] = self._extractors[name](self.page)
+        return self._cache[name]
+
+    def __iter__(self):
+        return iter(self._names)
+
+    def __len__(self):
+        return len(self._names)
+
+    def computed(self):
+        """Names of the sections extracted so far."""
+        return [name for name in self._names if name in self._cache]
@@ -2,62 +2,125 @@ import json
 import os
 import sys
 
-# Add the project root to sys.path to allow importing src.dependencies if run directly or from subfolder
+# Add the project root to sys.path to allow importing src modules if run directly or from subfolder
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from src.dependencies import install_if_not_exists
-
-# Check and install BeautifulSoup
-install_if_not_exists("beautifulsoup4", "bs4")
-
-from bs4 import BeautifulSoup
-
-def extract_portfolio_data(html_content):
-    soup = BeautifulSoup(html_content, 'html.parser')
-    rows = soup.find_all('div', class_='et-table-row')
-    portfolio = []
-
-    for row in rows:
-        # 1. Extract Name/Ticker from the first cell
-        first_cell = row.find('div', class_='et-table-first-cell')
-        if not first_cell:
-            continue
-            
-        ticker = None
-        company_name = None
-        item_type = "Instrument" # Default to Instrument
-        
-        # Ticker
-        ticker_div = first_cell.find('div', attrs={'automation-id': 'portfolio-overview-table-body-cell-market-name'})
-        if ticker_div:
-            # Use the first span if available to avoid getting extra tags like "24/5"
-            span = ticker_div.find('span')
-            if span:
-                ticker = span.text.strip()
-            else:
-                ticker = ticker_div.text.strip()
-        
-        # Company Name & Type Detection
-        # Check for standard company name (Instrument)
-        name_span = first_cell.find('span', attrs={'automation-id': 'portfolio-overview-table-body-cell-market-last-name'})
-        if name_span:
-            company_name = name_span.text.strip()
-        else:
-            # Check for mirror display name (Person/Copy Trader)
-            mirror_span = first_cell.find('span', attrs={'automation-id': 'portfolio-overview-table-body-cell-market-mirror-display-name'})
-            if mirror_span:
-                company_name = mirror_span.text.strip()
-                item_type = "Person"
-
-        # 2. Extract Data Cells
-        body_slot = row.find('div', class_='et-table-body-slot')
-        if not body_slot:
-            continue
-            
-        cells = body_slot.find_all('div', class_='et-table-cell', recursive=False)
-        
-        # Initialize fields in the desired order
-        fields = {
+from src.network_capture import INSTRUMENTS_ENDPOINT, PORTFOLIO_ENDPOINT, find_api_responses, first_field
+from src.extract_spec import compile_spec, field, records, sel
+from src.normalize import parse_number, typed_value, typed_values
+from src.parsed_page import as_parsed_page
+from src.portfolio_types import PORTFOLIO_FIELDS, PortfolioRow, PortfolioTable, convert, iter_dicts, to_dicts
+
+FIRST_CELL = sel('div', class_='et-table-first-cell')
+MARKET_NAME = sel('div', automation_id='portfolio-overview-table-body-cell-market-name')
+BODY_SLOT = sel('div', class_='et-table-body-slot')
+
+def _cell(index, selector):
+    # The data cells are the direct et-table-cell children of the body slot
+    return (BODY_SLOT, sel('div', class_='et-table-cell', child=index), selector)
+
+# The fields of one portfolio table row.
+PORTFOLIO_ROW_SPEC = compile_spec({
+    # 1. Name/Ticker from the first cell
+    'first_cell': field(FIRST_CELL, value=None),
+    # Use the first span if available to avoid getting extra tags like "24/5"
+    'ticker': field((FIRST_CELL, MARKET_NAME, sel('span')), (FIRST_CELL, MARKET_NAME)),
+    # Standard company name (Instrument), else mirror display name (Person/Copy Trader)
+    'company_name': field((FIRST_CELL, sel('span', automation_id='portfolio-overview-table-body-cell-market-last-name'))),
+    'mirror_name': field((FIRST_CELL, sel('span', automation_id='portfolio-overview-table-body-cell-market-mirror-display-name'))),
+    # 2. Data cells; we expect at least 8 cells based on the table structure
+    'body_slot': field(BODY_SLOT, value=None),
+    'last_cell': field((BODY_SLOT, sel('div', class_='et-table-cell', child=7)), value=None),
+    'price': field(_cell(0, sel('div', automation_id='price-price-cell-investing-mode'))),
+    'net_value': field(_cell(2, sel('span', automation_id='portfolio-overview-table-body-cell-equity'))),
+    'asset_pnl': field(_cell(3, sel('span', automation_id='portfolio-overview-table-body-cell-asset-pnl'))),
+    'change_percent': field(_cell(4, sel('div', automation_id='portfolio-overview-table-body-cell-change'))),
+    'daily_pnl': field(_cell(5, sel('span', automation_id='portfolio-overview-table-body-cell-profit-amount-daily'))),
+    'gain_percent': field(_cell(6, sel('span', automation_id='portfolio-overview-table-body-cell-gain'))),
+    # Market exposure usually lacks a specific automation-id for the value, so we look for the body class
+    'market_exposure': field(_cell(7, sel('span', class_='table-cell-body'))),
+})
+
+# Cell fields, all output as numbers (or typed values, when asked for).
+CELL_FIELDS = ('price', 'net_value', 'asset_pnl', 'change_percent', 'daily_pnl', 'gain_percent', 'market_exposure')
+
+def _position(row, typed=False, locale='auto'):
+    """Turn the fields of PORTFOLIO_ROW_SPEC into a position, or None if the row isn't one."""
+    if row['first_cell'] is None or row['body_slot'] is None:
+        return None
+
+    fields = {'ticker': row['ticker'], 'company_name': row['company_name'], 'type': "Instrument"}
+    if row['company_name'] is None and row['mirror_name'] is not None:
+        fields['company_name'] = row['mirror_name']
+        fields['type'] = "Person"
+    # Rows with fewer cells than expected keep their data fields empty
+    has_cells = row['last_cell'] is not None
+    for key in CELL_FIELDS:
+        value = row[key] if has_cells else None
+        if value is not None and typed:
+            value = typed_value(value, locale)
+        elif value is not None:
+            value = parse_number(value, locale)
+        fields[key] = value
+    return fields
+
+# Every row of a portfolio page, extracted in one traversal.
+PORTFOLIO_SPEC = compile_spec({
+    'rows': records(sel('div', class_='et-table-row'), PORTFOLIO_ROW_SPEC),
+})
+
+def extract_portfolio_data(html_content, typed=False, locale='auto', output='dicts'):
+    """
+    Extracts the positions of a portfolio page (its HTML or a ParsedPage).
+
+    Args:
+        html_content: The page's HTML or a ParsedPage
+        typed: Give the cell fields as ``{'raw', 'value', 'unit'}`` (see src/normalize.py)
+        locale: Number format of the page: 'en', 'de' or 'auto'
+        output: 'dicts' (a list of dicts), 'rows' (a list of PortfolioRow) or
+                'table' (a PortfolioTable; not with ``typed``), see src/portfolio_types.py
+    """
+    rows = as_parsed_page(html_content).fields(PORTFOLIO_SPEC)['rows']
+    positions = (_position(row, typed, locale) for row in rows)
+    positions = [fields for fields in positions if fields is not None]
+    return convert(positions, output)
+
+def portfolio_row(row, typed=False, locale='auto'):
+    """
+    Extracts one position from a portfolio table row.
+
+    Works on BeautifulSoup tags as well as the row trees built by
+    src/portfolio_stream.py.
+
+    Returns:
+        The row's fields, or None if it is not a position row
+    """
+    return _position(PORTFOLIO_ROW_SPEC.extract(row), typed, locale)
+
+def extract_portfolio_data_from_api(responses, typed=False, output='dicts'):
+    """
+    Builds the portfolio rows from the JSON responses captured while the portfolio
+    page loaded (see src/network_capture.py), without touching the DOM.
+
+    The public portfolio endpoint only exposes relative figures, so only the
+    ticker, name, type and gain percentage are filled in. Returns None when the
+    responses contain no portfolio so callers can fall back to the HTML. With
+    ``typed``, the cell fields are given like extract_portfolio_data(typed=True),
+    and ``output`` picks the return type as it does there.
+    """
+    # Instrument id -> (ticker, display name) from the instruments metadata endpoint
+    instruments = {}
+    for response in find_api_responses(responses, INSTRUMENTS_ENDPOINT):
+        for item in first_field(response['body'], 'InstrumentDisplayDatas') or []:
+            instruments[item.get('InstrumentID')] = (item.get('SymbolFull'), item.get('InstrumentDisplayName'))
+
+    portfolios = find_api_responses(responses, PORTFOLIO_ENDPOINT)
+    if not portfolios:
+        return None
+    body = portfolios[0]['body']
+
+    def make_row(ticker, company_name, item_type, gain):
+        return {
             'ticker': ticker,
             'company_name': company_name,
             'type': item_type,
@@ -66,77 +129,40 @@ def extract_portfolio_data(html_content):
             'asset_pnl': None,
             'change_percent': None,
             'daily_pnl': None,
-            'gain_percent': None,
+            'gain_percent': float(gain) if isinstance(gain, (int, float)) else None,
             'market_exposure': None
         }
-        
-        # We expect at least 8 cells based on the table structure
-        if len(cells) >= 8:
-            # Cell 0: Price
-            price_div = cells[0].find('div', attrs={'automation-id': 'price-price-cell-investing-mode'})
-            if price_div:
-                try:
-                    fields['price'] = float(price_div.text.strip().replace(',', ''))
-                except ValueError:
-                    pass
-            
-            # Cell 2: Net Value (Equity)
-            equity_span = cells[2].find('span', attrs={'automation-id': 'portfolio-overview-table-body-cell-equity'})
-            if equity_span:
-                try:
-                    fields['net_value'] = float(equity_span.text.strip().replace('$', '').replace(',', ''))
-                except ValueError:
-                    pass
-
-            # Cell 3: Asset P/L
-            pnl_span = cells[3].find('span', attrs={'automation-id': 'portfolio-overview-table-body-cell-asset-pnl'})
-            if pnl_span:
-                fields['asset_pnl'] = pnl_span.text.strip()
-
-            # Cell 4: Change %
-            change_div = cells[4].find('div', attrs={'automation-id': 'portfolio-overview-table-body-cell-change'})
-            if change_div:
-                try:
-                    fields['change_percent'] = float(change_div.text.strip().replace('%', '').replace(',', ''))
-                except ValueError:
-                    pass
-
-            # Cell 5: Daily P/L
-            daily_span = cells[5].find('span', attrs={'automation-id': 'portfolio-overview-table-body-cell-profit-amount-daily'})
-            if daily_span:
-                try:
-                    fields['daily_pnl'] = float(daily_span.text.strip().replace('$', '').replace(',', ''))
-                except ValueError:
-                    pass
-
-            # Cell 6: Gain %
-            gain_span = cells[6].find('span', attrs={'automation-id': 'portfolio-overview-table-body-cell-gain'})
-            if gain_span:
-                try:
-                    fields['gain_percent'] = float(gain_span.text.strip().replace('%', '').replace(',', ''))
-                except ValueError:
-                    pass
-
-            # Cell 7: Market Exposure
-            # This usually lacks a specific automation-id for the value, so we look for the body class
-            exposure_span = cells[7].find('span', class_='table-cell-body')
-            if exposure_span:
-                fields['market_exposure'] = exposure_span.text.strip()
-        
-        portfolio.append(fields)
 
-    return portfolio
+    portfolio = []
+    for position in first_field(body, 'AggregatedPositions') or []:
+        ticker, company_name = instruments.get(position.get('InstrumentID'), (None, None))
+        if ticker is None:
+            ticker = str(position.get('InstrumentID'))
+        portfolio.append(make_row(ticker, company_name, "Instrument", position.get('NetProfit')))
+
+    for mirror in first_field(body, 'AggregatedMirrors') or []:
+        name = mirror.get('ParentUsername')
+        portfolio.append(make_row(name, name, "Person", mirror.get('NetProfit')))
+
+    if typed:
+        portfolio = typed_values(portfolio, keys=CELL_FIELDS)
+    return convert(portfolio, output)
 
 def generate_json(portfolio, output_path):
+    """Writes positions (dicts, PortfolioRows or a PortfolioTable) as a JSON list of objects."""
     with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(portfolio, f, indent=2, ensure_ascii=False)
+        json.dump(to_dicts(portfolio), f, indent=2, ensure_ascii=False)
 
 def generate_markdown(portfolio, output_path):
-    if not portfolio:
+    """Writes positions (dicts, PortfolioRows or a PortfolioTable) as a Markdown table."""
+    if not len(portfolio):
         return
 
-    # Use the keys from the first item to determine headers and order
-    headers = list(portfolio[0].keys())
+    if isinstance(portfolio, PortfolioTable) or isinstance(portfolio[0], PortfolioRow):
+        headers = list(PORTFOLIO_FIELDS)
+    else:
+        # Use the keys from the first item to determine headers and order
+        headers = list(portfolio[0].keys())
     
     with open(output_path, 'w', encoding='utf-8') as f:
         # Generate Header Row
@@ -147,7 +173,7 @@ def generate_markdown(portfolio, output_path):
         f.write("| " + " | ".join(['-' * len(name) for name in header_names]) + " |\n")
         
         # Generate Data Rows
-        for item in portfolio:
+        for item in iter_dicts(portfolio):
             row_values = []
             for key in headers:
                 value = item.get(key)
@@ -159,7 +185,7 @@ def generate_markdown(portfolio, output_path):
                 if isinstance(value, (int, float)):
                     if 'percent' in key or 'gain' in key or 'change' in key:
                         row_values.append(f"{value}%")
-                    elif 'net_value' in key or 'daily_pnl' in key:
+                    elif 'net_value' in key or 'pnl' in key or 'exposure' in key:
                         row_values.append(f"${value}")
                     elif 'price' in key:
                         row_values.append(f"${value}")
@@ -1,63 +1,131 @@
 import json
-from bs4 import BeautifulSoup
 
-def extract_performance_data(html_content):
+from src.network_capture import (
+    DEFAULT_RANKINGS_PERIOD,
+    GAIN_ENDPOINT,
+    find_api_responses,
+    format_percent,
+    rankings_by_period,
+)
+from src.extract_spec import compile_spec, field, records, sel
+from src.normalize import typed_values
+from src.parsed_page import LazySections, as_parsed_page
+
+# Shown on the profile and on the stats page alike.
+PROFITABLE_WEEKS = field((sel('div', automation_id='stats-chart-profitable-weeks-parameter'),
+                          sel('span', class_='data-value')))
+
+def _annual_entry(candle):
+    if candle['gainLoss'] is None or candle['year'] is None:
+        return None
+    return {"year": candle['year'], "gainLoss": candle['gainLoss']}
+
+# Everything read from the profile page, extracted in one traversal.
+PERFORMANCE_SPEC = compile_spec({
+    # The candle containers represent yearly performance; their tooltip holds the precise values
+    'annualPerformance': records(sel('div', automation_id='stats-chart-full-month'), {
+        'gainLoss': field((sel('div', automation_id='stats-chart-gain-tooltip'), sel('span', class_='tooltip-number'))),
+        'year': field((sel('div', automation_id='stats-chart-gain-tooltip'), sel('span', class_='tooltip-date'))),
+    }, build=_annual_entry),
+    'renditeYTD': field(sel('span', automation_id='return-ytd-data-value-parameter')),
+    'rendite2Y': field(sel('span', automation_id='return-2y-data-value-parameter')),
+    # This is often in a div with class 'risk-default'
+    'averageRiskRatingLast7Days': field(sel('div', class_='risk-default')),
+    'profitableWeeks': PROFITABLE_WEEKS,
+})
+
+ADDITIONAL_METRICS = ('renditeYTD', 'rendite2Y', 'averageRiskRatingLast7Days', 'profitableWeeks')
+
+def find_profitable_weeks(page):
+    """
+    Returns the profitable weeks percentage of a ParsedPage, or None.
+
+    The same element is shown on the profile and on the stats page.
+    """
+    return page.fields(PERFORMANCE_SPEC)['profitableWeeks']
+
+def _annual_performance_section(page):
+    return list(page.fields(PERFORMANCE_SPEC)['annualPerformance'])
+
+def _additional_metrics_section(page):
+    fields = page.fields(PERFORMANCE_SPEC)
+    return {key: fields[key] for key in ADDITIONAL_METRICS if fields[key] is not None}
+
+# Sections of the performance data in output order, with the function extracting each.
+PERFORMANCE_SECTIONS = {
+    'annualPerformance': _annual_performance_section,
+    'additionalMetrics': _additional_metrics_section,
+}
+
+def extract_performance_data(html_content, sections=None, typed=False, locale='auto'):
     """
     Parses the HTML of an eToro user's main profile page to extract yearly performance data
     and additional metrics.
+
+    Args:
+        html_content: The page's HTML or a ParsedPage
+        sections: Names of the PERFORMANCE_SECTIONS to extract (default: all)
+        typed: Give numeric values as ``{'raw', 'value', 'unit'}`` (see src/normalize.py)
+        locale: Number format of the page: 'en', 'de' or 'auto'
+
+    Raises:
+        ValueError: If a section name is unknown
+    """
+    data = dict(lazy_performance_data(html_content, sections))
+    return typed_values(data, locale) if typed else data
+
+def lazy_performance_data(html_content, sections=None):
     """
-    soup = BeautifulSoup(html_content, 'html.parser')
-    
-    # --- Extract Annual Performance ---
+    Like extract_performance_data, but returns a LazySections mapping that
+    extracts each section on first access.
+    """
+    return LazySections(as_parsed_page(html_content), PERFORMANCE_SECTIONS, sections)
+
+def extract_performance_data_from_api(responses, typed=False):
+    """
+    Builds the performance data from the JSON responses captured while the profile
+    page loaded (see src/network_capture.py), without touching the DOM.
+
+    Returns the same structure as extract_performance_data(), or None when the
+    responses contain no performance data so callers can fall back to the HTML.
+    With ``typed``, numeric values are given like extract_performance_data(typed=True).
+    """
+    # --- Annual Performance from the gain endpoint, most recent year first ---
     annual_performance = []
-    # Find all the candle containers, which represent yearly performance
-    # Note: The provided example uses 'div' for automation_id='stats-chart-full-month'
-    # but we should be flexible if it's a different tag, though attrs usually works best.
-    candles = soup.find_all('div', attrs={'automation-id': 'stats-chart-full-month'})
-
-    for candle in candles:
-        # The tooltip contains the precise values
-        gain_tooltip = candle.find('div', attrs={'automation-id': 'stats-chart-gain-tooltip'})
-        
-        if gain_tooltip:
-            gain_loss_span = gain_tooltip.find('span', class_='tooltip-number')
-            year_span = gain_tooltip.find('span', class_='tooltip-date')
-            
-            if gain_loss_span and year_span:
-                gain_loss = gain_loss_span.text.strip()
-                year = year_span.text.strip()
+    for response in find_api_responses(responses, GAIN_ENDPOINT):
+        yearly = response['body'].get('yearly') if isinstance(response['body'], dict) else None
+        for item in sorted(yearly or [], key=lambda y: y.get('start') or '', reverse=True):
+            year = (item.get('start') or '')[:4]
+            gain_loss = format_percent(item.get('gain'))
+            if year and gain_loss:
                 annual_performance.append({"year": year, "gainLoss": gain_loss})
-    
-    # --- Extract Additional Metrics ---
+        if annual_performance:
+            break
+
+    # --- Additional Metrics from the rankings endpoint ---
     additional_metrics = {}
-    
-    # Rendite YTD
-    rendite_ytd_span = soup.find('span', attrs={'automation-id': 'return-ytd-data-value-parameter'})
-    if rendite_ytd_span:
-        additional_metrics['renditeYTD'] = rendite_ytd_span.text.strip()
-        
-    # Rendite 2Y
-    rendite_2y_span = soup.find('span', attrs={'automation-id': 'return-2y-data-value-parameter'})
-    if rendite_2y_span:
-        additional_metrics['rendite2Y'] = rendite_2y_span.text.strip()
-        
-    # Average Risk Rating
-    # This is often in a div with class 'risk-default'
-    risk_div = soup.find('div', class_='risk-default')
-    if risk_div:
-        additional_metrics['averageRiskRatingLast7Days'] = risk_div.text.strip()
-        
-    # Profitable Weeks
-    profitable_weeks_container = soup.find('div', attrs={'automation-id': 'stats-chart-profitable-weeks-parameter'})
-    if profitable_weeks_container:
-        profitable_weeks_span = profitable_weeks_container.find('span', class_='data-value')
-        if profitable_weeks_span:
-            additional_metrics['profitableWeeks'] = profitable_weeks_span.text.strip()
-
-    return {
+    if annual_performance:
+        additional_metrics['renditeYTD'] = annual_performance[0]['gainLoss']
+
+    rankings = rankings_by_period(responses)
+    two_years = rankings.get('twoyearsago', {})
+    if format_percent(two_years.get('Gain')):
+        additional_metrics['rendite2Y'] = format_percent(two_years.get('Gain'))
+
+    ranking = rankings.get(DEFAULT_RANKINGS_PERIOD) or next(iter(rankings.values()), {})
+    if ranking.get('RiskScore') is not None:
+        additional_metrics['averageRiskRatingLast7Days'] = str(ranking['RiskScore'])
+    if format_percent(ranking.get('ProfitableWeeksPct')):
+        additional_metrics['profitableWeeks'] = format_percent(ranking['ProfitableWeeksPct'])
+
+    if not annual_performance and not additional_metrics:
+        return None
+
+    data = {
         "annualPerformance": annual_performance,
         "additionalMetrics": additional_metrics
     }
+    return typed_values(data) if typed else data
 
 def generate_performance_json(data, output_path):
     """
@@ -0,0 +1,330 @@
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+# Downloaded page types that are parsed, with the name of their output files.
+PARSED_PAGES = {
+    "profile": "performance",
+    "stats": "stats",
+    "portfolio": "portfolio",
+}
+
+_DONE = object()
+
+
+def extract_person_data(person, person_output_dir, page_types=tuple(PARSED_PAGES), typed=False):
+    """
+    Extract the data of a user's downloaded pages.
+
+    JSON API responses captured during the download ({page}.api.json) are
+    used first; the HTML pages are parsed when there are none or they hold
+    no usable data. Runs in the parse worker processes, so it only takes and
+    returns plain, picklable values.
+
+    Args:
+        person: eToro username
+        person_output_dir: Folder holding the downloaded pages
+        page_types: Page types to extract (keys of PARSED_PAGES)
+        typed: Give numeric values as ``{'raw', 'value', 'unit'}`` (see src/normalize.py)
+
+    Returns:
+        Dict of output name ('performance', 'stats', 'portfolio') to the
+        extracted data, for the pages that were found
+    """
+    from src.network_capture import api_responses_path, load_api_responses
+    from src.parse_cache import get_parse_cache
+    from src.snapshot_store import load_page, open_page, page_source
+
+    cache = get_parse_cache()
+    # Typed and plain results are cached apart
+    suffix = '.typed' if typed else ''
+    extracted = {}
+    for page_type in page_types:
+        if page_type == 'profile':
+            from src.performance_parser import extract_performance_data, extract_performance_data_from_api
+            extract_api, extract, load = extract_performance_data_from_api, extract_performance_data, load_page
+            # Plain profile.html or the snapshot store, then the legacy {person}.html
+            sources = ('profile', person)
+        elif page_type == 'stats':
+            from src.stats_parser import extract_stats_data, extract_stats_data_from_api
+            extract_api, extract, load = extract_stats_data_from_api, extract_stats_data, load_page
+            sources = ('stats',)
+        else:
+            from src.parser import extract_portfolio_data_from_api
+            # Streamed rather than read whole: portfolio pages can be very large
+            extract_api, extract, load = extract_portfolio_data_from_api, _read_portfolio_rows, open_page
+            sources = ('portfolio',)
+
+        name = PARSED_PAGES[page_type]
+        data = None
+        api_path = api_responses_path(person_output_dir, page_type)
+        if os.path.exists(api_path):
+            data = _cached(cache, cache and cache.file_digest(api_path), f'{name}.api{suffix}',
+                           lambda: extract_api(load_api_responses(person_output_dir, page_type), typed=typed))
+        if data is not None:
+            extracted[name] = data
+            continue
+
+        source = next((source for source in sources if page_source(person_output_dir, source)), None)
+        if source is None:
+            print(f"Could not find {page_type} HTML for {person} to parse.")
+            continue
+        print(f"Parsing {name} data for {person}...")
+        extracted[name] = _cached(cache, cache and cache.page_digest(person_output_dir, source), f'{name}.html{suffix}',
+                                  lambda: extract(load(person_output_dir, source), typed=typed))
+
+    return extracted
+
+
+def save_caches():
+    """
+    Persist what extraction learned, once per run: save the strategy hit
+    rates and trim the parse cache to its size budget.
+    """
+    from src.parse_cache import get_parse_cache
+    from src.strategy_cache import get_strategy_cache
+
+    # Keep the fallback strategies' hit rates for the next run (and for spotting markup drift)
+    get_strategy_cache().save()
+    cache = get_parse_cache()
+    if cache is not None:
+        cache.evict()
+
+
+def _cached(cache, digest, extractor, compute):
+    """Run an extractor through the parse cache, if there is one."""
+    if cache is None:
+        return compute()
+    return cache.cached(digest, extractor, compute)
+
+
+def _read_portfolio_rows(stream, typed=False):
+    from src.portfolio_stream import iter_portfolio_rows
+
+    with stream:
+        return list(iter_portfolio_rows(stream, typed=typed))
+
+
+def write_person_data(person, person_output_dir, extracted):
+    """
+    Write extracted data as {name}.json and {name}.md into the user's folder.
+
+    Typed values are written to the JSON as they are; the Markdown shows their raw text.
+    """
+    from src.normalize import raw_values
+
+    for name, data in extracted.items():
+        json_path = os.path.join(person_output_dir, f'{name}.json')
+        md_path = os.path.join(person_output_dir, f'{name}.md')
+        if name == 'performance':
+            from src.performance_parser import generate_performance_json, generate_performance_markdown
+            generate_performance_json(data, json_path)
+            generate_performance_markdown(raw_values(data), md_path)
+        elif name == 'stats':
+            from src.stats_parser import generate_stats_json, generate_stats_markdown
+            generate_stats_json(data, json_path)
+            generate_stats_markdown(raw_values(data), md_path)
+        else:
+            from src.parser import generate_json, generate_markdown
+            generate_json(data, json_path)
+            generate_markdown(raw_values(data), md_path)
+        print(f"{name.capitalize()} data for {person} parsed and saved.")
+
+
+def _timed_extract(person, person_output_dir, page_types, in_worker_process=True, typed=False):
+    """
+    Run extract_person_data, returning the data, the seconds it took and,
+    in a worker process, the strategy counters it recorded: the parent
+    merges and saves them once, instead of every worker after every user.
+    """
+    from src.strategy_cache import get_strategy_cache
+
+    started = time.perf_counter()
+    extracted = extract_person_data(person, person_output_dir, page_types, typed)
+    seconds = time.perf_counter() - started
+    return extracted, seconds, get_strategy_cache().take_unsaved() if in_worker_process else {}
+
+
+class StageCounter:
+    """Throughput counter of one pipeline stage."""
+
+    def __init__(self, name):
+        self.name = name
+        self.items = 0
+        self.busy_seconds = 0.0
+        self.first_started = None
+        self.last_finished = None
+        self._lock = threading.Lock()
+
+    def record(self, busy_seconds, finished=None):
+        finished = time.monotonic() if finished is None else finished
+        with self._lock:
+            self.items += 1
+            self.busy_seconds += busy_seconds
+            started = finished - busy_seconds
+            if self.first_started is None or started < self.first_started:
+                self.first_started = started
+            self.last_finished = max(self.last_finished or finished, finished)
+
+    def snapshot(self):
+        """
+        Returns:
+            Dict with the items processed, the summed busy time and the
+            items per second over the stage's active period
+        """
+        with self._lock:
+            active = (self.last_finished - self.first_started) if self.items else 0.0
+            return {
+                'items': self.items,
+                'busy_seconds': round(self.busy_seconds, 3),
+                'items_per_second': round(self.items / active, 2) if active > 0 else 0.0,
+            }
+
+
+class Pipeline:
+    """
+    Parse and write stages fed by the download stage through bounded queues.
+
+    Downloads call ``submit()`` for every finished user; a dispatcher thread
+    hands the user's pages to a process pool running the extractors, and a
+    writer thread saves the results in submission order. Both queues are
+    bounded, so a slow stage makes the one before it wait (backpressure)
+    instead of piling up parsed pages in memory.
+
+    Args:
+        parse_workers: Number of parse processes (default: CPU count)
+        queue_size: Capacity of each queue between stages
+        use_processes: Parse in processes (the default) or in threads
+        typed: Extract typed numeric values (see extract_person_data)
+    """
+
+    def __init__(self, parse_workers=None, queue_size=8, use_processes=True, typed=False):
+        self.parse_workers = parse_workers or os.cpu_count() or 1
+        self.parse_queue = queue.Queue(maxsize=queue_size)
+        self.write_queue = queue.Queue(maxsize=queue_size)
+        self.counters = {name: StageCounter(name) for name in ('download', 'parse', 'write')}
+        self.outputs = {}
+        self.errors = {}
+        self._use_processes = use_processes
+        self._typed = typed
+        self._executor = None
+        self._threads = []
+
+    def start(self):
+        if self._use_processes:
+            # 'spawn' keeps the download threads' state out of the workers.
+            self._executor = ProcessPoolExecutor(max_workers=self.parse_workers,
+                                                 mp_context=multiprocessing.get_context('spawn'))
+        else:
+            self._executor = ThreadPoolExecutor(max_workers=self.parse_workers)
+        self._threads = [threading.Thread(target=self._dispatch, daemon=True),
+                         threading.Thread(target=self._write, daemon=True)]
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def submit(self, person, person_output_dir, page_types):
+        """
+        Queue a downloaded user for parsing; blocks while the parse queue is full.
+        """
+        page_types = [page_type for page_type in page_types if page_type in PARSED_PAGES]
+        if page_types:
+            self.parse_queue.put((person, person_output_dir, page_types))
+
+    def _dispatch(self):
+        while True:
+            item = self.parse_queue.get()
+            if item is _DONE:
+                self.write_queue.put(_DONE)
+                return
+            try:
+                future = self._executor.submit(_timed_extract, *item, self._use_processes, self._typed)
+            except Exception as e:
+                # e.g. BrokenProcessPool after a worker died; keep draining so nothing blocks
+                print(f"Failed to parse data for {item[0]}: {e}")
+                self.errors[item[0]] = str(e)
+                continue
+            self.write_queue.put((item, future))
+
+    def _write(self):
+        from src.strategy_cache import get_strategy_cache
+
+        while True:
+            entry = self.write_queue.get()
+            if entry is _DONE:
+                return
+            (person, person_output_dir, _), future = entry
+            try:
+                extracted, parse_seconds, strategy_counts = future.result()
+            except Exception as e:
+                print(f"Failed to parse data for {person}: {e}")
+                self.errors[person] = str(e)
+                continue
+            get_strategy_cache().merge(strategy_counts)
+            self.counters['parse'].record(parse_seconds)
+            started = time.monotonic()
+            try:
+                write_person_data(person, person_output_dir, extracted)
+            except Exception as e:
+                print(f"Failed to write data for {person}: {e}")
+                self.errors[person] = str(e)
+                continue
+            self.counters['write'].record(time.monotonic() - started)
+            self.outputs.setdefault(person, []).extend(extracted)
+
+    def close(self):
+        """Wait for every queued user to be parsed and written, then save the caches and stop."""
+        self.parse_queue.put(_DONE)
+        for thread in self._threads:
+            thread.join()
+        self._executor.shutdown()
+        save_caches()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def stage_stats(self):
+        return {name: counter.snapshot() for name, counter in self.counters.items()}
+
+
+def run_pipeline(usernames, downloads_root='downloads', parse_workers=None, queue_size=8,
+                 use_processes=True, typed=False, **download_options):
+    """
+    Download, parse and write many users with the stages overlapping.
+
+    Args:
+        usernames: Iterable of validated eToro usernames
+        downloads_root: Root folder; pages go to {downloads_root}/{user}/{date}/
+        parse_workers: Number of parse processes (default: CPU count)
+        queue_size: Capacity of the queues between stages
+        use_processes: Parse in processes rather than threads
+        typed: Write typed numeric values (see extract_person_data)
+        download_options: Further keyword arguments for download_users
+
+    Returns:
+        The download_users summary, plus ``stages`` with per-stage counters
+    """
+    from src.batch import download_users
+
+    with Pipeline(parse_workers=parse_workers, queue_size=queue_size, use_processes=use_processes,
+                  typed=typed) as pipeline:
+        def on_result(username, download_dir, user_pages):
+            ok_pages = [page_type for page_type, page in user_pages.items() if page.get('status') == 'ok']
+            pipeline.counters['download'].record(sum(page.get('seconds') or 0.0 for page in user_pages.values()))
+            pipeline.submit(username, download_dir, ok_pages)
+
+        summary = download_users(usernames, downloads_root=downloads_root, on_result=on_result,
+                                 **download_options)
+
+    summary['stages'] = pipeline.stage_stats()
+    summary['parse_errors'] = pipeline.errors
+    for name, stats in summary['stages'].items():
+        print(f"  {name:<8} {stats['items']:>4} item(s), {stats['busy_seconds']:.2f}s busy, "
+              f"{stats['items_per_second']:.2f}/s")
+    return summary
@@ -0,0 +1,240 @@
+import argparse
+import os
+import time
+import tracemalloc
+from html.parser import HTMLParser
+
+from src.html_slim import iter_slim_html
+from src.parser import portfolio_row
+from src.portfolio_types import PortfolioRow
+
+ROW_CLASS = 'et-table-row'
+
+# Elements that never have content or an end tag.
+VOID_ELEMENTS = frozenset((
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input',
+    'link', 'meta', 'param', 'source', 'track', 'wbr',
+))
+
+# Their text is not part of a tag's .text in BeautifulSoup either.
+_SKIPPED_TEXT = frozenset(('script', 'style', 'template'))
+
+
+class RowNode:
+    """
+    Minimal element of a portfolio row tree.
+
+    Supports the part of the BeautifulSoup Tag API that portfolio_row()
+    and compiled extraction specs use: ``find``, ``find_all`` (with
+    ``class_``, ``attrs`` and ``recursive``), ``get``, ``contents`` and
+    ``text``.
+    """
+
+    __slots__ = ('name', 'attrs', 'classes', 'children')
+
+    def __init__(self, name, attrs):
+        self.name = name
+        self.attrs = attrs
+        self.classes = (attrs.get('class') or '').split()
+        self.children = []
+
+    @property
+    def contents(self):
+        return self.children
+
+    def get(self, key, default=None):
+        if key == 'class':
+            return self.classes
+        return self.attrs.get(key, default)
+
+    def _matches(self, name, attrs, class_):
+        if name is not None and self.name != name:
+            return False
+        if class_ is not None and class_ not in self.classes:
+            return False
+        return all(self.attrs.get(key) == value for key, value in (attrs or {}).items())
+
+    def _descendants(self):
+        stack = [child for child in reversed(self.children) if isinstance(child, RowNode)]
+        while stack:
+            node = stack.pop()
+            yield node
+            stack.extend(child for child in reversed(node.children) if isinstance(child, RowNode))
+
+    def find_all(self, name=None, attrs=None, class_=None, recursive=True):
+        nodes = self._descendants() if recursive else (child for child in self.children if isinstance(child, RowNode))
+        return [node for node in nodes if node._matches(name, attrs, class_)]
+
+    def find(self, name=None, attrs=None, class_=None):
+        return next((node for node in self._descendants() if node._matches(name, attrs, class_)), None)
+
+    @property
+    def text(self):
+        parts = []
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, str):
+                parts.append(node)
+            elif node.name not in _SKIPPED_TEXT:
+                stack.extend(reversed(node.children))
+        return ''.join(parts)
+
+
+class PortfolioStreamParser(HTMLParser):
+    """
+    Event-driven parser that turns portfolio rows into dicts as they close.
+
+    Outside a ``div.et-table-row`` nothing is kept; inside one a small
+    RowNode tree of just that row is built and handed to portfolio_row()
+    when the row's end tag arrives. Rows nested in a row are rows of their
+    own, as for extract_portfolio_data(); they are handed over with the
+    outermost one, in document order. Memory therefore depends on the size
+    of the largest row, not of the page. Finished rows collect in ``rows``
+    until the caller takes them.
+
+    Args:
+        typed: Passed on to portfolio_row()
+        locale: Passed on to portfolio_row()
+        output: 'dicts', or 'rows' to collect PortfolioRows (see src/portfolio_types.py)
+
+    Raises:
+        ValueError: If the output is unknown
+    """
+
+    def __init__(self, typed=False, locale='auto', output='dicts'):
+        super().__init__(convert_charrefs=True)
+        if output not in ('dicts', 'rows'):
+            raise ValueError(f"Unknown output '{output}' for streamed rows (choose from dicts, rows)")
+        self.rows = []
+        self.typed = typed
+        self.locale = locale
+        self.output = output
+        self._open = []
+        # Row elements of the open outermost row, in document order
+        self._row_nodes = []
+
+    def handle_starttag(self, tag, attrs):
+        attrs = {key: value or '' for key, value in attrs}
+        is_row = tag == 'div' and ROW_CLASS in attrs.get('class', '').split()
+        if not self._open and not is_row:
+            return
+        node = RowNode(tag, attrs)
+        if is_row:
+            self._row_nodes.append(node)
+        if self._open:
+            self._open[-1].children.append(node)
+        if tag not in VOID_ELEMENTS:
+            self._open.append(node)
+
+    def handle_endtag(self, tag):
+        # Close up to the matching open element; stray end tags are ignored.
+        for depth in range(len(self._open) - 1, -1, -1):
+            if self._open[depth].name == tag:
+                del self._open[depth:]
+                if not self._open:
+                    for row in self._row_nodes:
+                        self._finish_row(row)
+                    self._row_nodes = []
+                return
+
+    def handle_data(self, data):
+        if self._open:
+            self._open[-1].children.append(data)
+
+    def _finish_row(self, row):
+        fields = portfolio_row(row, self.typed, self.locale)
+        if fields is not None:
+            self.rows.append(PortfolioRow.from_dict(fields) if self.output == 'rows' else fields)
+
+
+def iter_portfolio_rows(source, chunk_size=64 * 1024, typed=False, locale='auto', output='dicts'):
+    """
+    Yield the portfolio rows of a page while reading it in chunks.
+
+    Produces the same rows as extract_portfolio_data() without building a
+    tree of the whole page, so memory stays flat however large the page is.
+    The chunks are slimmed (src/html_slim.py) before they are parsed.
+
+    Args:
+        source: Path of the HTML file, or an open text file object
+        chunk_size: Characters read per chunk
+        typed: Give the cell fields as ``{'raw', 'value', 'unit'}`` (see src/normalize.py)
+        locale: Number format of the page: 'en', 'de' or 'auto'
+        output: 'dicts', or 'rows' for PortfolioRows; to fill a columnar table
+                while streaming, use ``PortfolioTable(iter_portfolio_rows(...))``
+
+    Yields:
+        One dict (or PortfolioRow) per position, as returned by extract_portfolio_data()
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, 'r', encoding='utf-8') as f:
+            yield from iter_portfolio_rows(f, chunk_size, typed, locale, output)
+        return
+
+    parser = PortfolioStreamParser(typed, locale, output)
+    for chunk in iter_slim_html(iter(lambda: source.read(chunk_size), '')):
+        parser.feed(chunk)
+        if parser.rows:
+            yield from parser.rows
+            parser.rows.clear()
+    parser.close()
+    yield from parser.rows
+
+
+def measure(function, *args):
+    """
+    Run a function under tracemalloc.
+
+    Returns:
+        (seconds, peak traced memory in bytes)
+    """
+    tracemalloc.start()
+    try:
+        started = time.perf_counter()
+        function(*args)
+        elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare memory use of the tree-based and the streaming portfolio extractor')
+    parser.add_argument('path', help='Portfolio HTML file')
+    parser.add_argument('--repeat', type=int, default=1, help='Parse a page made of this many copies of the file (default: 1)')
+    args = parser.parse_args()
+
+    from src.parser import extract_portfolio_data
+
+    path = args.path
+    if args.repeat > 1:
+        import tempfile
+        with open(args.path, 'r', encoding='utf-8') as f:
+            content = f.read()
+        fd, path = tempfile.mkstemp(suffix='.html')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            for _ in range(args.repeat):
+                f.write(content)
+    try:
+        size = os.path.getsize(path)
+
+        def tree():
+            with open(path, 'r', encoding='utf-8') as f:
+                return len(extract_portfolio_data(f.read()))
+
+        def stream():
+            return sum(1 for _ in iter_portfolio_rows(path))
+
+        print(f"Page: {size / 1024 / 1024:.1f} MB, {stream()} row(s)")
+        for name, function in (('tree', tree), ('stream', stream)):
+            seconds, peak = measure(function)
+            print(f"{name:<7} {seconds:.2f}s, peak {peak / 1024 / 1024:.1f} MB")
+    finally:
+        if path != args.path:
+            os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+import argparse
+import math
+import sys
+import tracemalloc
+from array import array
+from collections import namedtuple
+
+# The fields of a position, in output order.
+PORTFOLIO_FIELDS = ('ticker', 'company_name', 'type', 'price', 'net_value', 'asset_pnl',
+                    'change_percent', 'daily_pnl', 'gain_percent', 'market_exposure')
+# Stored as float arrays in a PortfolioTable.
+NUMERIC_FIELDS = ('price', 'net_value', 'asset_pnl', 'change_percent', 'daily_pnl', 'gain_percent',
+                  'market_exposure')
+# Repeat across rows and snapshots, so one copy of each is kept.
+INTERNED_FIELDS = ('ticker', 'company_name', 'type')
+
+OUTPUTS = ('dicts', 'rows', 'table')
+
+
+def _intern(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+class PortfolioRow(namedtuple('PortfolioRow', PORTFOLIO_FIELDS, defaults=(None,) * len(PORTFOLIO_FIELDS))):
+    """
+    One position as a tuple: a fraction of the memory of the equivalent dict.
+
+    Fields are read by name (``row.ticker``) like any namedtuple.
+    """
+
+    __slots__ = ()
+
+    @classmethod
+    def from_dict(cls, row):
+        """Build a row from a position dict; missing keys are None, unknown keys are ignored."""
+        return cls(*(_intern(row.get(name)) if name in INTERNED_FIELDS else row.get(name)
+                     for name in PORTFOLIO_FIELDS))
+
+    def to_dict(self):
+        return dict(zip(PORTFOLIO_FIELDS, self))
+
+
+class PortfolioTable:
+    """
+    Positions stored column by column.
+
+    Numeric fields are ``array('d')`` columns (NaN where a value is missing),
+    so a number takes 8 bytes instead of a float object and a dict slot;
+    tickers, company names and types are interned, so each distinct string is
+    kept once however many rows and snapshots repeat it. Suited to holding
+    long histories of many users in memory.
+
+    Rows are read back as PortfolioRow (``table[i]``, iteration) or as
+    position dicts (to_dicts()).
+
+    Args:
+        rows: Position dicts or PortfolioRows to start with
+    """
+
+    def __init__(self, rows=()):
+        self._columns = {name: array('d') if name in NUMERIC_FIELDS else [] for name in PORTFOLIO_FIELDS}
+        self.extend(rows)
+
+    def append(self, row):
+        """
+        Add a position (dict or PortfolioRow).
+
+        Raises:
+            ValueError: If a numeric field is neither a number nor None
+                        (e.g. a typed value; tables hold plain output only)
+        """
+        if not isinstance(row, PortfolioRow):
+            row = PortfolioRow.from_dict(row)
+        for name, value in zip(PORTFOLIO_FIELDS, row):
+            if name in NUMERIC_FIELDS:
+                if value is None:
+                    value = math.nan
+                elif not isinstance(value, (int, float)) or isinstance(value, bool):
+                    raise ValueError(f"PortfolioTable needs a number or None for '{name}', got {value!r}")
+            elif name in INTERNED_FIELDS:
+                value = _intern(value)
+            self._columns[name].append(value)
+
+    def extend(self, rows):
+        for row in rows:
+            self.append(row)
+
+    def column(self, name):
+        """
+        Return a column: an ``array('d')`` (NaN for missing) for numeric
+        fields, a list otherwise. The column is the table's own; don't modify it.
+
+        Raises:
+            KeyError: If the field is unknown
+        """
+        return self._columns[name]
+
+    def __len__(self):
+        return len(self._columns['ticker'])
+
+    def __getitem__(self, index):
+        values = []
+        for name in PORTFOLIO_FIELDS:
+            value = self._columns[name][index]
+            if name in NUMERIC_FIELDS and math.isnan(value):
+                value = None
+            values.append(value)
+        return PortfolioRow(*values)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def __eq__(self, other):
+        if not isinstance(other, PortfolioTable):
+            return NotImplemented
+        return list(self) == list(other)
+
+    def to_dicts(self):
+        return [row.to_dict() for row in self]
+
+
+def to_dicts(portfolio):
+    """Return positions (dicts, PortfolioRows or a PortfolioTable) as a list of position dicts."""
+    if isinstance(portfolio, PortfolioTable):
+        return portfolio.to_dicts()
+    return [row.to_dict() if isinstance(row, PortfolioRow) else row for row in portfolio]
+
+
+def to_rows(portfolio):
+    """Return positions (dicts, PortfolioRows or a PortfolioTable) as a list of PortfolioRows."""
+    return [row if isinstance(row, PortfolioRow) else PortfolioRow.from_dict(row) for row in portfolio]
+
+
+def to_table(portfolio):
+    """Return positions (dicts, PortfolioRows or a PortfolioTable) as a PortfolioTable."""
+    return portfolio if isinstance(portfolio, PortfolioTable) else PortfolioTable(portfolio)
+
+
+def convert(portfolio, output='dicts'):
+    """
+    Return positions in one of the OUTPUTS: 'dicts', 'rows' or 'table'.
+
+    Raises:
+        ValueError: If the output is unknown
+    """
+    if output not in OUTPUTS:
+        raise ValueError(f"Unknown output '{output}' (choose from {', '.join(OUTPUTS)})")
+    return {'dicts': to_dicts, 'rows': to_rows, 'table': to_table}[output](portfolio)
+
+
+def iter_dicts(portfolio):
+    """Yield positions (dicts, PortfolioRows or a PortfolioTable) one dict at a time."""
+    for row in portfolio:
+        yield row.to_dict() if isinstance(row, PortfolioRow) else row
+
+
+def retained_memory(function, *args):
+    """
+    Return the result of a function and the memory it still holds, in bytes, per tracemalloc.
+    """
+    tracemalloc.start()
+    try:
+        result = function(*args)
+        current, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, current
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare the memory held by portfolio rows as dicts, tuples and columns')
+    parser.add_argument('path', nargs='?', help='Portfolio HTML file (default: the example page)')
+    parser.add_argument('--snapshots', type=int, default=100,
+                        help='Number of snapshots of the page to hold, as when loading history (default: 100)')
+    args = parser.parse_args()
+
+    from src.portfolio_stream import iter_portfolio_rows
+
+    if args.path:
+        path = args.path
+    else:
+        import os
+        from src.pages import EXAMPLE_PAGES
+        path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'example',
+                            *EXAMPLE_PAGES['portfolio'])
+
+    # Re-parse per snapshot, so strings are separate objects as they are when read from separate files
+    snapshots = [list(iter_portfolio_rows(path)) for _ in range(args.snapshots)]
+    count = sum(len(rows) for rows in snapshots)
+    builders = {
+        'dicts': lambda: [[dict(row) for row in rows] for rows in snapshots],
+        'rows': lambda: [to_rows(rows) for rows in snapshots],
+        'table': lambda: [to_table(rows) for rows in snapshots],
+    }
+    print(f"{args.snapshots} snapshot(s), {count} position(s)")
+    for name, build in builders.items():
+        _, size = retained_memory(build)
+        print(f"{name:<6} {size / 1024 / 1024:8.2f} MB ({size / count:6.0f} bytes/position)")
+
+
+if __name__ == "__main__":
+    main()
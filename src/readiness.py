@@ -0,0 +1,150 @@
+import time
+
+from src.pages import REQUIRED_SELECTORS
+
+
+# Installs a MutationObserver on first call (per document) and reports which
+# required selectors are still missing and how long the DOM has been quiet.
+# Without a MutationObserver it reports the document's size instead, for
+# size-stability polling; serializing the DOM on every poll is costly on
+# large pages, so it is not done otherwise.
+READINESS_PROBE_JS = """
+var selectors = arguments[0];
+var state = window.__etoroHelperReadiness;
+if (!state) {
+    state = {last: Date.now(), observer: false};
+    try {
+        new MutationObserver(function () { state.last = Date.now(); }).observe(
+            document, {childList: true, subtree: true, attributes: true, characterData: true}
+        );
+        state.observer = true;
+    } catch (e) {}
+    window.__etoroHelperReadiness = state;
+}
+var missing = [];
+for (var i = 0; i < selectors.length; i++) {
+    if (!document.querySelector(selectors[i])) {
+        missing.push(selectors[i]);
+    }
+}
+return {
+    missing: missing,
+    quietMs: state.observer ? Date.now() - state.last : null,
+    size: state.observer ? null : (document.documentElement ? document.documentElement.outerHTML.length : 0),
+    readyState: document.readyState
+};
+"""
+
+DEFAULT_TIMEOUT = 30
+DEFAULT_QUIET_PERIOD = 0.75
+DEFAULT_POLL_INTERVAL = 0.1
+
+
+class ReadinessTracker:
+    """
+    Decides when a page has finished rendering from successive probe snapshots.
+
+    A page is ready once every required selector is present and the DOM has
+    not changed for ``quiet_period`` seconds. Change detection uses the
+    MutationObserver timestamp when the probe reports one and otherwise the
+    document size staying constant between polls.
+    """
+
+    def __init__(self, page_type, required=None, timeout=DEFAULT_TIMEOUT,
+                 quiet_period=DEFAULT_QUIET_PERIOD, clock=time.monotonic):
+        self.page_type = page_type
+        self.required = tuple(required if required is not None else REQUIRED_SELECTORS.get(page_type, ()))
+        self.timeout = timeout
+        self.quiet_period = quiet_period
+        self.clock = clock
+        self.started = clock()
+        self.method = None
+        self.missing = list(self.required)
+        self.time_to_ready = None
+        self._last_size = None
+        self._size_stable_since = None
+
+    @property
+    def ready(self):
+        return self.time_to_ready is not None
+
+    def expired(self):
+        """True once the hard cap on the wait has been reached."""
+        return self.clock() - self.started >= self.timeout
+
+    def update(self, snapshot):
+        """
+        Feed one probe snapshot.
+
+        Returns:
+            True if the page is ready
+        """
+        if self.ready:
+            return True
+
+        now = self.clock()
+        self.missing = list(snapshot.get('missing') or [])
+
+        quiet_ms = snapshot.get('quietMs')
+        if quiet_ms is not None:
+            self.method = 'mutation'
+            quiet = quiet_ms / 1000 >= self.quiet_period
+        else:
+            self.method = 'size'
+            size = snapshot.get('size')
+            if size != self._last_size:
+                self._last_size = size
+                self._size_stable_since = now
+            quiet = now - self._size_stable_since >= self.quiet_period
+
+        if not self.missing and quiet and snapshot.get('readyState', 'complete') != 'loading':
+            self.time_to_ready = now - self.started
+        return self.ready
+
+    def result(self):
+        """Summary of the wait, suitable for per-page download stats."""
+        elapsed = self.time_to_ready if self.ready else self.clock() - self.started
+        return {
+            'ready': self.ready,
+            'time_to_ready': round(elapsed, 3),
+            'method': self.method,
+            'missing': [] if self.ready else self.missing,
+        }
+
+
+def probe(driver, selectors):
+    """
+    Run the readiness probe in the driver's current window.
+
+    Returns:
+        The snapshot dict, or None if the driver cannot run the probe
+    """
+    snapshot = driver.execute_script(READINESS_PROBE_JS, list(selectors))
+    return snapshot if isinstance(snapshot, dict) else None
+
+
+def wait_until_ready(driver, page_type, timeout=DEFAULT_TIMEOUT, quiet_period=DEFAULT_QUIET_PERIOD,
+                     poll_interval=DEFAULT_POLL_INTERVAL, required=None):
+    """
+    Block until the page in the driver's current window is ready or the cap is hit.
+
+    Args:
+        driver: Selenium WebDriver that has already navigated to the page
+        page_type: One of the keys of REQUIRED_SELECTORS
+        timeout: Hard cap on the wait in seconds
+        quiet_period: Seconds without DOM changes that count as settled
+        poll_interval: Seconds between probes
+        required: Override for the required selector set
+
+    Returns:
+        Result dict (see ReadinessTracker.result), or None if the driver
+        does not support the JavaScript probe.
+    """
+    tracker = ReadinessTracker(page_type, required=required, timeout=timeout, quiet_period=quiet_period)
+    while True:
+        snapshot = probe(driver, tracker.required)
+        if snapshot is None:
+            return None
+        if tracker.update(snapshot) or tracker.expired():
+            return tracker.result()
+        time.sleep(poll_interval)
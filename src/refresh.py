@@ -0,0 +1,175 @@
+import os
+import re
+import shutil
+import time
+
+from src.pages import PAGE_TYPES
+from src.snapshot_store import copy_page, page_saved_at
+
+# Seconds a downloaded page stays fresh. The parsed pages change during the
+# day; the portfolio and chart pages are only archived, so once a day is enough.
+DEFAULT_TTLS = {
+    "profile": 60 * 60,
+    "stats": 60 * 60,
+    "portfolio": 24 * 60 * 60,
+    "chart": 24 * 60 * 60,
+}
+
+_DURATION = re.compile(r'^(\d+(?:\.\d+)?)\s*([smhd]?)$')
+_DURATION_UNITS = {'': 1, 's': 1, 'm': 60, 'h': 60 * 60, 'd': 24 * 60 * 60}
+_DATE_DIR = re.compile(r'^\d{4}-\d{2}-\d{2}$')
+
+
+def parse_duration(text):
+    """
+    Parse a duration such as '90', '30s', '15m', '2h' or '1d' into seconds.
+
+    Raises:
+        ValueError: If the text is not a duration
+    """
+    match = _DURATION.match(str(text).strip().lower())
+    if not match:
+        raise ValueError(f"Invalid duration: '{text}' (use e.g. 30m, 2h or 1d)")
+    number, unit = match.groups()
+    return float(number) * _DURATION_UNITS[unit]
+
+
+def parse_pages(text):
+    """
+    Parse a comma-separated page selection ('profile,stats' or 'all').
+
+    Returns:
+        List of page types in download order
+
+    Raises:
+        ValueError: If a page type is unknown or nothing is selected
+    """
+    names = [name.strip().lower() for name in (text or '').split(',') if name.strip()]
+    if not names:
+        raise ValueError("No pages selected")
+    if 'all' in names:
+        return list(PAGE_TYPES)
+    unknown = [name for name in names if name not in PAGE_TYPES]
+    if unknown:
+        raise ValueError(f"Unknown page type(s): {', '.join(unknown)} (choose from {', '.join(PAGE_TYPES)})")
+    return [page_type for page_type in PAGE_TYPES if page_type in names]
+
+
+def parse_ttls(values):
+    """
+    Parse TTL overrides given as 'page=duration' strings.
+
+    Args:
+        values: Iterable such as ['profile=30m', 'portfolio=12h']; 'all=...'
+                applies to every page type
+
+    Returns:
+        Dict of page type to TTL in seconds
+
+    Raises:
+        ValueError: If an entry is malformed or names an unknown page type
+    """
+    ttls = {}
+    for value in values or []:
+        page_type, sep, duration = value.partition('=')
+        page_type = page_type.strip().lower()
+        if not sep:
+            raise ValueError(f"Invalid TTL '{value}' (use page=duration, e.g. profile=30m)")
+        seconds = parse_duration(duration)
+        if page_type == 'all':
+            ttls.update({name: seconds for name in PAGE_TYPES})
+        elif page_type in PAGE_TYPES:
+            ttls[page_type] = seconds
+        else:
+            raise ValueError(f"Unknown page type in TTL '{value}'")
+    return ttls
+
+
+def snapshot_dirs(download_dir):
+    """
+    Folders that may hold earlier snapshots of a user's pages.
+
+    That is the download folder itself plus its dated siblings
+    ({user}/{yyyy-MM-dd}), newest first.
+    """
+    download_dir = os.path.abspath(download_dir)
+    parent = os.path.dirname(download_dir)
+    siblings = []
+    if os.path.isdir(parent):
+        siblings = sorted((name for name in os.listdir(parent) if _DATE_DIR.match(name)), reverse=True)
+    dirs = [download_dir]
+    dirs.extend(os.path.join(parent, name) for name in siblings
+                if os.path.join(parent, name) != download_dir)
+    return dirs
+
+
+def find_snapshot(download_dir, page_type):
+    """
+    Find the most recently saved snapshot of a page.
+
+    Returns:
+        Tuple (folder, saved_at) of the newest snapshot, or (None, None)
+    """
+    newest, newest_time = None, None
+    for directory in snapshot_dirs(download_dir):
+        saved_at = page_saved_at(directory, page_type)
+        if saved_at is not None and (newest_time is None or saved_at > newest_time):
+            newest, newest_time = directory, saved_at
+    return newest, newest_time
+
+
+def plan_refresh(download_dir, pages=None, ttls=None, now=None):
+    """
+    Decide which pages to download again and which snapshots are still fresh.
+
+    Args:
+        download_dir: Folder the pages of this run go to
+        pages: Page types requested (default: all)
+        ttls: TTL overrides in seconds, merged over DEFAULT_TTLS
+        now: Current time as a Unix timestamp (for tests)
+
+    Returns:
+        Dict mapping each requested page type to ``{'action': 'fetch' | 'reuse',
+        'source_dir': folder of the newest snapshot or None, 'age_seconds': ...}``
+    """
+    ttls = {**DEFAULT_TTLS, **(ttls or {})}
+    now = time.time() if now is None else now
+    plan = {}
+    for page_type in pages or PAGE_TYPES:
+        source_dir, saved_at = find_snapshot(download_dir, page_type)
+        age = None if saved_at is None else max(0.0, now - saved_at)
+        fresh = age is not None and age < ttls.get(page_type, 0)
+        plan[page_type] = {
+            'action': 'reuse' if fresh else 'fetch',
+            'source_dir': source_dir,
+            'age_seconds': None if age is None else round(age, 1),
+        }
+    return plan
+
+
+def reuse_snapshots(plan, download_dir):
+    """
+    Make the fresh snapshots of a plan available in download_dir.
+
+    Snapshots from an earlier date folder are copied over (keeping their
+    save time, so they still age), together with their captured API
+    responses. Pages in the snapshot store only get a manifest entry.
+
+    Returns:
+        Per-page results for the reused pages, in the format of
+        download_person_data with ``'source': 'cache'``
+    """
+    results = {}
+    for page_type, entry in plan.items():
+        if entry['action'] != 'reuse':
+            continue
+        source_dir = entry['source_dir']
+        path = copy_page(source_dir, download_dir, page_type)
+        api_path = os.path.join(source_dir, f"{page_type}.api.json")
+        target_api_path = os.path.join(download_dir, f"{page_type}.api.json")
+        if os.path.exists(api_path) and os.path.abspath(api_path) != os.path.abspath(target_api_path):
+            shutil.copy2(api_path, target_api_path)
+        print(f"Reusing {page_type} snapshot from {source_dir} ({entry['age_seconds']:.0f}s old)")
+        results[page_type] = {'status': 'ok', 'source': 'cache', 'path': path, 'seconds': 0.0,
+                              'age_seconds': entry['age_seconds']}
+    return results
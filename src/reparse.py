@@ -0,0 +1,158 @@
+import argparse
+import contextlib
+import io
+import math
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from src.snapshot_store import STORE_DIR_NAME
+
+
+def find_snapshot_folders(downloads_root, users=None):
+    """
+    List the {user}/{date} folders below a downloads root.
+
+    Args:
+        downloads_root: Root folder, laid out as {downloads_root}/{user}/{date}/
+        users: Only these users' folders (default: all)
+
+    Returns:
+        Sorted list of (user, folder) tuples
+    """
+    folders = []
+    if not os.path.isdir(downloads_root):
+        return folders
+    for user in sorted(os.listdir(downloads_root)):
+        user_dir = os.path.join(downloads_root, user)
+        if user == STORE_DIR_NAME or not os.path.isdir(user_dir) or (users is not None and user not in users):
+            continue
+        for date in sorted(os.listdir(user_dir)):
+            folder = os.path.join(user_dir, date)
+            if os.path.isdir(folder):
+                folders.append((user, folder))
+    return folders
+
+
+def _reparse_folder(job):
+    """Parse one folder's pages and rewrite its outputs; runs in a worker process."""
+    from src.pipeline import extract_person_data, write_person_data
+    from src.strategy_cache import get_strategy_cache
+
+    person, folder, typed = job
+    started = time.perf_counter()
+    # The per-page messages of thousands of folders would drown the summary
+    log = io.StringIO()
+    files, error = 0, None
+    try:
+        with contextlib.redirect_stdout(log):
+            extracted = extract_person_data(person, folder, typed=typed)
+            write_person_data(person, folder, extracted)
+        files = len(extracted)
+    except Exception as e:
+        error = str(e)
+    # The parent saves the strategy counters of all folders once
+    return {'person': person, 'folder': folder, 'files': files, 'error': error,
+            'seconds': time.perf_counter() - started, 'worker': os.getpid(),
+            'strategies': get_strategy_cache().take_unsaved()}
+
+
+def default_chunk_size(jobs, workers):
+    """
+    Folders sent to a worker per task: about four batches per worker, so
+    the pool stays balanced while inter-process traffic stays low.
+    """
+    return max(1, math.ceil(jobs / (workers * 4)))
+
+
+def reparse_downloads(downloads_root='downloads', workers=None, chunk_size=None, users=None, typed=False):
+    """
+    Re-run the extractors over every downloaded snapshot folder in parallel.
+
+    Each {user}/{date} folder gets fresh performance/stats/portfolio
+    .json and .md files next to its pages, exactly as after a download.
+    Folders are spread over a process pool in batches (``chunk_size``)
+    and are independent of each other, so throughput grows with the
+    number of workers up to the number of cores.
+
+    Args:
+        downloads_root: Root folder, laid out as {downloads_root}/{user}/{date}/
+        workers: Number of worker processes (default: CPU count)
+        chunk_size: Folders per task (default: default_chunk_size())
+        users: Only reparse these users (default: all)
+        typed: Write typed numeric values (see extract_person_data)
+
+    Returns:
+        Dict with the totals (``folders``, ``files``, ``seconds``,
+        ``files_per_second``), ``errors`` (folder to message) and
+        ``workers``, one dict of counters per worker process
+    """
+    from src.pipeline import save_caches
+    from src.strategy_cache import get_strategy_cache
+
+    jobs = [(person, folder, typed) for person, folder in find_snapshot_folders(downloads_root, users)]
+    workers = max(1, min(workers or os.cpu_count() or 1, len(jobs) or 1))
+    chunk_size = chunk_size or default_chunk_size(len(jobs), workers)
+    print(f"Reparsing {len(jobs)} folder(s) below {downloads_root} with {workers} worker(s), "
+          f"{chunk_size} folder(s) per task...")
+
+    started = time.perf_counter()
+    results = []
+    if jobs:
+        # 'spawn' like the pipeline's parse pool, so workers start from a clean interpreter.
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as executor:
+            for result in executor.map(_reparse_folder, jobs, chunksize=chunk_size):
+                if result['error']:
+                    print(f"Failed to reparse {result['folder']}: {result['error']}")
+                get_strategy_cache().merge(result.pop('strategies'))
+                results.append(result)
+        save_caches()
+    seconds = time.perf_counter() - started
+
+    per_worker = {}
+    for result in results:
+        counters = per_worker.setdefault(result['worker'], {'worker': result['worker'], 'folders': 0, 'files': 0,
+                                                            'busy_seconds': 0.0})
+        counters['folders'] += 1
+        counters['files'] += result['files']
+        counters['busy_seconds'] += result['seconds']
+    for counters in per_worker.values():
+        busy = counters['busy_seconds']
+        counters['busy_seconds'] = round(busy, 3)
+        counters['files_per_second'] = round(counters['files'] / busy, 2) if busy > 0 else 0.0
+
+    files = sum(result['files'] for result in results)
+    summary = {
+        'folders': len(results),
+        'files': files,
+        'seconds': round(seconds, 3),
+        'files_per_second': round(files / seconds, 2) if seconds > 0 else 0.0,
+        'errors': {result['folder']: result['error'] for result in results if result['error']},
+        'workers': list(per_worker.values()),
+    }
+    print(f"Reparsed {summary['folders']} folder(s), {files} file(s) in {seconds:.2f}s "
+          f"({summary['files_per_second']:.2f} files/s), {len(summary['errors'])} error(s)")
+    for counters in summary['workers']:
+        print(f"  worker {counters['worker']:<8} {counters['folders']:>5} folder(s) {counters['files']:>6} file(s) "
+              f"{counters['busy_seconds']:8.2f}s busy {counters['files_per_second']:8.2f} files/s")
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Re-run the extractors over all downloaded snapshots')
+    parser.add_argument('downloads_root', nargs='?', default='downloads', help='Downloads folder (default: downloads)')
+    parser.add_argument('--workers', type=int, help='Worker processes (default: CPU count)')
+    parser.add_argument('--chunk-size', type=int, help='Folders per task (default: about four tasks per worker)')
+    parser.add_argument('--user', action='append', dest='users', metavar='USER', help='Only reparse this user (repeatable)')
+    parser.add_argument('--typed-values', action='store_true', help="Write numbers as {'raw', 'value', 'unit'} objects in the JSON outputs")
+    args = parser.parse_args()
+
+    from src.dependencies import PARSE_PACKAGES, install_dependencies
+    install_dependencies(PARSE_PACKAGES)
+    reparse_downloads(args.downloads_root, workers=args.workers, chunk_size=args.chunk_size, users=args.users,
+                      typed=args.typed_values)
+
+
+if __name__ == "__main__":
+    main()
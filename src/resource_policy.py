@@ -0,0 +1,167 @@
+import argparse
+import time
+
+from src.pages import PAGE_TYPES
+
+
+# URL patterns for Network.setBlockedURLs ('*' matches any run of characters).
+_EXTENSIONS = {
+    "images": ('png', 'jpg', 'jpeg', 'gif', 'webp', 'avif', 'svg', 'ico'),
+    "fonts": ('woff', 'woff2', 'ttf', 'otf', 'eot'),
+    "media": ('mp4', 'webm', 'ogg', 'mp3', 'm4a', 'm3u8'),
+}
+
+BLOCK_CATEGORIES = {
+    category: tuple(pattern for ext in extensions for pattern in (f'*.{ext}', f'*.{ext}?*'))
+    for category, extensions in _EXTENSIONS.items()
+}
+BLOCK_CATEGORIES["trackers"] = (
+    '*google-analytics.com*',
+    '*googletagmanager.com*',
+    '*doubleclick.net*',
+    '*connect.facebook.net*',
+    '*hotjar.com*',
+    '*clarity.ms*',
+    '*segment.io*',
+    '*cdn.segment.com*',
+    '*optimizely.com*',
+    '*nr-data.net*',
+    '*js-agent.newrelic.com*',
+    '*bat.bing.com*',
+    '*adsrvr.org*',
+    '*taboola.com*',
+    '*outbrain.com*',
+)
+
+# Categories blocked per page type by default. None of the extractors look at
+# images, fonts or media; the chart page keeps its images in case the chart
+# is served as one.
+DEFAULT_PAGE_CATEGORIES = {
+    "profile": ("images", "fonts", "media", "trackers"),
+    "stats": ("images", "fonts", "media", "trackers"),
+    "portfolio": ("images", "fonts", "media", "trackers"),
+    "chart": ("fonts", "media", "trackers"),
+}
+
+
+def parse_block_option(text):
+    """
+    Parse the value of --block-resources.
+
+    Args:
+        text: 'default' for the per-page defaults, 'none', or a
+              comma-separated list of categories (images, fonts, media, trackers)
+
+    Returns:
+        True for the defaults, None for no blocking, or a list of categories
+
+    Raises:
+        ValueError: If a category is unknown
+    """
+    text = (text or '').strip().lower()
+    if text in ('', 'default'):
+        return True
+    if text == 'none':
+        return None
+    categories = [name.strip() for name in text.split(',') if name.strip()]
+    unknown = [name for name in categories if name not in BLOCK_CATEGORIES]
+    if unknown:
+        raise ValueError(f"Unknown resource category: {', '.join(unknown)} "
+                         f"(choose from {', '.join(BLOCK_CATEGORIES)})")
+    return categories
+
+
+def build_policy(block_resources, page_types=PAGE_TYPES):
+    """
+    Resolve a block_resources setting into URL patterns per page type.
+
+    Args:
+        block_resources: None/False (no blocking), True (per-page defaults)
+                         or an iterable of categories applied to every page
+
+    Returns:
+        Dict of page type to a list of URL patterns, or None if nothing is blocked
+    """
+    if not block_resources:
+        return None
+    policy = {}
+    for page_type in page_types:
+        categories = DEFAULT_PAGE_CATEGORIES.get(page_type, ()) if block_resources is True else block_resources
+        policy[page_type] = [pattern for category in categories for pattern in BLOCK_CATEGORIES[category]]
+    return policy
+
+
+def apply_policy(driver, patterns):
+    """
+    Block requests to the given URL patterns in the driver's current tab.
+
+    The setting sticks to the tab across navigations.
+    """
+    driver.execute_cdp_cmd('Network.enable', {})
+    driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': list(patterns)})
+
+
+def format_bytes(size):
+    for unit in ('B', 'KB', 'MB'):
+        if size < 1024 or unit == 'MB':
+            return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+def benchmark(runs=3, person='benchmark'):
+    """
+    Compare page loads with and without blocking against the heavy-asset stand-in.
+
+    Requires Chrome. Each run downloads all pages once without and once with
+    the default policy and measures time and the bytes/requests the stand-in
+    served.
+
+    Returns:
+        Dict of 'off'/'on' to averaged ``{'seconds', 'requests', 'bytes', 'blocked_requests'}``
+    """
+    import tempfile
+
+    from src.downloader import create_driver, download_person_data
+    from src.standin import StandinServer, fixture_routes
+
+    totals = {mode: {'seconds': 0.0, 'requests': 0, 'bytes': 0, 'blocked_requests': 0} for mode in ('off', 'on')}
+    driver = create_driver(capture_network=True)
+    try:
+        with StandinServer(fixture_routes(person, heavy_assets=True)) as server:
+            for _ in range(runs):
+                for mode in ('off', 'on'):
+                    driver.execute_cdp_cmd('Network.clearBrowserCache', {})
+                    requests_before, bytes_before = len(server.requests), server.bytes_served
+                    with tempfile.TemporaryDirectory() as download_dir:
+                        started = time.monotonic()
+                        results = download_person_data(person, download_dir, driver=driver,
+                                                       base_url=server.base_url, quiet_period=0.2,
+                                                       block_resources=(mode == 'on'))
+                        totals[mode]['seconds'] += time.monotonic() - started
+                    totals[mode]['requests'] += len(server.requests) - requests_before
+                    totals[mode]['bytes'] += server.bytes_served - bytes_before
+                    totals[mode]['blocked_requests'] += sum(
+                        result.get('traffic', {}).get('blocked_requests', 0) for result in results.values()
+                    )
+    finally:
+        driver.quit()
+    return {mode: {key: value / runs for key, value in values.items()} for mode, values in totals.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark resource blocking against the local heavy-asset stand-in')
+    parser.add_argument('--runs', type=int, default=3, help='Number of runs per mode (default: 3)')
+    args = parser.parse_args()
+
+    averages = benchmark(runs=args.runs)
+    for mode in ('off', 'on'):
+        result = averages[mode]
+        print(f"blocking {mode:>3}: {result['seconds']:.2f}s, {result['requests']:.0f} request(s), "
+              f"{format_bytes(result['bytes'])} served, {result['blocked_requests']:.0f} blocked")
+    off, on = averages['off'], averages['on']
+    print(f"Saved {off['requests'] - on['requests']:.0f} request(s) and "
+          f"{format_bytes(off['bytes'] - on['bytes'])} per user")
+
+
+if __name__ == "__main__":
+    main()
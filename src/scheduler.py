@@ -0,0 +1,192 @@
+import heapq
+import itertools
+import random
+import threading
+import time
+
+
+class AdaptiveRateLimiter:
+    """
+    Token bucket shared by every download thread, with a self-tuning rate.
+
+    Each page request takes one token; tokens refill at ``rate`` per second
+    up to ``burst``. The rate follows additive-increase/multiplicative-
+    decrease: every successful page raises it by ``increase`` (up to
+    ``max_rate``), every failed page - the only sign of throttling a
+    browser gives us - cuts it by ``decrease``. A crawl therefore settles
+    just below the rate at which the site starts failing requests.
+    """
+
+    def __init__(self, rate=2.0, burst=4, min_rate=0.2, max_rate=20.0, increase=0.1, decrease=0.5,
+                 clock=time.monotonic, sleep=time.sleep):
+        self.rate = rate
+        self.burst = burst
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease = decrease
+        self.clock = clock
+        self.sleep = sleep
+        self.successes = 0
+        self.failures = 0
+        self._tokens = float(burst)
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = self.clock()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self):
+        """Block until a request may be sent."""
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            self.sleep(wait)
+
+    def record_success(self):
+        with self._lock:
+            self._refill()
+            self.successes += 1
+            self.rate = min(self.max_rate, self.rate + self.increase)
+
+    def record_failure(self):
+        with self._lock:
+            self._refill()
+            self.failures += 1
+            self.rate = max(self.min_rate, self.rate * self.decrease)
+
+
+def backoff_delay(attempt, base_delay=2.0, max_delay=60.0, rng=random.random):
+    """
+    Jittered exponential backoff ("full jitter") before retry number ``attempt``.
+
+    Returns:
+        Delay in seconds, uniformly drawn from [0, min(max_delay, base_delay * 2**(attempt - 1))]
+    """
+    return rng() * min(max_delay, base_delay * 2 ** (attempt - 1))
+
+
+class Job:
+    """A unit of scheduled work; ``attempt`` is 0 for the first try."""
+
+    def __init__(self, key, payload, attempt=0, ready_at=0.0):
+        self.key = key
+        self.payload = payload
+        self.attempt = attempt
+        self.ready_at = ready_at
+
+
+class RetryScheduler:
+    """
+    Priority work queue that runs jobs on a fixed number of threads and
+    retries failed ones with backoff.
+
+    First attempts always run before retries, so a batch is never held up by
+    pages that keep failing: those are retried at the end, each once its
+    jittered backoff has elapsed, up to ``max_attempts`` tries in total.
+    """
+
+    def __init__(self, max_attempts=3, base_delay=2.0, max_delay=60.0, clock=time.monotonic,
+                 rng=random.random):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.clock = clock
+        self.rng = rng
+        self.retries = 0
+        self.gave_up = []
+        self._heap = []
+        self._sequence = itertools.count()
+        self._in_flight = 0
+        self._condition = threading.Condition()
+
+    def _push(self, job):
+        # Retries sort after every first attempt, then by the time they are due.
+        priority = (1 if job.attempt else 0, job.ready_at, next(self._sequence))
+        heapq.heappush(self._heap, (priority, job))
+
+    def submit(self, key, payload):
+        with self._condition:
+            self._push(Job(key, payload))
+            self._condition.notify()
+
+    def retry(self, job, payload):
+        """
+        Queue another attempt of a job, unless it used up its attempts.
+
+        Returns:
+            True if the retry was scheduled
+        """
+        attempt = job.attempt + 1
+        if attempt >= self.max_attempts:
+            self.gave_up.append((job.key, payload))
+            return False
+        delay = backoff_delay(attempt, self.base_delay, self.max_delay, self.rng)
+        print(f"Retrying {job.key} in {delay:.1f}s (attempt {attempt + 1} of {self.max_attempts})")
+        with self._condition:
+            self.retries += 1
+            self._push(Job(job.key, payload, attempt, self.clock() + delay))
+            self._condition.notify()
+        return True
+
+    def _next_job(self):
+        with self._condition:
+            while True:
+                if not self._heap:
+                    if self._in_flight == 0:
+                        self._condition.notify_all()
+                        return None
+                    self._condition.wait()
+                    continue
+                delay = self._heap[0][1].ready_at - self.clock()
+                if delay > 0:
+                    self._condition.wait(delay)
+                    continue
+                _, job = heapq.heappop(self._heap)
+                self._in_flight += 1
+                return job
+
+    def _finish_job(self):
+        with self._condition:
+            self._in_flight -= 1
+            self._condition.notify_all()
+
+    def run(self, handler, workers=1):
+        """
+        Run queued jobs until the queue is drained.
+
+        Args:
+            handler: Callable ``(key, payload, attempt)`` returning the payload
+                     to retry (e.g. the pages that failed) or a falsy value
+                     when the job is done. An exception retries the whole payload.
+            workers: Number of threads running jobs
+        """
+        def work():
+            while True:
+                job = self._next_job()
+                if job is None:
+                    return
+                try:
+                    try:
+                        retry_payload = handler(job.key, job.payload, job.attempt)
+                        failed = bool(retry_payload)
+                    except Exception as e:
+                        print(f"Job {job.key} failed: {e}")
+                        # Even a None payload: to the handler that may mean "everything"
+                        retry_payload, failed = job.payload, True
+                    if failed:
+                        self.retry(job, retry_payload)
+                finally:
+                    self._finish_job()
+
+        threads = [threading.Thread(target=work, daemon=True) for _ in range(max(1, workers))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
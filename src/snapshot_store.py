@@ -0,0 +1,362 @@
+import argparse
+import gzip
+import hashlib
+import io
+import json
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+MANIFEST_NAME = 'manifest.json'
+STORE_DIR_NAME = '.snapshots'
+
+# Angular stamps every element with per-build component ids
+# (_ngcontent-ng-c1273128201=""), so otherwise identical pages differ between
+# deployments. No extractor reads these attributes.
+_ANGULAR_ATTRIBUTES = re.compile(r'\s_ng(?:content|host)-[\w-]+=""')
+
+CODEC_EXTENSIONS = {'zstd': '.zst', 'gzip': '.gz'}
+
+_manifest_lock = threading.Lock()
+
+
+def normalize_html(html):
+    """
+    Strip volatile Angular attributes so unchanged pages hash identically.
+    """
+    return _ANGULAR_ATTRIBUTES.sub('', html)
+
+
+def content_hash(content):
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+def default_codec():
+    """zstd when the zstandard package is installed, gzip otherwise."""
+    return 'zstd' if zstandard is not None else 'gzip'
+
+
+def compress(data, codec):
+    if codec == 'zstd':
+        return zstandard.ZstdCompressor(level=10).compress(data)
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def decompress(data, codec):
+    if codec == 'zstd':
+        if zstandard is None:
+            raise RuntimeError("This snapshot is zstd-compressed; install 'zstandard' to read it")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+
+class SnapshotStore:
+    """
+    Content-addressed store of compressed page snapshots.
+
+    Each unique (normalized) page is written once to
+    ``{root}/objects/{hash[:2]}/{hash}{.gz|.zst}``; per-download-folder
+    manifests map page types to these hashes. Blobs are written to a
+    temporary file and renamed into place, so concurrent writers are safe.
+    """
+
+    def __init__(self, root, codec=None):
+        self.root = root
+        self.codec = codec or default_codec()
+
+    def blob_path(self, digest, codec):
+        return os.path.join(self.root, 'objects', digest[:2], digest + CODEC_EXTENSIONS[codec])
+
+    def find_blob(self, digest):
+        """
+        Return (path, codec) of a stored blob in any codec, or (None, None).
+        """
+        for codec in CODEC_EXTENSIONS:
+            path = self.blob_path(digest, codec)
+            if os.path.exists(path):
+                return path, codec
+        return None, None
+
+    def put(self, content):
+        """
+        Store normalized content unless it is already present.
+
+        Returns:
+            Dict describing the blob: ``{'sha256', 'codec', 'size', 'stored_size'}``
+        """
+        digest = content_hash(content)
+        raw = content.encode('utf-8')
+        path, codec = self.find_blob(digest)
+        if path is None:
+            codec = self.codec
+            path = self.blob_path(digest, codec)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(compress(raw, codec))
+                os.replace(tmp_path, path)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+        return {'sha256': digest, 'codec': codec, 'size': len(raw), 'stored_size': os.path.getsize(path)}
+
+    def get(self, digest):
+        """
+        Return the stored content for a hash.
+
+        Raises:
+            FileNotFoundError: If the blob is not in the store
+        """
+        path, codec = self.find_blob(digest)
+        if path is None:
+            raise FileNotFoundError(f"Snapshot {digest} not found in {self.root}")
+        with open(path, 'rb') as f:
+            return decompress(f.read(), codec).decode('utf-8')
+
+    def open(self, digest):
+        """
+        Open the stored content for a hash as a text stream, decompressing as it is read.
+
+        Raises:
+            FileNotFoundError: If the blob is not in the store
+        """
+        path, codec = self.find_blob(digest)
+        if path is None:
+            raise FileNotFoundError(f"Snapshot {digest} not found in {self.root}")
+        if codec == 'zstd':
+            if zstandard is None:
+                raise RuntimeError("This snapshot is zstd-compressed; install 'zstandard' to read it")
+            return io.TextIOWrapper(zstandard.ZstdDecompressor().stream_reader(open(path, 'rb'), closefd=True),
+                                    encoding='utf-8')
+        return gzip.open(path, 'rt', encoding='utf-8')
+
+
+def default_store_root(download_dir):
+    """
+    Store location for a download folder: {downloads_root}/.snapshots, where
+    download_dir is {downloads_root}/{user}/{date}.
+    """
+    return os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(download_dir))), STORE_DIR_NAME)
+
+
+def manifest_path(download_dir):
+    return os.path.join(download_dir, MANIFEST_NAME)
+
+
+def load_manifest(download_dir):
+    """
+    Load a download folder's manifest.
+
+    Returns:
+        Manifest dict (``{'store': ..., 'pages': {...}}``), or None if there is none
+    """
+    try:
+        with open(manifest_path(download_dir), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_manifest(download_dir, manifest):
+    path = manifest_path(download_dir)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def _record_page(download_dir, store, page_type, entry):
+    with _manifest_lock:
+        manifest = load_manifest(download_dir) or {}
+        manifest['store'] = os.path.relpath(store.root, download_dir)
+        manifest.setdefault('pages', {})[page_type] = entry
+        _write_manifest(download_dir, manifest)
+
+
+def open_store(download_dir, manifest=None):
+    """
+    Return the SnapshotStore a download folder's manifest points to, or None.
+    """
+    manifest = manifest if manifest is not None else load_manifest(download_dir)
+    if not manifest or 'store' not in manifest:
+        return None
+    return SnapshotStore(os.path.normpath(os.path.join(download_dir, manifest['store'])))
+
+
+def save_page_snapshot(download_dir, page_type, html, store=None):
+    """
+    Save a page into the snapshot store and record it in the folder's manifest.
+
+    Any plain {page_type}.html left in the folder is removed so readers
+    don't pick up an older copy.
+
+    Returns:
+        Path of the manifest
+    """
+    store = store or SnapshotStore(default_store_root(download_dir))
+    os.makedirs(download_dir, exist_ok=True)
+    entry = store.put(normalize_html(html))
+    entry['saved_at'] = time.time()
+    _record_page(download_dir, store, page_type, entry)
+    html_path = os.path.join(download_dir, f"{page_type}.html")
+    if os.path.exists(html_path):
+        os.remove(html_path)
+    return manifest_path(download_dir)
+
+
+def page_saved_at(download_dir, page_type):
+    """
+    Return when a page was saved in a folder (Unix time), or None if it wasn't.
+
+    Plain {page_type}.html files take precedence over manifest entries.
+    """
+    try:
+        return os.path.getmtime(os.path.join(download_dir, f"{page_type}.html"))
+    except OSError:
+        pass
+    entry = ((load_manifest(download_dir) or {}).get('pages') or {}).get(page_type)
+    return entry.get('saved_at') if entry else None
+
+
+def page_source(download_dir, page_type):
+    """
+    Locate a downloaded page without reading it.
+
+    Returns:
+        ``('file', path)`` for a plain {page_type}.html, ``('store', sha256)``
+        for a page in the snapshot store, or None if the folder holds no such page
+    """
+    html_path = os.path.join(download_dir, f"{page_type}.html")
+    if os.path.exists(html_path):
+        return 'file', html_path
+    manifest = load_manifest(download_dir)
+    entry = ((manifest or {}).get('pages') or {}).get(page_type)
+    if not entry:
+        return None
+    return 'store', entry['sha256']
+
+
+def load_page(download_dir, page_type):
+    """
+    Read a downloaded page, from {page_type}.html or the snapshot store.
+
+    Returns:
+        The page HTML, or None if the folder holds no such page
+    """
+    source = page_source(download_dir, page_type)
+    if source is None:
+        return None
+    if source[0] == 'file':
+        with open(source[1], 'r', encoding='utf-8') as f:
+            return f.read()
+    return open_store(download_dir).get(source[1])
+
+
+def open_page(download_dir, page_type):
+    """
+    Open a downloaded page for streaming, from {page_type}.html or the snapshot store.
+
+    Returns:
+        A text file object (the caller closes it), or None if the folder holds no such page
+    """
+    source = page_source(download_dir, page_type)
+    if source is None:
+        return None
+    if source[0] == 'file':
+        return open(source[1], 'r', encoding='utf-8')
+    return open_store(download_dir).open(source[1])
+
+
+def copy_page(source_dir, target_dir, page_type):
+    """
+    Make a page saved in source_dir available in target_dir.
+
+    Store-backed pages only get a manifest entry (the blob is shared);
+    plain HTML files are copied.
+
+    Returns:
+        Path the page can be found at in target_dir
+    """
+    html_path = os.path.join(source_dir, f"{page_type}.html")
+    target_html = os.path.join(target_dir, f"{page_type}.html")
+    if os.path.exists(html_path):
+        if os.path.abspath(html_path) != os.path.abspath(target_html):
+            shutil.copy2(html_path, target_html)
+        return target_html
+
+    manifest = load_manifest(source_dir)
+    if os.path.abspath(source_dir) != os.path.abspath(target_dir):
+        entry = dict(manifest['pages'][page_type])
+        _record_page(target_dir, open_store(source_dir, manifest), page_type, entry)
+    return manifest_path(target_dir)
+
+
+def pack_folder(download_dir, store=None):
+    """
+    Move the plain HTML pages of a download folder into the snapshot store.
+
+    Returns:
+        Tuple (pages packed, bytes before, bytes stored for new blobs)
+    """
+    store = store or SnapshotStore(default_store_root(download_dir))
+    packed, before, stored = 0, 0, 0
+    for name in sorted(os.listdir(download_dir)):
+        page_type, ext = os.path.splitext(name)
+        if ext != '.html' or page_type.endswith('_failed'):
+            continue
+        path = os.path.join(download_dir, name)
+        saved_at = os.path.getmtime(path)
+        before += os.path.getsize(path)
+        with open(path, 'r', encoding='utf-8') as f:
+            html = f.read()
+        content = normalize_html(html)
+        is_new = store.find_blob(content_hash(content))[0] is None
+        entry = store.put(content)
+        entry['saved_at'] = saved_at
+        _record_page(download_dir, store, page_type, entry)
+        os.remove(path)
+        packed += 1
+        stored += entry['stored_size'] if is_new else 0
+    return packed, before, stored
+
+
+def pack_downloads(downloads_root):
+    """
+    Pack every {user}/{date} folder below downloads_root into one shared store.
+    """
+    store = SnapshotStore(os.path.join(downloads_root, STORE_DIR_NAME))
+    totals = [0, 0, 0]
+    for user in sorted(os.listdir(downloads_root)):
+        user_dir = os.path.join(downloads_root, user)
+        if user == STORE_DIR_NAME or not os.path.isdir(user_dir):
+            continue
+        for date in sorted(os.listdir(user_dir)):
+            folder = os.path.join(user_dir, date)
+            if os.path.isdir(folder):
+                for i, value in enumerate(pack_folder(folder, store)):
+                    totals[i] += value
+    packed, before, stored = totals
+    print(f"Packed {packed} page(s): {before} bytes of HTML now take {stored} new bytes in {store.root}")
+    return packed, before, stored
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Pack downloaded pages into the compressed snapshot store')
+    parser.add_argument('downloads_root', nargs='?', default='downloads', help='Downloads folder (default: downloads)')
+    args = parser.parse_args()
+    pack_downloads(args.downloads_root)
+
+
+if __name__ == "__main__":
+    main()
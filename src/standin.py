@@ -0,0 +1,190 @@
+import argparse
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from src.pages import PAGE_PATHS
+
+
+EXAMPLE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'example'))
+
+# Saved eToro pages from example/ served for each page type.
+FIXTURE_FILES = {
+    "profile": os.path.join("portfolio", "person-url-1.txt"),
+    "stats": os.path.join("portfolio", "person-url-statts.txt"),
+    "portfolio": os.path.join("input", "InputContent.txt"),
+}
+
+CHART_PAGE = "<et-chart-container><canvas></canvas></et-chart-container>"
+
+# Static assets added to every page by fixture_routes(heavy_assets=True):
+# path -> (content type, size in bytes). The tracker sits below a path named
+# after its real host so the default block lists match it.
+HEAVY_ASSETS = {
+    "/assets/hero.jpg": ("image/jpeg", 400 * 1024),
+    "/assets/avatar.png": ("image/png", 120 * 1024),
+    "/assets/brand.woff2": ("font/woff2", 90 * 1024),
+    "/assets/intro.mp4": ("video/mp4", 1024 * 1024),
+    "/www.googletagmanager.com/gtm.js": ("application/javascript", 80 * 1024),
+}
+
+HEAVY_ASSETS_HTML = (
+    "<style>@font-face{font-family:Brand;src:url(/assets/brand.woff2) format('woff2')}"
+    "body{font-family:Brand,sans-serif}</style>"
+    "<img src=\"/assets/hero.jpg\"><img src=\"/assets/avatar.png\">"
+    "<video src=\"/assets/intro.mp4\" preload=\"auto\" muted></video>"
+    "<script async src=\"/www.googletagmanager.com/gtm.js\"></script>"
+)
+
+
+class Route:
+    """A canned response served by the stand-in server."""
+
+    def __init__(self, body, content_type='text/html; charset=utf-8', delay=0.0, status=200):
+        self.body = body.encode('utf-8') if isinstance(body, str) else body
+        self.content_type = content_type
+        self.delay = delay
+        self.status = status
+
+
+class StandinServer:
+    """
+    Local HTTP stand-in for eToro, used by tests and benchmarks.
+
+    Serves canned responses per path, optionally after an artificial delay,
+    from a background thread. Each request is handled in its own thread so
+    concurrent page loads overlap like they would against the real site.
+    """
+
+    def __init__(self, routes=None, host='127.0.0.1', port=0):
+        self.routes = dict(routes or {})
+        self.requests = []
+        self.bytes_served = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def add_route(self, path, body, content_type='text/html; charset=utf-8', delay=0.0, status=200):
+        self.routes[path] = Route(body, content_type=content_type, delay=delay, status=status)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, kwargs={'poll_interval': 0.05},
+                                        daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        """Serve in the calling thread until interrupted."""
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                path = self.path.split('?', 1)[0]
+                with server._lock:
+                    server.requests.append(path)
+                route = server.routes.get(path)
+                if route is None:
+                    self.send_error(404)
+                    return
+                if route.delay:
+                    time.sleep(route.delay)
+                self.send_response(route.status)
+                self.send_header('Content-Type', route.content_type)
+                self.send_header('Content-Length', str(len(route.body)))
+                self.end_headers()
+                self.wfile.write(route.body)
+                with server._lock:
+                    server.bytes_served += len(route.body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+def wrap_html(fragment, title='eToro'):
+    """Wrap a saved page fragment into a complete HTML document."""
+    return f"<!DOCTYPE html><html><head><title>{title}</title></head><body>{fragment}</body></html>"
+
+
+def fixture_routes(person, delays=None, example_dir=EXAMPLE_DIR, heavy_assets=False):
+    """
+    Build routes serving the example/ fixtures as a user's four eToro pages.
+
+    Args:
+        person: Username used in the /people/{person} paths
+        delays: Optional dict of page type -> delay in seconds
+        example_dir: Folder holding the saved pages
+        heavy_assets: Also reference and serve images, a web font, a video
+                      and a tracker script from every page (see HEAVY_ASSETS)
+
+    Returns:
+        Dict of path -> Route
+    """
+    delays = delays or {}
+    routes = {}
+    for page_type, path in PAGE_PATHS.items():
+        fixture = FIXTURE_FILES.get(page_type)
+        if fixture:
+            with open(os.path.join(example_dir, fixture), 'r', encoding='utf-8') as f:
+                body = f.read()
+        else:
+            body = CHART_PAGE
+        if heavy_assets:
+            body = HEAVY_ASSETS_HTML + body
+        routes[f"/people/{person}{path}"] = Route(wrap_html(body), delay=delays.get(page_type, 0.0))
+    if heavy_assets:
+        for path, (content_type, size) in HEAVY_ASSETS.items():
+            routes[path] = Route(b'\0' * size, content_type=content_type)
+    return routes
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve the example/ pages as a local eToro stand-in')
+    parser.add_argument('--user', default='scherenhaenden', help='Username used in the /people/{user} paths')
+    parser.add_argument('--port', type=int, default=8000, help='Port to listen on (default: 8000)')
+    parser.add_argument('--delay', action='append', default=[], metavar='PAGE=SECONDS',
+                        help='Artificial delay for a page type, e.g. --delay stats=2.5')
+    parser.add_argument('--heavy-assets', action='store_true', help='Add images, fonts, video and a tracker to every page')
+    args = parser.parse_args()
+
+    delays = {}
+    for item in args.delay:
+        page_type, _, seconds = item.partition('=')
+        delays[page_type] = float(seconds)
+
+    server = StandinServer(fixture_routes(args.user, delays, heavy_assets=args.heavy_assets), port=args.port)
+    print(f"Serving eToro stand-in for '{args.user}' at {server.base_url}/people/{args.user}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -1,170 +1,175 @@
 import json
 import re
-from bs4 import BeautifulSoup
 
-def extract_stats_data(html_content):
-    """
-    Parses the HTML of an eToro user's stats page to extract detailed statistics.
-    """
-    soup = BeautifulSoup(html_content, 'html.parser')
-    data = {}
+from src.network_capture import DEFAULT_RANKINGS_PERIOD, format_percent, rankings_by_period
+from src.extract_spec import compile_spec, field, records, sel
+from src.normalize import typed_values
+from src.parsed_page import LazySections, as_parsed_page
+from src.performance_parser import PROFITABLE_WEEKS
+from src.strategy_cache import run_strategies
 
-    # --- 1. Performance Metrics ---
-    performance = {}
-    
-    # Copiers
-    # Try multiple possible selectors
-    copiers_elem = soup.find('div', attrs={'automation-id': 'stats-copiers-chart-copiers-value'})
-    if not copiers_elem:
-        copiers_elem = soup.find('span', attrs={'automation-id': 'copiers-value'})
-    
-    if copiers_elem:
-        performance['copiers_12m'] = copiers_elem.text.strip()
+# Text labels the fallbacks look for when the automation-ids are missing.
+ALLOCATION_LABELS = ['Stocks', 'Crypto', 'ETF', 'Indices', 'Commodities', 'Currencies', 'Copy & SmartPortfolios']
+DIVIDEND_LABELS = {
+    'assets_paying_dividends': 'Assets Paying Dividends',
+    'annual_income': 'Annual Income',
+    'monthly_income': 'Monthly Income',
+    'daily_income': 'Daily Income',
+    'income_last_12m': 'Income (Last 12 Months)',
+}
+ESG_CATEGORIES = ['Environmental', 'Social', 'Governance']
+
+# Allocation labels match case-sensitively, dividend labels case-insensitively,
+# ESG categories only as a whole text node.
+STATS_LABELS = tuple([(label, 'contains') for label in ALLOCATION_LABELS]
+                     + [(label, 'icontains') for label in DIVIDEND_LABELS.values()]
+                     + [(category, 'exact') for category in ESG_CATEGORIES])
 
+ALLOCATION_CONTAINER = sel('div', automation_id='stats-portfolio-allocation-container')
+
+# Everything the stats page's automation-ids and classes give, extracted in
+# one traversal; the label searches below are fallbacks on top of it.
+STATS_SPEC = compile_spec({
+    # Copiers: several possible selectors, the one that worked most often first
+    'copiers_12m': field(('chart-copiers-value', sel('div', automation_id='stats-copiers-chart-copiers-value')),
+                         ('copiers-value', sel('span', automation_id='copiers-value')),
+                         strategy_field='stats.copiers'),
     # User vs Market Return
-    user_return_elem = soup.find('span', attrs={'automation-id': 'compare-user-performance-value'})
-    market_return_elem = soup.find('span', attrs={'automation-id': 'compare-market-performance-value'})
-    
-    if user_return_elem or market_return_elem:
+    'user_return': field(sel('span', automation_id='compare-user-performance-value')),
+    'market_return': field(sel('span', automation_id='compare-market-performance-value')),
+    'allocation_container': field(ALLOCATION_CONTAINER, value=None),
+    'allocation_names': field((ALLOCATION_CONTAINER, sel('span', class_='name')), many=True),
+    'allocation_values': field((ALLOCATION_CONTAINER, sel('span', class_='value')), many=True),
+    'allocation_bars': records((ALLOCATION_CONTAINER, sel('div', class_=lambda x: 'bar' in x)), {
+        'name': field(sel('span', class_='name')),
+        'value': field(sel('span', class_='value')),
+    }),
+    'dividend_yield': field(sel('div', automation_id='stats-dividends-yield-value')),
+    'total_trades_12m': field(sel('div', automation_id='stats-trading-total-trades-value')),
+    'profitable_trades_percentage': field(sel('div', automation_id='stats-trading-profitability-value')),
+    'average_profit': field(sel('div', automation_id='stats-trading-avg-profit-value')),
+    'average_loss': field(sel('div', automation_id='stats-trading-avg-loss-value')),
+    'trades_per_week': field(sel('div', automation_id='stats-trading-trades-per-week-value')),
+    'average_holding_time': field(sel('div', automation_id='stats-trading-avg-holding-time-value')),
+    'account_active_since': field(sel('div', automation_id='stats-trading-active-since-value')),
+    'profitable_weeks': PROFITABLE_WEEKS,
+    'overall_score': field(sel('div', automation_id='user-stats-esg-score-value')),
+    # Sub-scores (Environmental, Social, Governance) are often in a list under the main score
+    'esg_list': field(sel('div', class_='esg-breakdown-list'), value=None),  # Hypothetical class
+})
+
+def _present(fields, keys):
+    return {key: fields[key] for key in keys if fields[key] is not None}
+
+def _performance_section(page):
+    fields = page.fields(STATS_SPEC)
+    performance = _present(fields, ['copiers_12m'])
+    if fields['user_return'] is not None or fields['market_return'] is not None:
         performance['user_vs_spx500'] = {
-            'user': user_return_elem.text.strip() if user_return_elem else None,
-            'spx500': market_return_elem.text.strip() if market_return_elem else None
+            'user': fields['user_return'],
+            'spx500': fields['market_return'],
         }
-    
-    data['performance'] = performance
+    return performance
+
+def _allocation_from_spans(fields):
+    # Strategy 1: Look for specific automation-ids for names and values
+    names, values = fields['allocation_names'], fields['allocation_values']
+    if len(names) == len(values) and names:
+        return dict(zip(names, values))
+    return {}
+
+def _allocation_from_bars(fields):
+    # Strategy 2: Iterate through rows/bars
+    return {bar['name']: bar['value'] for bar in fields['allocation_bars']
+            if bar['name'] is not None and bar['value'] is not None}
 
-    # --- 2. Asset Allocation ---
+def _allocation_from_labels(page):
+    # Search entire soup for allocation-like structures
+    labels = page.labels(STATS_LABELS)
     asset_allocation = {}
+    # Look for elements that might be allocation labels
+    for label in ALLOCATION_LABELS:
+        label_elem = labels.first(label)
+        if label_elem:
+            # Try to find a nearby percentage value
+            parent = label_elem.find_parent('div')
+            if parent:
+                val = parent.find(string=re.compile(r'\d+\.?\d*%'))
+                if val:
+                    asset_allocation[label] = val.strip()
+    return asset_allocation
+
+def _asset_allocation_section(page):
+    fields = page.fields(STATS_SPEC)
     # Look for the allocation container
-    allocation_container = soup.find('div', attrs={'automation-id': 'stats-portfolio-allocation-container'})
+    has_container = fields['allocation_container'] is not None
+    # Try to find bars or list items within the container, then fall back to
+    # the label search; the layouts can pair names and values differently, so
+    # their order is fixed
+    strategies = [('name-value-spans', lambda: _allocation_from_spans(fields) if has_container else {}),
+                  ('bars', lambda: _allocation_from_bars(fields) if has_container else {}),
+                  ('labels', lambda: _allocation_from_labels(page))]
+    return run_strategies('stats.asset_allocation', strategies, reorder=False) or {}
+
+def _dividends_section(page):
+    labels = page.labels(STATS_LABELS)
+    dividends = _present(page.fields(STATS_SPEC), ['dividend_yield'])
     
-    if allocation_container:
-        # Try to find bars or list items within the container
-        # Strategy 1: Look for specific automation-ids for names and values
-        names = allocation_container.find_all('span', class_='name')
-        values = allocation_container.find_all('span', class_='value')
-        
-        if len(names) == len(values) and names:
-            for n, v in zip(names, values):
-                asset_allocation[n.text.strip()] = v.text.strip()
-        else:
-            # Strategy 2: Iterate through rows/bars
-            bars = allocation_container.find_all('div', class_=lambda x: x and 'bar' in x)
-            for bar in bars:
-                name = bar.find('span', class_='name')
-                value = bar.find('span', class_='value')
-                if name and value:
-                    asset_allocation[name.text.strip()] = value.text.strip()
-
-    # Fallback: Search entire soup for allocation-like structures if container not found
-    if not asset_allocation:
-        # Look for elements that might be allocation labels
-        potential_labels = ['Stocks', 'Crypto', 'ETF', 'Indices', 'Commodities', 'Currencies', 'Copy & SmartPortfolios']
-        for label in potential_labels:
-            label_elem = soup.find(string=lambda x: x and label in x)
-            if label_elem:
-                # Try to find a nearby percentage value
-                parent = label_elem.find_parent('div')
-                if parent:
-                    val = parent.find(string=re.compile(r'\d+\.?\d*%'))
-                    if val:
-                        asset_allocation[label] = val.strip()
+    def sibling_value(parent):
+        # Check siblings
+        value = parent.find_next_sibling('div')
+        if value and (value.get('class') == ['value'] or 'ets-num' in (value.get('class') or [])):
+            return value
+        return None
 
-    data['asset_allocation'] = asset_allocation
+    def grandparent_value(parent):
+        # Check children of parent's parent (common in grid layouts)
+        grandparent = parent.parent
+        if grandparent:
+            return grandparent.find('span', class_='value') or grandparent.find('div', class_='value')
+        return None
 
-    # --- 3. Dividends ---
-    dividends = {}
-    div_yield_elem = soup.find('div', attrs={'automation-id': 'stats-dividends-yield-value'})
-    if div_yield_elem:
-        dividends['dividend_yield'] = div_yield_elem.text.strip()
-    
     # Helper to find values by label text
     def find_value_by_label(label_text):
         # Find the label text
-        label = soup.find(string=lambda x: x and label_text.lower() in x.lower())
+        label = labels.first(label_text, 'icontains')
         if label:
             # The value is often in a sibling element or a child of the parent
             # Traverse up to a container row/card and look for a value class
             parent = label.find_parent('div') # Immediate parent
             if parent:
-                # Check siblings
-                value = parent.find_next_sibling('div')
-                if value and (value.get('class') == ['value'] or 'ets-num' in (value.get('class') or [])):
+                # The grandparent search is wider and may find another value: keep the order
+                value = run_strategies('stats.dividends', [
+                    ('next-sibling', lambda: sibling_value(parent)),
+                    ('grandparent-value', lambda: grandparent_value(parent)),
+                ], reorder=False)
+                if value:
                     return value.text.strip()
-                
-                # Check children of parent's parent (common in grid layouts)
-                grandparent = parent.parent
-                if grandparent:
-                    value = grandparent.find('span', class_='value') or grandparent.find('div', class_='value')
-                    if value:
-                        return value.text.strip()
         return None
 
-    dividends['assets_paying_dividends'] = find_value_by_label('Assets Paying Dividends')
-    dividends['annual_income'] = find_value_by_label('Annual Income')
-    dividends['monthly_income'] = find_value_by_label('Monthly Income')
-    dividends['daily_income'] = find_value_by_label('Daily Income')
-    dividends['income_last_12m'] = find_value_by_label('Income (Last 12 Months)')
+    for key, label_text in DIVIDEND_LABELS.items():
+        dividends[key] = find_value_by_label(label_text)
 
-    data['dividends'] = dividends
+    return dividends
 
-    # --- 4. Trading Statistics ---
-    trading_stats = {}
-    total_trades_elem = soup.find('div', attrs={'automation-id': 'stats-trading-total-trades-value'})
-    if total_trades_elem:
-        trading_stats['total_trades_12m'] = total_trades_elem.text.strip()
-    
-    profitability_elem = soup.find('div', attrs={'automation-id': 'stats-trading-profitability-value'})
-    if profitability_elem:
-        trading_stats['profitable_trades_percentage'] = profitability_elem.text.strip()
-        
-    # Avg Profit/Loss
-    avg_profit_elem = soup.find('div', attrs={'automation-id': 'stats-trading-avg-profit-value'})
-    if avg_profit_elem:
-        trading_stats['average_profit'] = avg_profit_elem.text.strip()
-        
-    avg_loss_elem = soup.find('div', attrs={'automation-id': 'stats-trading-avg-loss-value'})
-    if avg_loss_elem:
-        trading_stats['average_loss'] = avg_loss_elem.text.strip()
+def _trading_statistics_section(page):
+    return _present(page.fields(STATS_SPEC),
+                    ['total_trades_12m', 'profitable_trades_percentage', 'average_profit', 'average_loss'])
 
-    data['trading_statistics'] = trading_stats
+def _additional_stats_section(page):
+    return _present(page.fields(STATS_SPEC),
+                    ['trades_per_week', 'average_holding_time', 'account_active_since', 'profitable_weeks'])
 
-    # --- 5. Additional Stats ---
-    additional_stats = {}
-    trades_week_elem = soup.find('div', attrs={'automation-id': 'stats-trading-trades-per-week-value'})
-    if trades_week_elem:
-        additional_stats['trades_per_week'] = trades_week_elem.text.strip()
-    
-    holding_time_elem = soup.find('div', attrs={'automation-id': 'stats-trading-avg-holding-time-value'})
-    if holding_time_elem:
-        additional_stats['average_holding_time'] = holding_time_elem.text.strip()
-        
-    active_since_elem = soup.find('div', attrs={'automation-id': 'stats-trading-active-since-value'})
-    if active_since_elem:
-        additional_stats['account_active_since'] = active_since_elem.text.strip()
-
-    # Profitable weeks
-    profitable_weeks_elem = soup.find('div', attrs={'automation-id': 'stats-chart-profitable-weeks-parameter'})
-    if profitable_weeks_elem:
-         val = profitable_weeks_elem.find('span', class_='data-value')
-         if val:
-             additional_stats['profitable_weeks'] = val.text.strip()
-
-    data['additional_stats'] = additional_stats
-
-    # --- 6. ESG Rating ---
-    esg = {}
-    esg_score_elem = soup.find('div', attrs={'automation-id': 'user-stats-esg-score-value'})
-    if esg_score_elem:
-        esg['overall_score'] = esg_score_elem.text.strip()
+def _esg_rating_section(page):
+    fields = page.fields(STATS_SPEC)
+    esg = _present(fields, ['overall_score'])
     
     # Sub-scores (Environmental, Social, Governance)
-    # These are often in a list under the main score
-    esg_list = soup.find('div', class_='esg-breakdown-list') # Hypothetical class
-    if not esg_list:
+    if fields['esg_list'] is None:
+        labels = page.labels(STATS_LABELS)
         # Try finding by label
-        for cat in ['Environmental', 'Social', 'Governance']:
-            cat_elem = soup.find(string=cat)
+        for cat in ESG_CATEGORIES:
+            cat_elem = labels.first(cat, 'exact')
             if cat_elem:
                 # Value is usually nearby
                 parent = cat_elem.find_parent('div')
@@ -173,9 +178,84 @@ def extract_stats_data(html_content):
                     if val:
                         esg[cat.lower()] = val.text.strip()
 
-    data['esg_rating'] = esg
+    return esg
+
+# Sections of the stats data in output order, with the function extracting each.
+STATS_SECTIONS = {
+    'performance': _performance_section,
+    'asset_allocation': _asset_allocation_section,
+    'dividends': _dividends_section,
+    'trading_statistics': _trading_statistics_section,
+    'additional_stats': _additional_stats_section,
+    'esg_rating': _esg_rating_section,
+}
+
+def extract_stats_data(html_content, sections=None, typed=False, locale='auto'):
+    """
+    Parses the HTML of an eToro user's stats page to extract detailed statistics.
+
+    Args:
+        html_content: The page's HTML or a ParsedPage
+        sections: Names of the STATS_SECTIONS to extract (default: all); the
+                  label searches only run for sections that need them
+        typed: Give numeric values as ``{'raw', 'value', 'unit'}`` (see src/normalize.py)
+        locale: Number format of the page: 'en', 'de' or 'auto'
+
+    Raises:
+        ValueError: If a section name is unknown
+    """
+    data = dict(lazy_stats_data(html_content, sections))
+    return typed_values(data, locale) if typed else data
+
+def lazy_stats_data(html_content, sections=None):
+    """
+    Like extract_stats_data, but returns a LazySections mapping that extracts
+    each section on first access.
+    """
+    return LazySections(as_parsed_page(html_content), STATS_SECTIONS, sections)
+
+def extract_stats_data_from_api(responses, typed=False):
+    """
+    Builds the stats data from the JSON responses captured while the stats page
+    loaded (see src/network_capture.py), without touching the DOM.
+
+    Returns the same sections as extract_stats_data(), or None when the
+    responses contain no ranking data so callers can fall back to the HTML.
+    With ``typed``, numeric values are given like extract_stats_data(typed=True).
+    """
+    rankings = rankings_by_period(responses)
+    ranking = rankings.get(DEFAULT_RANKINGS_PERIOD) or next(iter(rankings.values()), None)
+    if not ranking:
+        return None
+
+    performance = {}
+    if ranking.get('Copiers') is not None:
+        performance['copiers_12m'] = str(ranking['Copiers'])
+    if format_percent(ranking.get('Gain')):
+        performance['user_vs_spx500'] = {
+            'user': format_percent(ranking['Gain'], signed=True),
+            'spx500': None
+        }
+
+    trading_stats = {}
+    if ranking.get('Trades') is not None:
+        trading_stats['total_trades_12m'] = str(ranking['Trades'])
+    if format_percent(ranking.get('WinRatio')):
+        trading_stats['profitable_trades_percentage'] = format_percent(ranking['WinRatio'])
+
+    additional_stats = {}
+    if format_percent(ranking.get('ProfitableWeeksPct')):
+        additional_stats['profitable_weeks'] = format_percent(ranking['ProfitableWeeksPct'])
 
-    return data
+    data = {
+        'performance': performance,
+        'asset_allocation': {},
+        'dividends': {},
+        'trading_statistics': trading_stats,
+        'additional_stats': additional_stats,
+        'esg_rating': {}
+    }
+    return typed_values(data) if typed else data
 
 def generate_stats_json(data, output_path):
     with open(output_path, 'w', encoding='utf-8') as f:
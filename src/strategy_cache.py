@@ -0,0 +1,243 @@
+import argparse
+import json
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+CACHE_FILE_NAME = 'strategy_cache.json'
+
+_default = None
+_default_lock = threading.Lock()
+
+
+class StrategyCache:
+    """
+    Hit and miss counters of the alternative strategies extractors try per field.
+
+    Extractors with several ways of finding a value (selector fallbacks,
+    label searches) run them through run_strategies(), which asks order()
+    for the strategies sorted by past hit rate and records every attempt.
+    A strategy that keeps working against the current markup is therefore
+    tried first, and falling hit rates show markup drift.
+
+    Counters are kept in memory and merged into the JSON file at ``path`` by
+    save(), under a file lock, so several processes can share one file.
+    Worker processes hand their counters to the parent instead
+    (take_unsaved()/merge()), which saves once per run.
+
+    Args:
+        path: JSON file to load from and save to (None keeps counters in memory only)
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self._counts = {}   # field -> strategy -> [hits, misses], including the saved ones
+        self._unsaved = {}  # the same, for attempts since the last save()
+        self._lock = threading.Lock()
+        if path is not None:
+            self._counts = _read_counts(path)
+
+    def order(self, field, strategies):
+        """
+        Sort ``(name, strategy)`` pairs by hit rate, best first.
+
+        Rates are smoothed ((hits + 1) / (attempts + 2)), so untried
+        strategies rank as 50% and ties keep the declared order - a fresh
+        cache tries the strategies exactly as written.
+        """
+        with self._lock:
+            counts = self._counts.get(field, {})
+            rates = {name: (counts[name][0] + 1) / (sum(counts[name]) + 2) if name in counts else 0.5
+                     for name, _ in strategies}
+        return sorted(strategies, key=lambda pair: -rates[pair[0]])
+
+    def record(self, field, strategy, hit):
+        with self._lock:
+            for table in (self._counts, self._unsaved):
+                counts = table.setdefault(field, {}).setdefault(strategy, [0, 0])
+                counts[0 if hit else 1] += 1
+
+    def stats(self):
+        """
+        Returns:
+            Dict of field to strategy to ``{'hits', 'misses', 'hit_rate'}``
+        """
+        with self._lock:
+            return {
+                field: {
+                    name: {'hits': hits, 'misses': misses,
+                           'hit_rate': round(hits / (hits + misses), 3) if hits + misses else None}
+                    for name, (hits, misses) in strategies.items()
+                }
+                for field, strategies in self._counts.items()
+            }
+
+    def take_unsaved(self):
+        """
+        Return the attempts recorded since the last save and forget them,
+        for a worker process to hand to the parent's cache (see merge()).
+        """
+        with self._lock:
+            unsaved, self._unsaved = self._unsaved, {}
+        return unsaved
+
+    def merge(self, counts):
+        """Add counters taken from another cache with take_unsaved()."""
+        with self._lock:
+            for field, strategies in counts.items():
+                for name, (hits, misses) in strategies.items():
+                    for table in (self._counts, self._unsaved):
+                        merged = table.setdefault(field, {}).setdefault(name, [0, 0])
+                        merged[0] += hits
+                        merged[1] += misses
+
+    def save(self):
+        """
+        Add the attempts recorded since the last save to the file's counters.
+
+        The file is re-read under an exclusive lock first, so counts saved
+        meanwhile by other processes are kept; it is replaced atomically.
+        """
+        if self.path is None:
+            return
+        with self._lock:
+            if not self._unsaved:
+                return
+            with _file_lock(self.path):
+                counts = _read_counts(self.path)
+                for field, strategies in self._unsaved.items():
+                    for name, (hits, misses) in strategies.items():
+                        saved = counts.setdefault(field, {}).setdefault(name, [0, 0])
+                        saved[0] += hits
+                        saved[1] += misses
+                _write_counts(self.path, counts)
+            self._counts = counts
+            self._unsaved = {}
+
+    def reset(self):
+        """Forget all counters, including the saved ones."""
+        with self._lock:
+            self._counts = {}
+            self._unsaved = {}
+            if self.path is not None and os.path.exists(self.path):
+                os.remove(self.path)
+
+
+@contextmanager
+def _file_lock(path):
+    """Hold an exclusive lock on {path}.lock (where fcntl is available) while the file is merged."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    if fcntl is None:
+        yield
+        return
+    with open(path + '.lock', 'a') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def _read_counts(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return {field: {name: [counts.get('hits', 0), counts.get('misses', 0)] for name, counts in strategies.items()}
+            for field, strategies in (data.get('fields') or {}).items()}
+
+
+def _write_counts(path, counts):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    data = {'fields': {field: {name: {'hits': hits, 'misses': misses} for name, (hits, misses) in strategies.items()}
+                       for field, strategies in counts.items()}}
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def default_cache_path():
+    from src.dependencies import cache_dir
+
+    return os.path.join(cache_dir(), CACHE_FILE_NAME)
+
+
+def get_strategy_cache():
+    """Return the process-wide StrategyCache, stored in the EtoroHelper cache directory."""
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = StrategyCache(default_cache_path())
+        return _default
+
+
+def run_strategies(field, strategies, cache=None, reorder=True):
+    """
+    Try alternative strategies for a field, best-performing first.
+
+    Args:
+        field: Name the counters are kept under (e.g. 'stats.copiers')
+        strategies: List of ``(name, callable)``; a callable returns the value,
+                    or a falsy value when it found nothing
+        cache: StrategyCache to use (default: get_strategy_cache())
+        reorder: Sort the strategies by hit rate; with False they run in the
+                 declared order and are only counted (for drift reports)
+
+    Only strategies that are alternative ways of finding the same value may
+    be reordered: once one has a better record than another, it is tried
+    first and its result wins, so strategies that can give different results
+    (a fallback meant for other pages, a wider search) must keep their order.
+
+    Returns:
+        The first truthy value, or None if every strategy missed
+    """
+    cache = cache if cache is not None else get_strategy_cache()
+    for name, strategy in (cache.order(field, strategies) if reorder else strategies):
+        value = strategy()
+        cache.record(field, name, bool(value))
+        if value:
+            return value
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Show the hit rates of the extractors\' fallback strategies')
+    parser.add_argument('--reset', action='store_true', help='Clear all counters')
+    args = parser.parse_args()
+
+    cache = get_strategy_cache()
+    if args.reset:
+        cache.reset()
+        print(f"Cleared {cache.path}")
+        return
+
+    stats = cache.stats()
+    if not stats:
+        print(f"No strategy attempts recorded yet in {cache.path}")
+        return
+    for field, strategies in sorted(stats.items()):
+        print(field)
+        for name, counts in strategies.items():
+            rate = counts['hit_rate']
+            print(f"  {name:<22} {counts['hits']:>6} hit(s) {counts['misses']:>6} miss(es)  "
+                  f"{'-' if rate is None else f'{rate:.0%}':>5}")
+        # Every strategy failing most of the time means the markup moved on.
+        if all(counts['hit_rate'] is not None and counts['hit_rate'] < 0.5 for counts in strategies.values()):
+            print("  ! no strategy hits reliably any more - check for markup drift")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,6 @@
+import shutil
 import sys
+import types
 from pathlib import Path
 from unittest.mock import MagicMock, patch
 
@@ -11,6 +13,128 @@ if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
 
 
+# Selenium and webdriver-manager are not needed to exercise the code paths under
+# test, so provide minimal stand-ins when they are not installed.
+def ensure_selenium_stub():
+    """Provide a minimal selenium module if it is missing."""
+    if 'selenium' in sys.modules:
+        return
+
+    selenium_mod = types.ModuleType('selenium')
+    webdriver_mod = types.ModuleType('selenium.webdriver')
+    support_mod = types.ModuleType('selenium.webdriver.support')
+    support_ui_mod = types.ModuleType('selenium.webdriver.support.ui')
+
+    support_ui_mod.WebDriverWait = MagicMock()
+
+    support_mod.ui = support_ui_mod
+    webdriver_mod.support = support_mod
+    webdriver_mod.Chrome = MagicMock()
+    options_obj = MagicMock()
+    options_obj.add_argument = MagicMock()
+    options_obj.add_argument.side_effect = lambda *_: None
+    webdriver_mod.ChromeOptions = MagicMock(return_value=options_obj)
+    selenium_mod.webdriver = webdriver_mod
+
+    sys.modules['selenium'] = selenium_mod
+    sys.modules['selenium.webdriver'] = webdriver_mod
+    sys.modules['selenium.webdriver.support'] = support_mod
+    sys.modules['selenium.webdriver.support.ui'] = support_ui_mod
+
+
+ensure_selenium_stub()
+
+
+def ensure_webdriver_manager_stub():
+    """Stub webdriver_manager module used by downloader."""
+    if 'webdriver_manager' in sys.modules:
+        return
+
+    webdriver_manager_mod = types.ModuleType('webdriver_manager')
+    chrome_mod = types.ModuleType('webdriver_manager.chrome')
+
+    class DummyChromeDriverManager:
+        def install(self):
+            return '/tmp/chromedriver'
+
+    chrome_mod.ChromeDriverManager = DummyChromeDriverManager
+    webdriver_manager_mod.chrome = chrome_mod
+
+    sys.modules['webdriver_manager'] = webdriver_manager_mod
+    sys.modules['webdriver_manager.chrome'] = chrome_mod
+
+
+ensure_webdriver_manager_stub()
+
+
+def ensure_chrome_submodules():
+    chrome_mod = types.ModuleType('selenium.webdriver.chrome')
+    service_mod = types.ModuleType('selenium.webdriver.chrome.service')
+    service_mod.Service = MagicMock()
+    chrome_mod.service = service_mod
+    sys.modules['selenium.webdriver.chrome'] = chrome_mod
+    sys.modules['selenium.webdriver.chrome.service'] = service_mod
+
+
+ensure_chrome_submodules()
+
+
+def ensure_selenium_common_modules():
+    common_mod = types.ModuleType('selenium.webdriver.common')
+    by_mod = types.ModuleType('selenium.webdriver.common.by')
+
+    class By:
+        CSS_SELECTOR = 'css selector'
+        ID = 'id'
+
+    by_mod.By = By
+    common_mod.by = by_mod
+
+    ec_mod = types.ModuleType('selenium.webdriver.support.expected_conditions')
+
+    def presence_of_element_located(selector):
+        def _predicate(driver):
+            return True
+
+        return _predicate
+
+    ec_mod.presence_of_element_located = presence_of_element_located
+
+    sys.modules['selenium.webdriver.common'] = common_mod
+    sys.modules['selenium.webdriver.common.by'] = by_mod
+    sys.modules['selenium.webdriver.support.expected_conditions'] = ec_mod
+
+
+ensure_selenium_common_modules()
+
+
+def real_browser_available():
+    """True when real selenium and a Chrome binary are installed."""
+    selenium_mod = sys.modules.get('selenium')
+    if selenium_mod is None:
+        try:
+            import selenium as selenium_mod
+        except ImportError:
+            return False
+    if not getattr(selenium_mod, '__file__', None):
+        return False
+    return any(shutil.which(name) for name in ('google-chrome', 'chromium', 'chromium-browser'))
+
+
+requires_browser = pytest.mark.skipif(not real_browser_available(), reason='requires selenium and Chrome')
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache_dir(tmp_path, monkeypatch):
+    """Keep caches written during tests (strategy hit rates, parse results) out of the user's cache directory."""
+    from src import parse_cache, strategy_cache
+
+    monkeypatch.setenv('ETOROHELPER_CACHE_DIR', str(tmp_path / 'cache'))
+    monkeypatch.delenv('ETOROHELPER_PARSE_CACHE', raising=False)
+    monkeypatch.setattr(strategy_cache, '_default', None)
+    monkeypatch.setattr(parse_cache, '_default', None)
+
+
 @pytest.fixture
 def mock_selenium_driver():
     """Mock Selenium WebDriver for testing."""
@@ -0,0 +1,125 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.batch import DriverPool, download_users, load_usernames
+
+
+def fake_download(person, download_dir, driver_provider=None, **kwargs):
+    """Pretend every page of a user was downloaded with a pooled driver."""
+    driver_provider().get(person)
+    return {page: {'status': 'ok', 'source': 'selenium', 'path': None, 'seconds': 0.0}
+            for page in ('profile', 'stats', 'portfolio', 'chart')}
+
+
+class TestLoadUsernames:
+    """Test cases for reading the batch users file."""
+
+    def test_reads_usernames_and_urls(self, tmp_path):
+        users_file = tmp_path / 'users.txt'
+        users_file.write_text(
+            "# watchlist\n"
+            "alice\n"
+            "\n"
+            "https://www.etoro.com/people/bob/stats\n"
+            "alice\n"
+            "bad@name\n",
+            encoding='utf-8',
+        )
+
+        assert load_usernames(str(users_file)) == ['alice', 'bob']
+
+    def test_missing_file_raises(self, tmp_path):
+        with pytest.raises(OSError):
+            load_usernames(str(tmp_path / 'missing.txt'))
+
+
+class TestDriverPool:
+    """Test cases for the pooled WebDriver."""
+
+    def test_driver_is_reused_until_recycle_limit(self):
+        factory = MagicMock(side_effect=lambda: MagicMock())
+        pool = DriverPool(size=1, max_pages_per_driver=8, driver_factory=factory)
+
+        with pool.lease() as lease:
+            first = lease.driver
+            lease.pages += 4
+        with pool.lease() as lease:
+            assert lease.driver is first
+            lease.pages += 4
+        with pool.lease() as lease:
+            assert lease.driver is not first
+
+        first.quit.assert_called_once()
+        assert pool.drivers_started == 2
+        assert pool.drivers_recycled == 1
+
+    def test_failed_lease_discards_driver(self):
+        factory = MagicMock(side_effect=lambda: MagicMock())
+        pool = DriverPool(size=1, driver_factory=factory)
+
+        with pytest.raises(RuntimeError):
+            with pool.lease() as lease:
+                broken = lease.driver
+                raise RuntimeError('session lost')
+
+        broken.quit.assert_called_once()
+        with pool.lease() as lease:
+            assert lease.driver is not broken
+
+    def test_factory_failure_frees_slot(self):
+        pool = DriverPool(size=1, driver_factory=MagicMock(side_effect=Exception('no chrome')))
+
+        for _ in range(2):
+            with pytest.raises(Exception, match='no chrome'):
+                pool.acquire()
+
+
+class TestDownloadUsers:
+    """Test cases for the batch download entry point."""
+
+    @patch('src.downloader.download_person_data', side_effect=fake_download)
+    def test_browsers_are_bounded_and_reused(self, mock_download, tmp_path, capsys):
+        factory = MagicMock(side_effect=lambda: MagicMock())
+        users = [f'user{i}' for i in range(10)]
+
+        summary = download_users(users, downloads_root=str(tmp_path), date='2026-02-23',
+                                 workers=2, max_pages_per_driver=100, driver_factory=factory)
+
+        assert mock_download.call_count == 10
+        assert summary['succeeded'] == 10
+        assert summary['pages'] == 40
+        assert summary['drivers_started'] <= 2
+        assert summary['users_per_minute'] > 0
+        assert 'users/min' in capsys.readouterr().out
+
+    @patch('src.downloader.download_person_data', side_effect=fake_download)
+    def test_drivers_are_recycled(self, mock_download, tmp_path):
+        factory = MagicMock(side_effect=lambda: MagicMock())
+
+        summary = download_users(['a', 'b', 'c'], downloads_root=str(tmp_path), date='2026-02-23',
+                                 workers=1, max_pages_per_driver=4, driver_factory=factory)
+
+        assert summary['drivers_started'] == 3
+        assert summary['drivers_recycled'] == 3
+
+    @patch('src.downloader.download_person_data')
+    def test_failed_pages_are_retried_at_the_end(self, mock_download, tmp_path):
+        attempts = []
+
+        def flaky_download(person, download_dir, driver_provider=None, pages=None, **kwargs):
+            attempts.append((person, pages))
+            pages = pages or ['profile', 'stats', 'portfolio', 'chart']
+            failed = person == 'a' and len(attempts) == 1
+            return {page: {'status': 'failed' if failed and page == 'stats' else 'ok', 'source': 'http'}
+                    for page in pages}
+
+        mock_download.side_effect = flaky_download
+
+        summary = download_users(['a', 'b'], downloads_root=str(tmp_path), date='2026-02-23',
+                                 workers=1, driver_factory=MagicMock(), retry_delay=0.001)
+
+        assert attempts == [('a', None), ('b', None), ('a', ['stats'])]
+        assert summary['retries'] == 1
+        assert summary['succeeded'] == 2
+        assert list(summary['results']['a']) == ['profile', 'stats', 'portfolio', 'chart']
@@ -0,0 +1,107 @@
+import os
+import socket
+import stat
+import threading
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.daemon import BrowserDaemon, DaemonClient, DaemonError, default_address, find_daemon
+from test_batch import fake_download
+
+needs_unix_sockets = pytest.mark.skipif(not hasattr(socket, 'AF_UNIX'), reason='Unix sockets not available')
+
+
+@pytest.fixture
+def daemon(tmp_path):
+    """A daemon on a socket in the cache directory with fake browsers, served from a thread."""
+    factory = MagicMock(side_effect=lambda: MagicMock())
+    server = BrowserDaemon(downloads_root=str(tmp_path / 'downloads'), workers=1, driver_factory=factory)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    thread.join(timeout=5)
+
+
+class TestBrowserDaemon:
+    """Test cases for the persistent browser daemon."""
+
+    def test_warm_browser_is_reused_across_jobs(self, daemon, tmp_path):
+        client = find_daemon()
+        assert client is not None
+
+        with patch('src.downloader.download_person_data', side_effect=fake_download):
+            first = client.download('alice', str(tmp_path / 'downloads' / 'alice'))
+            second = client.download('bob', str(tmp_path / 'downloads' / 'bob'))
+
+        assert first['profile']['status'] == 'ok'
+        assert second['chart']['status'] == 'ok'
+        info = client.request({'command': 'ping'})
+        assert info['jobs_served'] == 2
+        assert info['drivers_started'] == 1
+
+    def test_invalid_username_is_rejected(self, daemon, tmp_path):
+        client = DaemonClient(daemon.address)
+
+        with pytest.raises(DaemonError):
+            client.download('bad@name', str(tmp_path / 'downloads'))
+
+    def test_download_dir_outside_downloads_root_is_rejected(self, daemon, tmp_path):
+        client = DaemonClient(daemon.address)
+
+        with patch('src.downloader.download_person_data', side_effect=fake_download) as download:
+            for download_dir in (tmp_path / 'elsewhere', tmp_path / 'downloads' / '..' / 'elsewhere', '/etc'):
+                with pytest.raises(DaemonError, match='must be inside'):
+                    client.download('alice', str(download_dir))
+        download.assert_not_called()
+
+    @needs_unix_sockets
+    def test_socket_is_private_to_the_user(self, daemon):
+        assert daemon.address == default_address()
+        assert stat.S_IMODE(os.stat(daemon.address).st_mode) == 0o600
+
+    @needs_unix_sockets
+    def test_second_daemon_does_not_take_over_the_socket(self, daemon, tmp_path):
+        with pytest.raises(DaemonError, match='already listening'):
+            BrowserDaemon(downloads_root=str(tmp_path), workers=1)
+        assert find_daemon() is not None
+
+
+@needs_unix_sockets
+def test_stale_socket_is_replaced(tmp_path):
+    path = default_address()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with socket.socket(socket.AF_UNIX) as sock:
+        sock.bind(path)
+    assert find_daemon() is None
+
+    server = BrowserDaemon(downloads_root=str(tmp_path), workers=1, driver_factory=MagicMock())
+    thread = threading.Thread(target=server.serve_forever, kwargs={'warm_up': False}, daemon=True)
+    thread.start()
+    try:
+        assert find_daemon() is not None
+    finally:
+        server.shutdown()
+        thread.join(timeout=5)
+    assert not os.path.exists(path)
+
+
+def test_tcp_fallback(tmp_path):
+    server = BrowserDaemon(('127.0.0.1', 0), downloads_root=str(tmp_path), workers=1, driver_factory=MagicMock())
+    thread = threading.Thread(target=server.serve_forever, kwargs={'warm_up': False}, daemon=True)
+    thread.start()
+    try:
+        assert find_daemon(server.address).request({'command': 'ping'})['jobs_served'] == 0
+    finally:
+        server.shutdown()
+        thread.join(timeout=5)
+
+
+def test_find_daemon_without_daemon():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+
+    assert find_daemon(('127.0.0.1', port)) is None
+    assert find_daemon() is None
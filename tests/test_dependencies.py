@@ -0,0 +1,49 @@
+from unittest.mock import patch
+
+import pytest
+
+from src import dependencies
+from src.dependencies import environment_key, environment_verified, install_dependencies
+
+# Packages that are always present where the tests run.
+PACKAGES = (("pytest", "pytest"),)
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv('ETOROHELPER_CACHE_DIR', str(tmp_path))
+    return tmp_path
+
+
+class TestInstallDependencies:
+    """Test cases for the cached environment check."""
+
+    def test_second_run_skips_package_probing(self):
+        with patch.object(dependencies, 'install_if_not_exists') as mock_install:
+            install_dependencies(PACKAGES)
+            install_dependencies(PACKAGES)
+
+        mock_install.assert_called_once_with("pytest", "pytest")
+        assert environment_verified(PACKAGES)
+
+    def test_version_change_invalidates_stamp(self):
+        install_dependencies(PACKAGES)
+
+        with patch.object(dependencies.metadata, 'version', return_value='0.0.1'):
+            assert not environment_verified(PACKAGES)
+
+    def test_missing_package_is_never_stamped(self):
+        missing = (("etorohelper-missing-package", "etorohelper_missing_package"),)
+
+        assert environment_key(missing) is None
+        with patch.object(dependencies, 'install_if_not_exists'):
+            install_dependencies(missing)
+        assert not environment_verified(missing)
+
+    def test_installed_package_is_found_without_importing_it(self):
+        with patch('subprocess.check_call') as mock_pip, \
+                patch('importlib.import_module') as mock_import:
+            dependencies.install_if_not_exists("pytest")
+
+        mock_pip.assert_not_called()
+        mock_import.assert_not_called()
@@ -1,102 +1,9 @@
+import json
 import os
-import sys
-import types
 from unittest.mock import MagicMock, patch
 
 import pytest
 
-def ensure_selenium_stub():
-    """Provide a minimal selenium module if it is missing."""
-    if 'selenium' in sys.modules:
-        return
-
-    selenium_mod = types.ModuleType('selenium')
-    webdriver_mod = types.ModuleType('selenium.webdriver')
-    support_mod = types.ModuleType('selenium.webdriver.support')
-    support_ui_mod = types.ModuleType('selenium.webdriver.support.ui')
-
-    support_ui_mod.WebDriverWait = MagicMock()
-
-    support_mod.ui = support_ui_mod
-    webdriver_mod.support = support_mod
-    webdriver_mod.Chrome = MagicMock()
-    options_obj = MagicMock()
-    options_obj.add_argument = MagicMock()
-    options_obj.add_argument.side_effect = lambda *_: None
-    webdriver_mod.ChromeOptions = MagicMock(return_value=options_obj)
-    selenium_mod.webdriver = webdriver_mod
-
-    sys.modules['selenium'] = selenium_mod
-    sys.modules['selenium.webdriver'] = webdriver_mod
-    sys.modules['selenium.webdriver.support'] = support_mod
-    sys.modules['selenium.webdriver.support.ui'] = support_ui_mod
-
-
-ensure_selenium_stub()
-
-
-def ensure_webdriver_manager_stub():
-    """Stub webdriver_manager module used by downloader."""
-    if 'webdriver_manager' in sys.modules:
-        return
-
-    webdriver_manager_mod = types.ModuleType('webdriver_manager')
-    chrome_mod = types.ModuleType('webdriver_manager.chrome')
-
-    class DummyChromeDriverManager:
-        def install(self):
-            return '/tmp/chromedriver'
-
-    chrome_mod.ChromeDriverManager = DummyChromeDriverManager
-    webdriver_manager_mod.chrome = chrome_mod
-
-    sys.modules['webdriver_manager'] = webdriver_manager_mod
-    sys.modules['webdriver_manager.chrome'] = chrome_mod
-
-
-ensure_webdriver_manager_stub()
-
-
-def ensure_chrome_submodules():
-    chrome_mod = types.ModuleType('selenium.webdriver.chrome')
-    service_mod = types.ModuleType('selenium.webdriver.chrome.service')
-    service_mod.Service = MagicMock()
-    chrome_mod.service = service_mod
-    sys.modules['selenium.webdriver.chrome'] = chrome_mod
-    sys.modules['selenium.webdriver.chrome.service'] = service_mod
-
-
-ensure_chrome_submodules()
-
-
-def ensure_selenium_common_modules():
-    common_mod = types.ModuleType('selenium.webdriver.common')
-    by_mod = types.ModuleType('selenium.webdriver.common.by')
-
-    class By:
-        CSS_SELECTOR = 'css selector'
-        ID = 'id'
-
-    by_mod.By = By
-    common_mod.by = by_mod
-
-    ec_mod = types.ModuleType('selenium.webdriver.support.expected_conditions')
-
-    def presence_of_element_located(selector):
-        def _predicate(driver):
-            return True
-
-        return _predicate
-
-    ec_mod.presence_of_element_located = presence_of_element_located
-
-    sys.modules['selenium.webdriver.common'] = common_mod
-    sys.modules['selenium.webdriver.common.by'] = by_mod
-    sys.modules['selenium.webdriver.support.expected_conditions'] = ec_mod
-
-
-ensure_selenium_common_modules()
-
 
 @pytest.fixture(autouse=True)
 def mock_webdriver_wait(monkeypatch):
@@ -164,3 +71,148 @@ class TestDownloadIntegration:
                 download_person_data('nobody', download_dir)
         captured = capsys.readouterr()
         assert 'Error setting up WebDriver' in captured.out
+
+    @patch('webdriver_manager.chrome.ChromeDriverManager.install')
+    @patch('selenium.webdriver.Chrome')
+    def test_time_to_ready_is_recorded(self, mock_chrome_class, mock_install, temp_base_dir):
+        """Pages are saved as soon as they are ready and the wait is recorded."""
+        mock_driver = MagicMock()
+        mock_driver.page_source = '<html><body>mock</body></html>'
+        mock_driver.execute_script.return_value = {
+            'missing': [], 'quietMs': 5000, 'size': 100, 'readyState': 'complete'
+        }
+        mock_chrome_class.return_value = mock_driver
+        mock_install.return_value = '/tmp/chromedriver'
+
+        download_dir = os.path.join(temp_base_dir, 'downloads', 'testuser', '2026-02-23')
+
+        from src.downloader import download_person_data
+        results = download_person_data('testuser', download_dir)
+
+        assert set(results) == {'profile', 'stats', 'portfolio', 'chart'}
+        for result in results.values():
+            assert result['status'] == 'ok'
+            assert result['readiness']['ready'] is True
+            assert result['readiness']['method'] == 'mutation'
+
+        with open(os.path.join(download_dir, 'download_stats.json'), encoding='utf-8') as f:
+            assert json.load(f)['stats']['readiness']['ready'] is True
+
+    @patch('webdriver_manager.chrome.ChromeDriverManager.install')
+    @patch('selenium.webdriver.Chrome')
+    def test_missing_main_container_fails_page(self, mock_chrome_class, mock_install, temp_base_dir):
+        """A page whose main container never shows up is saved as failed."""
+        mock_driver = MagicMock()
+        mock_driver.page_source = '<html><body>partial</body></html>'
+        mock_chrome_class.return_value = mock_driver
+        mock_install.return_value = '/tmp/chromedriver'
+
+        download_dir = os.path.join(temp_base_dir, 'downloads', 'testuser', '2026-02-23')
+
+        from src.downloader import download_person_data
+        with patch('src.downloader.wait_until_ready', side_effect=lambda driver, page_type, **kwargs: {
+            'ready': False, 'time_to_ready': 1.0, 'method': 'mutation',
+            'missing': ['et-card-content'] if page_type == 'stats' else [],
+        }):
+            results = download_person_data('testuser', download_dir, timeout=1)
+
+        assert results['stats']['status'] == 'failed'
+        assert results['profile']['status'] == 'ok'
+        assert os.path.exists(os.path.join(download_dir, 'stats_failed.html'))
+
+
+class FakeTabDriver:
+    """Minimal browser double that tracks tabs opened through window.open."""
+
+    def __init__(self, polls_until_ready):
+        self.polls_until_ready = polls_until_ready
+        self.window_handles = ['controller']
+        self.current_window_handle = 'controller'
+        self.urls = {'controller': 'about:blank'}
+        self.polls = {}
+        self.closed = []
+        self.switch_to = MagicMock()
+        self.switch_to.window.side_effect = self._switch
+
+    def _switch(self, handle):
+        self.current_window_handle = handle
+
+    def execute_script(self, script, *args):
+        if script.startswith('window.open'):
+            handle = f'tab{len(self.urls)}'
+            self.window_handles.append(handle)
+            self.urls[handle] = args[0]
+            return None
+        handle = self.current_window_handle
+        self.polls[handle] = self.polls.get(handle, 0) + 1
+        page = self.urls[handle].rsplit('/', 1)[-1]
+        ready = self.polls[handle] >= self.polls_until_ready.get(page, 1)
+        return {'missing': [], 'quietMs': 5000 if ready else 0, 'size': 1, 'readyState': 'complete'}
+
+    @property
+    def page_source(self):
+        return f'<html>{self.urls[self.current_window_handle]}</html>'
+
+    def close(self):
+        self.closed.append(self.current_window_handle)
+        self.window_handles.remove(self.current_window_handle)
+
+    def quit(self):
+        pass
+
+
+class TestParallelTabs:
+    """Test cases for loading all pages concurrently in separate tabs."""
+
+    def test_pages_are_saved_as_they_become_ready(self, temp_base_dir):
+        from src.downloader import download_pages_in_tabs
+        from src.pages import build_page_urls
+
+        driver = FakeTabDriver({'stats': 3, 'chart': 2})
+        urls = build_page_urls('testuser', base_url='http://localhost')
+
+        results = download_pages_in_tabs(driver, urls, temp_base_dir, poll_interval=0)
+
+        assert list(results) == ['profile', 'stats', 'portfolio', 'chart']
+        assert all(result['status'] == 'ok' for result in results.values())
+        # The slow pages are polled more often but every tab is closed exactly once.
+        assert driver.polls['tab2'] == 3
+        assert sorted(driver.closed) == ['tab1', 'tab2', 'tab3', 'tab4']
+        assert driver.window_handles == ['controller']
+        assert driver.current_window_handle == 'controller'
+        with open(os.path.join(temp_base_dir, 'stats.html'), encoding='utf-8') as f:
+            assert f.read() == '<html>http://localhost/people/testuser/stats</html>'
+
+    def test_tabs_that_do_not_open_slow_the_pacer(self, temp_base_dir):
+        from src.downloader import download_pages_in_tabs
+        from src.pages import build_page_urls
+
+        driver = FakeTabDriver({})
+        open_tab = driver.execute_script
+
+        def execute_script(script, *args):
+            if script.startswith('window.open') and args[0].endswith('/stats'):
+                return None  # e.g. blocked as a popup: no new handle
+            return open_tab(script, *args)
+
+        driver.execute_script = execute_script
+        pacer = MagicMock()
+
+        results = download_pages_in_tabs(driver, build_page_urls('testuser', base_url='http://localhost'),
+                                         temp_base_dir, poll_interval=0, pacer=pacer)
+
+        assert results['stats']['status'] == 'failed'
+        assert pacer.record_failure.call_count == 1
+        assert pacer.record_success.call_count == 3
+
+    def test_download_person_data_parallel_tabs(self, temp_base_dir):
+        from src.downloader import download_person_data
+
+        driver = FakeTabDriver({})
+        download_dir = os.path.join(temp_base_dir, 'downloads', 'testuser', '2026-02-23')
+
+        results = download_person_data('testuser', download_dir, driver=driver, parallel_tabs=True)
+
+        assert set(results) == {'profile', 'stats', 'portfolio', 'chart'}
+        assert os.path.exists(os.path.join(download_dir, 'chart.html'))
+        assert os.path.exists(os.path.join(download_dir, 'download_stats.json'))
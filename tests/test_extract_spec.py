@@ -0,0 +1,115 @@
+import pytest
+
+from src.extract_spec import compile_spec, field, records, sel
+from src.html_backend import available_backends, make_soup
+from src.pages import load_pages
+from src.parser import PORTFOLIO_SPEC
+from src.performance_parser import PERFORMANCE_SPEC
+from src.portfolio_stream import PortfolioStreamParser
+from src.stats_parser import STATS_SPEC
+from src.strategy_cache import StrategyCache
+
+PAGE = """<div class="card"><span>first</span>
+<div class="row"><b class="x">r1</b></div>
+<div class="row"><b class="x">r2</b><div class="row"><b class="x">r3</b></div></div>
+<p class="c"><i>in first p</i></p><p class="c"><b>bold</b></p></div>
+<ul><li class="k">0</li><li>skipped</li><li class="k">1</li><ol><li class="k">nested</li></ol></ul>"""
+
+
+def both(spec, html, backend=None):
+    """Run a spec by traversal and by find() lookups; they must agree."""
+    soup = make_soup(html, backend)
+    cache = StrategyCache()
+    result = spec.extract(soup, cache)
+    assert spec.lookup(soup, cache) == result
+    return result
+
+
+class TestCompiledSpec:
+    """Test cases for declarative specs compiled into one traversal."""
+
+    @pytest.mark.parametrize('backend', available_backends())
+    def test_fields(self, backend):
+        spec = compile_spec({
+            'first': field(sel('span')),
+            'missing': field(sel('div', automation_id='nope')),
+            'rows': records(sel('div', class_='row'), {'x': field(sel('b', class_='x'))}),
+            'second_k': field((sel('ul'), sel('li', class_='k', child=1))),
+            'third_k': field((sel('ul'), sel('li', class_='k', child=2))),
+            'all_k': field(sel('li', class_='k'), many=True),
+        })
+
+        assert both(spec, PAGE, backend) == {
+            'first': 'first',
+            'missing': None,
+            # Nested matches are records too, in document order
+            'rows': [{'x': 'r1'}, {'x': 'r2'}, {'x': 'r3'}],
+            'second_k': '1',
+            'third_k': None,  # only direct children count
+            'all_k': ['0', '1', 'nested'],
+        }
+
+    def test_steps_look_inside_the_first_match_only(self):
+        spec = compile_spec({
+            'bold': field((sel('p', class_='c'), sel('b'))),
+            'fallback': field((sel('p', class_='c'), sel('b')), (sel('p', class_='c'), sel('i'))),
+        })
+
+        assert both(spec, PAGE) == {'bold': None, 'fallback': 'in first p'}
+
+    def test_values_and_build(self):
+        spec = compile_spec({
+            'rows': records(sel('div', class_='row'), {'x': field(sel('b'))},
+                            build=lambda row: None if row['x'] == 'r2' else row['x'].upper()),
+            'element': field(sel('ul'), value=None),
+            'length': field(sel('span'), value=lambda tag: len(tag.text)),
+        })
+
+        result = both(spec, PAGE)
+
+        assert result['rows'] == ['R1', 'R3']
+        assert result['element'].name == 'ul'
+        assert result['length'] == 5
+
+    def test_class_predicate(self):
+        spec = compile_spec({'bars': field(sel('div', class_=lambda name: 'bar' in name), many=True)})
+
+        assert both(spec, '<div class="x rowbar">a</div><div class="foo">b</div><div class="bar-1">c</div>') == {
+            'bars': ['a', 'c'],
+        }
+
+    def test_strategy_field_follows_hit_rates(self):
+        spec = compile_spec({'value': field(('old', sel('b', class_='old')), ('new', sel('b', class_='new')),
+                                            strategy_field='test.value')})
+        cache = StrategyCache()
+        soup = make_soup('<b class="old">1</b><b class="new">2</b>')
+        for _ in range(3):
+            spec.extract(make_soup('<b class="new">2</b>'), cache)
+
+        assert spec.extract(soup, StrategyCache()) == {'value': '1'}
+        assert spec.extract(soup, cache) == {'value': '2'}
+
+    def test_runs_on_streamed_rows(self):
+        html = f'<div class="et-table-row">{PAGE}</div>'
+        spec = compile_spec({
+            'rows': records(sel('div', class_='row'), {'x': field(sel('b', class_='x'))}),
+            'second_k': field((sel('ul'), sel('li', class_='k', child=1))),
+            'fallback': field((sel('p', class_='c'), sel('b')), (sel('p', class_='c'), sel('i'))),
+        })
+        parser = PortfolioStreamParser()
+        streamed = []
+        parser._finish_row = streamed.append
+        parser.feed(html)
+        parser.close()
+
+        row = make_soup(html).find('div', class_='et-table-row')
+        assert spec.extract(streamed[0]) == spec.extract(row) == spec.lookup(streamed[0])
+
+
+@pytest.mark.parametrize('page_type, spec', [
+    ('profile', PERFORMANCE_SPEC), ('stats', STATS_SPEC), ('portfolio', PORTFOLIO_SPEC),
+])
+def test_extractor_specs_match_lookups(page_type, spec):
+    result = both(spec, load_pages()[page_type])
+
+    assert any(value not in (None, []) for value in result.values())
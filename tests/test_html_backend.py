@@ -0,0 +1,69 @@
+import os
+
+import pytest
+
+from src import html_backend
+from src.html_backend import available_backends, resolve_backend, set_backend
+from src.parser import extract_portfolio_data
+from src.performance_parser import extract_performance_data
+from src.stats_parser import extract_stats_data
+
+EXAMPLE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'example')
+
+
+def read_example(*parts):
+    with open(os.path.join(EXAMPLE_DIR, *parts), encoding='utf-8') as f:
+        return f.read()
+
+
+@pytest.fixture
+def backend(request, monkeypatch):
+    monkeypatch.setattr(html_backend, '_selected', None)
+    # set_backend() exports its choice; registering the variable restores it afterwards.
+    monkeypatch.setenv(html_backend.BACKEND_ENV, 'auto')
+    yield set_backend(request.param)
+    monkeypatch.setattr(html_backend, '_selected', None)
+
+
+@pytest.fixture(scope='module')
+def reference():
+    """Extractor output with the pure-Python html.parser backend."""
+    pages = (read_example('input', 'InputContent.txt'),
+             read_example('portfolio', 'person-url-1.txt'),
+             read_example('portfolio', 'person-url-statts.txt'))
+    soup_backend = html_backend._selected
+    html_backend._selected = 'html.parser'
+    try:
+        return pages, (extract_portfolio_data(pages[0]), extract_performance_data(pages[1]),
+                       extract_stats_data(pages[2]))
+    finally:
+        html_backend._selected = soup_backend
+
+
+@pytest.mark.parametrize('backend', available_backends(), indirect=True)
+def test_extractors_match_on_every_backend(backend, reference):
+    (portfolio_html, profile_html, stats_html), expected = reference
+
+    assert extract_portfolio_data(portfolio_html) == expected[0]
+    assert extract_performance_data(profile_html) == expected[1]
+    assert extract_stats_data(stats_html) == expected[2]
+    assert len(expected[0]) == 50
+
+
+class TestResolveBackend:
+    """Test cases for choosing the HTML backend."""
+
+    def test_auto_picks_fastest_installed(self):
+        assert resolve_backend('auto') == available_backends()[0]
+        assert available_backends()[-1] == 'html.parser'
+
+    def test_unknown_backend(self):
+        with pytest.raises(ValueError, match='Unknown HTML backend'):
+            resolve_backend('regex')
+
+    def test_environment_setting_is_used(self, monkeypatch):
+        monkeypatch.setattr(html_backend, '_selected', None)
+        monkeypatch.setenv(html_backend.BACKEND_ENV, 'html.parser')
+
+        assert html_backend.get_backend() == 'html.parser'
+        monkeypatch.setattr(html_backend, '_selected', None)
@@ -0,0 +1,96 @@
+import io
+import os
+from unittest.mock import patch
+
+import pytest
+
+from src.downloader import write_page
+from src.html_slim import iter_slim_html, slim_html
+from src.parsed_page import ParsedPage
+from src.parser import extract_portfolio_data
+from src.performance_parser import extract_performance_data
+from src.portfolio_stream import iter_portfolio_rows
+from src.stats_parser import extract_stats_data
+
+EXAMPLE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'example')
+
+PAGE = """<html><head><script src="app.js"></script><style>.a { color: red }</style>
+<script>window.state = {"html": "<div class='value'>1</div>"};</script></head>
+<body><div _ngcontent-ng-c123="" automation-id="copiers-value" class="value ng-star-inserted" style="color: red">42</div>
+<!----><svg viewBox="0 0 10 10"><path d="M0 0"></path></svg><svg class="icon"/>
+<img src="data:image/png;base64,iVBORw0KGgo=" class="avatar" ng-reflect-name="x">
+<noscript>Enable JavaScript</noscript><span class="name">Stocks</span></body></html>"""
+
+EXAMPLES = [
+    (extract_performance_data, ('portfolio', 'person-url-1.txt')),
+    (extract_stats_data, ('portfolio', 'person-url-statts.txt')),
+    (extract_portfolio_data, ('input', 'InputContent.txt')),
+]
+
+
+def read_example(*parts):
+    with open(os.path.join(EXAMPLE_DIR, *parts), encoding='utf-8') as f:
+        return f.read()
+
+
+class TestSlimHtml:
+    """Test cases for the pre-parse HTML slimming pass."""
+
+    def test_removes_unused_markup(self):
+        slimmed = slim_html(PAGE)
+
+        for removed in ('<script', '<style', '<svg', '<noscript', '<!---->', '_ngcontent', 'style=',
+                        'base64', 'ng-reflect'):
+            assert removed not in slimmed
+        assert '<div automation-id="copiers-value" class="value ng-star-inserted">42</div>' in slimmed
+        assert '<span class="name">Stocks</span>' in slimmed
+        assert '<img src="" class="avatar">' in slimmed
+
+    def test_keeps_custom_elements_named_like_removed_tags(self):
+        html = ('<div><svg-icon></svg-icon><script-loader></script-loader>'
+                '<div automation-id="stats-copiers-chart-copiers-value">12</div><svg></svg></div>')
+
+        assert slim_html(html) == ('<div><svg-icon></svg-icon><script-loader></script-loader>'
+                                   '<div automation-id="stats-copiers-chart-copiers-value">12</div></div>')
+        assert ''.join(iter_slim_html(html[i:i + 7] for i in range(0, len(html), 7))) == slim_html(html)
+
+    @pytest.mark.parametrize('extract, parts', EXAMPLES)
+    def test_extractors_see_the_same_data(self, extract, parts):
+        html = read_example(*parts)
+
+        slimmed = slim_html(html)
+
+        assert len(slimmed) < len(html)
+        assert extract(ParsedPage(slimmed, slim=False)) == extract(ParsedPage(html, slim=False))
+
+    @pytest.mark.parametrize('chunk_size', [1, 7, 64, 4096])
+    def test_chunked_equals_whole(self, chunk_size):
+        html = PAGE + read_example('portfolio', 'person-url-statts.txt')
+        chunks = (html[i:i + chunk_size] for i in range(0, len(html), chunk_size))
+
+        assert ''.join(iter_slim_html(chunks)) == slim_html(html)
+
+    def test_pages_are_slimmed_before_parsing(self):
+        page = ParsedPage(PAGE)
+
+        assert page.soup.find('script') is None and page.soup.find('svg') is None
+        assert page.soup.find(attrs={'automation-id': 'copiers-value'}).text == '42'
+        assert ParsedPage(PAGE, slim=False).soup.find('script') is not None
+
+    def test_streamed_portfolio_is_slimmed(self):
+        html = read_example('input', 'InputContent.txt')
+        fed = []
+
+        with patch('src.portfolio_stream.PortfolioStreamParser.feed', autospec=True,
+                   side_effect=lambda parser, chunk: fed.append(chunk)):
+            list(iter_portfolio_rows(io.StringIO(html), chunk_size=1000))
+
+        assert ''.join(fed) == slim_html(html)
+
+
+def test_write_page_slims_parsed_pages_only(tmp_path):
+    write_page(str(tmp_path), 'stats', PAGE, slim=True)
+    write_page(str(tmp_path), 'chart', PAGE, slim=True)
+
+    assert (tmp_path / 'stats.html').read_text(encoding='utf-8') == slim_html(PAGE)
+    assert (tmp_path / 'chart.html').read_text(encoding='utf-8') == PAGE
@@ -0,0 +1,81 @@
+import os
+from unittest.mock import MagicMock, patch
+
+from src.http_fetcher import HttpFetcher
+from src.pages import REQUIRED_SELECTORS, missing_selectors
+from src.standin import Route, StandinServer, fixture_routes, wrap_html
+
+
+ANGULAR_SHELL = wrap_html('<app-root></app-root><script src="/main.js"></script>')
+
+
+class TestMissingSelectors:
+    """Test cases for validating raw HTML without parsing it."""
+
+    def test_attribute_and_tag_selectors(self):
+        html = '<div class="x" automation-id="compare-user-performance-value"></div><et-card-content>'
+
+        assert missing_selectors(html, REQUIRED_SELECTORS['stats']) == []
+        assert missing_selectors('<et-card-contents>', ['et-card-content']) == ['et-card-content']
+        assert missing_selectors(html, ['[automation-id="other"]']) == ['[automation-id="other"]']
+
+    def test_other_selectors_use_a_parser(self):
+        assert missing_selectors('<div class="risk-default">3</div>', ['div.risk-default']) == []
+
+
+class TestHttpFetcher:
+    """Test cases for the pooled HTTP fast path."""
+
+    def test_accepts_pages_with_required_selectors(self):
+        with StandinServer(fixture_routes('someone')) as server, HttpFetcher() as fetcher:
+            html, missing = fetcher.fetch_page(f'{server.base_url}/people/someone/stats', 'stats')
+
+        assert missing == []
+        assert 'compare-user-performance-value' in html
+
+    def test_rejects_javascript_shells_and_errors(self):
+        routes = {'/people/someone/stats': Route(ANGULAR_SHELL)}
+        with StandinServer(routes) as server, HttpFetcher() as fetcher:
+            shell, missing = fetcher.fetch_page(f'{server.base_url}/people/someone/stats', 'stats')
+            not_found, _ = fetcher.fetch_page(f'{server.base_url}/people/nobody', 'profile')
+
+        assert shell is None
+        assert missing == list(REQUIRED_SELECTORS['stats'])
+        assert not_found is None
+
+
+class TestHttpFirstDownload:
+    """Test cases for download_person_data(http_first=True)."""
+
+    def test_no_browser_when_every_page_is_served_over_http(self, temp_base_dir):
+        from src.downloader import download_person_data
+
+        with StandinServer(fixture_routes('someone')) as server:
+            with patch('src.downloader.create_driver') as mock_create:
+                results = download_person_data('someone', temp_base_dir, http_first=True,
+                                               base_url=server.base_url)
+
+        mock_create.assert_not_called()
+        assert {result['source'] for result in results.values()} == {'http'}
+        assert os.path.exists(os.path.join(temp_base_dir, 'portfolio.html'))
+
+    def test_browser_only_for_pages_that_need_it(self, temp_base_dir):
+        from src.downloader import download_person_data
+
+        routes = fixture_routes('someone')
+        routes['/people/someone/stats'] = Route(ANGULAR_SHELL)
+        driver = MagicMock()
+        driver.page_source = '<html>rendered</html>'
+        driver.execute_script.return_value = {'missing': [], 'quietMs': 5000, 'size': 1, 'readyState': 'complete'}
+        provider = MagicMock(return_value=driver)
+
+        with StandinServer(routes) as server:
+            results = download_person_data('someone', temp_base_dir, http_first=True,
+                                           base_url=server.base_url, driver_provider=provider)
+
+        provider.assert_called_once()
+        driver.get.assert_called_once_with(f'{server.base_url}/people/someone/stats')
+        assert list(results) == ['profile', 'stats', 'portfolio', 'chart']
+        assert results['stats']['source'] == 'selenium'
+        assert results['profile']['source'] == 'http'
+        driver.quit.assert_not_called()
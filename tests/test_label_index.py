@@ -0,0 +1,28 @@
+import pytest
+
+from src.label_index import LabelIndex
+from src.html_backend import make_soup
+
+
+class TestLabelIndex:
+    """Test cases for the one-pass multi-label text search."""
+
+    def test_matches_like_soup_find_string(self):
+        soup = make_soup('<!-- annual income --><p>ANNUAL INCOME</p><p>Stocks and ETF</p>'
+                         '<p> Social </p><p>Social</p>')
+        labels = LabelIndex(soup, [('Annual Income', 'icontains'), ('stocks', 'contains'),
+                                   ('ETF', 'contains'), ('Social', 'exact')])
+
+        assert labels.first('Annual Income', 'icontains') is \
+            soup.find(string=lambda x: x and 'annual income' in x.lower())
+        assert labels.first('stocks') is None
+        assert labels.first('ETF') == 'Stocks and ETF'
+        assert labels.first('Social', 'exact') is soup.find(string='Social')
+
+    def test_unknown_label_or_match(self):
+        labels = LabelIndex(make_soup('<p>x</p>'), [('x', 'contains')])
+
+        with pytest.raises(KeyError):
+            labels.first('y')
+        with pytest.raises(ValueError):
+            LabelIndex(make_soup('<p>x</p>'), [('x', 'regex')])
@@ -1,6 +1,47 @@
+import os
+import subprocess
+import sys
+
 import pytest
 from unittest.mock import patch, MagicMock
 
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Cumulative import time of main.py allowed by the startup budget, in microseconds.
+MAIN_IMPORT_BUDGET_US = 150_000
+
+
+def make_args(**overrides):
+    """Build parsed CLI arguments with every option at its default."""
+    mock_args = MagicMock()
+    mock_args.user = None
+    mock_args.user_url = None
+    mock_args.base_dir = None
+    mock_args.users_file = None
+    mock_args.workers = 2
+    mock_args.recycle_after = 50
+    mock_args.parallel_tabs = False
+    mock_args.capture_network = False
+    mock_args.http_first = False
+    mock_args.pages = 'all'
+    mock_args.ttl = None
+    mock_args.refresh_all = False
+    mock_args.snapshot_store = False
+    mock_args.block_resources = None
+    mock_args.slim_html = False
+    mock_args.rate = 2.0
+    mock_args.max_retries = 2
+    mock_args.parse_workers = None
+    mock_args.html_backend = 'auto'
+    mock_args.typed_values = False
+    mock_args.no_parse_cache = False
+    mock_args.reparse = None
+    mock_args.daemon = False
+    mock_args.no_daemon = True
+    for name, value in overrides.items():
+        setattr(mock_args, name, value)
+    return mock_args
+
 
 class TestMainArguments:
     """Test cases for main.py argument parsing and logic."""
@@ -10,7 +51,7 @@ class TestMainArguments:
     @patch('src.url_utils.extract_username_from_url')
     def test_user_url_argument_parsing(self, mock_extract, mock_parse_args, mock_install):
         """Test that --user-url argument is parsed and username extracted."""
-        mock_args = MagicMock()
+        mock_args = make_args()
         mock_args.user = None
         mock_args.user_url = "https://www.etoro.com/people/testuser"
         mock_args.base_dir = None
@@ -36,7 +77,7 @@ class TestMainArguments:
     @patch('argparse.ArgumentParser.parse_args')
     def test_base_dir_argument(self, mock_parse_args, mock_install):
         """Test that --base-dir argument is used when provided."""
-        mock_args = MagicMock()
+        mock_args = make_args()
         mock_args.user = None
         mock_args.user_url = None
         mock_args.base_dir = "custom-dir"
@@ -59,7 +100,7 @@ class TestMainArguments:
     @patch('src.url_utils.extract_username_from_url', side_effect=ValueError("Invalid URL"))
     def test_invalid_url_error_handling(self, mock_extract, mock_parse_args, mock_install):
         """Test that invalid URLs are handled gracefully."""
-        mock_args = MagicMock()
+        mock_args = make_args()
         mock_args.user = None
         mock_args.user_url = "invalid-url"
         mock_args.base_dir = None
@@ -75,7 +116,7 @@ class TestMainArguments:
     @patch('argparse.ArgumentParser.parse_args')
     def test_default_base_dir_uses_current_date(self, mock_parse_args, mock_install):
         """Test that default base_dir uses current date."""
-        mock_args = MagicMock()
+        mock_args = make_args()
         mock_args.user = None
         mock_args.user_url = None
         mock_args.base_dir = None
@@ -98,7 +139,7 @@ class TestMainArguments:
     @patch('src.url_utils.extract_username_from_url')
     def test_user_argument_parsing(self, mock_extract, mock_parse_args, mock_install):
         """Test that --user argument is used directly without calling extract_username_from_url."""
-        mock_args = MagicMock()
+        mock_args = make_args()
         mock_args.user = "scherenhaenden"
         mock_args.user_url = None
         mock_args.base_dir = None
@@ -127,7 +168,7 @@ class TestMainArguments:
     @patch('src.url_utils.extract_username_from_url')
     def test_user_overrides_user_url(self, mock_extract, mock_parse_args, mock_install):
         """Test that --user takes priority over --user-url."""
-        mock_args = MagicMock()
+        mock_args = make_args()
         mock_args.user = "directuser"
         mock_args.user_url = "https://www.etoro.com/people/urluser"
         mock_args.base_dir = None
@@ -149,3 +190,92 @@ class TestMainArguments:
         # --user-url should NOT be parsed when --user is given
         mock_extract.assert_not_called()
         mock_print.assert_any_call("Using username: directuser")
+
+    @patch('src.dependencies.install_dependencies')
+    @patch('argparse.ArgumentParser.parse_args')
+    def test_users_file_runs_batch_download(self, mock_parse_args, mock_install, tmp_path):
+        """Test that --users-file downloads and parses every listed user through the pipeline."""
+        users_file = tmp_path / 'users.txt'
+        users_file.write_text("alice\nbob\n", encoding='utf-8')
+        mock_parse_args.return_value = make_args(users_file=str(users_file), workers=3)
+
+        mock_batch = MagicMock()
+        mock_batch.load_usernames.return_value = ['alice', 'bob']
+        mock_pipeline = MagicMock()
+
+        with patch.dict('sys.modules', {
+            'src.parser': MagicMock(),
+            'src.downloader': MagicMock(),
+            'src.batch': mock_batch,
+            'src.pipeline': mock_pipeline,
+        }):
+            from main import main
+            main()
+
+        mock_pipeline.run_pipeline.assert_called_once_with(
+            ['alice', 'bob'], downloads_root='downloads', parse_workers=None, typed=False, workers=3, max_pages_per_driver=50,
+            parallel_tabs=False, capture_network=False, http_first=False,
+            pages=['profile', 'stats', 'portfolio', 'chart'], ttls={}, snapshot_store=False,
+            block_resources=None, rate=2.0, max_attempts=3, slim_pages=False
+        )
+
+    @patch('src.dependencies.install_dependencies')
+    @patch('argparse.ArgumentParser.parse_args')
+    def test_reparse_only_parses(self, mock_parse_args, mock_install):
+        """Test that --reparse re-runs the parsers for the given user, installing only what parsing needs."""
+        mock_parse_args.return_value = make_args(reparse='archive', user='alice', parse_workers=4)
+
+        mock_reparse = MagicMock()
+        with patch.dict('sys.modules', {'src.reparse': mock_reparse}):
+            from main import main
+            main()
+
+        mock_reparse.reparse_downloads.assert_called_once_with('archive', workers=4, users=['alice'], typed=False)
+        mock_install.assert_called_once_with((("beautifulsoup4", "bs4"),))
+
+    @patch('main.parse_person_data')
+    @patch('src.dependencies.install_dependencies')
+    @patch('argparse.ArgumentParser.parse_args')
+    def test_daemon_run_installs_only_parse_dependencies(self, mock_parse_args, mock_install, mock_parse, tmp_path):
+        """Test that a run handing its download to the daemon still makes sure the parsers can run."""
+        mock_parse_args.return_value = make_args(user='alice', base_dir=str(tmp_path), no_daemon=False)
+        daemon = MagicMock()
+
+        with patch('src.daemon.find_daemon', return_value=daemon):
+            from main import main
+            main()
+
+        daemon.download.assert_called_once()
+        mock_install.assert_called_once_with((("beautifulsoup4", "bs4"),))
+        mock_parse.assert_called_once()
+
+
+def import_times(module):
+    """
+    Import a module in a fresh interpreter with -X importtime.
+
+    Returns:
+        Dict of imported module name to its cumulative import time in microseconds
+    """
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                            cwd=PROJECT_ROOT, capture_output=True, text=True, check=True)
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+class TestStartup:
+    """Import-time budget for the CLI entry point."""
+
+    def test_main_import_stays_light(self):
+        times = import_times('main')
+
+        heavy = [name for name in times
+                 if name.split('.')[0] in ('bs4', 'selenium', 'webdriver_manager', 'requests', 'lxml')]
+        assert heavy == []
+        assert 'src.dependencies' not in times
+        assert times['main'] < MAIN_IMPORT_BUDGET_US
@@ -0,0 +1,188 @@
+import json
+
+from conftest import requires_browser
+from src.network_capture import NetworkCapture, load_api_responses, save_api_responses
+from src.parser import extract_portfolio_data_from_api
+from src.performance_parser import extract_performance_data_from_api
+from src.standin import Route, StandinServer, wrap_html
+from src.stats_parser import extract_stats_data_from_api
+
+
+GAIN_URL = 'https://www.etoro.com/sapi/userstats/gain/cid/42/stats'
+RANKINGS_URL = 'https://www.etoro.com/sapi/rankings/cid/42/rankings?Period=OneYearAgo'
+RANKINGS_2Y_URL = 'https://www.etoro.com/sapi/rankings/cid/42/rankings?Period=TwoYearsAgo'
+
+CAPTURED = [
+    {'url': GAIN_URL, 'status': 200, 'body': {'yearly': [
+        {'start': '2024-01-01T00:00:00Z', 'gain': 15.37},
+        {'start': '2025-01-01T00:00:00Z', 'gain': 19.08},
+    ]}},
+    {'url': RANKINGS_URL, 'status': 200, 'body': {'Data': {
+        'Copiers': 12, 'Gain': 15.91, 'RiskScore': 3, 'ProfitableWeeksPct': 65.45,
+        'Trades': 140, 'WinRatio': 71.2,
+    }}},
+    {'url': RANKINGS_2Y_URL, 'status': 200, 'body': {'Data': {'Gain': 30.3}}},
+]
+
+
+def log_entry(method, **params):
+    return {'message': json.dumps({'message': {'method': method, 'params': params}})}
+
+
+class FakeLoggingDriver:
+    def __init__(self, entries, bodies):
+        self.entries = list(entries)
+        self.bodies = bodies
+
+    def get_log(self, log_type):
+        assert log_type == 'performance'
+        entries, self.entries = self.entries, []
+        return entries
+
+    def execute_cdp_cmd(self, cmd, params):
+        assert cmd == 'Network.getResponseBody'
+        return {'body': self.bodies[params['requestId']], 'base64Encoded': False}
+
+
+class TestNetworkCapture:
+    """Test cases for recording JSON responses from the performance log."""
+
+    def test_collects_finished_json_responses(self):
+        driver = FakeLoggingDriver([
+            log_entry('Network.requestWillBeSent', requestId='1', documentURL='http://x/people/a',
+                      request={'url': GAIN_URL}),
+            log_entry('Network.responseReceived', requestId='1',
+                      response={'url': GAIN_URL, 'status': 200, 'mimeType': 'application/json'}),
+            log_entry('Network.loadingFinished', requestId='1'),
+            # Not JSON
+            log_entry('Network.responseReceived', requestId='2',
+                      response={'url': 'http://x/logo.png', 'status': 200, 'mimeType': 'image/png'}),
+            log_entry('Network.loadingFinished', requestId='2'),
+            # Still loading
+            log_entry('Network.responseReceived', requestId='3',
+                      response={'url': RANKINGS_URL, 'status': 200, 'mimeType': 'application/json'}),
+        ], bodies={'1': '{"yearly": []}'})
+
+        capture = NetworkCapture(driver)
+        capture.poll()
+        responses = capture.collect()
+
+        assert responses == [{'url': GAIN_URL, 'status': 200, 'body': {'yearly': []}}]
+
+    def test_filters_by_document_url(self):
+        driver = FakeLoggingDriver([
+            log_entry('Network.requestWillBeSent', requestId='1', documentURL='http://x/people/a/stats',
+                      request={'url': RANKINGS_URL}),
+            log_entry('Network.responseReceived', requestId='1',
+                      response={'url': RANKINGS_URL, 'status': 200, 'mimeType': 'application/json'}),
+            log_entry('Network.loadingFinished', requestId='1'),
+        ], bodies={'1': '{}'})
+
+        capture = NetworkCapture(driver)
+        capture.poll()
+
+        assert capture.collect({'http://x/people/a'}) == []
+        assert len(capture.collect({'http://x/people/a/stats'})) == 1
+
+    def test_save_and_load(self, tmp_path):
+        save_api_responses(CAPTURED, str(tmp_path), 'profile')
+
+        assert load_api_responses(str(tmp_path), 'profile') == CAPTURED
+        assert load_api_responses(str(tmp_path), 'stats') is None
+
+
+class TestApiExtraction:
+    """Test cases for the JSON-first extraction paths."""
+
+    def test_performance_from_api(self):
+        data = extract_performance_data_from_api(CAPTURED)
+
+        assert data == {
+            'annualPerformance': [
+                {'year': '2025', 'gainLoss': '19.08%'},
+                {'year': '2024', 'gainLoss': '15.37%'},
+            ],
+            'additionalMetrics': {
+                'renditeYTD': '19.08%',
+                'rendite2Y': '30.30%',
+                'averageRiskRatingLast7Days': '3',
+                'profitableWeeks': '65.45%',
+            },
+        }
+
+    def test_stats_from_api(self):
+        data = extract_stats_data_from_api(CAPTURED)
+
+        assert data['performance'] == {'copiers_12m': '12', 'user_vs_spx500': {'user': '+15.91%', 'spx500': None}}
+        assert data['trading_statistics'] == {'total_trades_12m': '140', 'profitable_trades_percentage': '71.20%'}
+        assert data['additional_stats'] == {'profitable_weeks': '65.45%'}
+
+    def test_portfolio_from_api(self):
+        responses = [
+            {'url': 'https://www.etoro.com/sapi/trade-data-real/live/public/portfolios?cid=42', 'status': 200,
+             'body': {'AggregatedPositions': [{'InstrumentID': 1001, 'NetProfit': 3.3}],
+                      'AggregatedMirrors': [{'ParentUsername': 'someone', 'NetProfit': -1.5}]}},
+            {'url': 'https://www.etoro.com/sapi/instrumentsmetadata/V1.1/instruments', 'status': 200,
+             'body': {'InstrumentDisplayDatas': [
+                 {'InstrumentID': 1001, 'SymbolFull': 'AAPL', 'InstrumentDisplayName': 'Apple'}]}},
+        ]
+
+        portfolio = extract_portfolio_data_from_api(responses)
+
+        assert [(row['ticker'], row['company_name'], row['type'], row['gain_percent']) for row in portfolio] == [
+            ('AAPL', 'Apple', 'Instrument', 3.3),
+            ('someone', 'someone', 'Person', -1.5),
+        ]
+        assert len(portfolio[0]) == 10
+
+    def test_unrelated_responses_fall_back_to_html(self):
+        unrelated = [{'url': 'https://www.etoro.com/api/other', 'status': 200, 'body': {}}]
+
+        assert extract_performance_data_from_api(unrelated) is None
+        assert extract_stats_data_from_api(unrelated) is None
+        assert extract_portfolio_data_from_api(None) is None
+
+    def test_parse_person_data_prefers_api(self, tmp_path):
+        from main import parse_person_data
+
+        save_api_responses(CAPTURED, str(tmp_path), 'profile')
+        parse_person_data('someone', str(tmp_path))
+
+        with open(tmp_path / 'performance.json', encoding='utf-8') as f:
+            assert json.load(f)['additionalMetrics']['rendite2Y'] == '30.30%'
+
+
+@requires_browser
+def test_capture_against_standin(tmp_path):
+    """A stand-in page that fetches canned JSON, like eToro's Angular app does."""
+    from src.downloader import create_driver, download_pages_sequentially
+
+    page = wrap_html("""
+        <div id="app"></div>
+        <script>
+        fetch('/sapi/rankings/cid/42/rankings?Period=OneYearAgo')
+            .then(function (r) { return r.json(); })
+            .then(function (data) {
+                document.getElementById('app').innerHTML =
+                    '<et-card-content><span automation-id="compare-user-performance-value">'
+                    + data.Data.Gain + '</span></et-card-content>';
+            });
+        </script>""")
+    routes = {
+        '/people/someone/stats': Route(page),
+        '/sapi/rankings/cid/42/rankings': Route(json.dumps(CAPTURED[1]['body']),
+                                                content_type='application/json', delay=0.2),
+    }
+    driver = create_driver(capture_network=True)
+    try:
+        with StandinServer(routes) as server:
+            capture = NetworkCapture(driver)
+            results = download_pages_sequentially(
+                driver, [(f'{server.base_url}/people/someone/stats', 'stats')], str(tmp_path),
+                quiet_period=0.2, capture=capture)
+    finally:
+        driver.quit()
+
+    assert results['stats']['api_responses'] == 1
+    responses = load_api_responses(str(tmp_path), 'stats')
+    assert extract_stats_data_from_api(responses)['performance']['copiers_12m'] == '12'
@@ -0,0 +1,94 @@
+import io
+
+import pytest
+
+from src.normalize import parse_number, parse_value, raw_values, typed_value, typed_values
+from src.pages import load_pages
+from src.parser import extract_portfolio_data
+from src.performance_parser import extract_performance_data
+from src.portfolio_stream import iter_portfolio_rows
+from src.stats_parser import extract_stats_data
+
+
+class TestParseValue:
+    """Test cases for the locale-aware number parsers."""
+
+    @pytest.mark.parametrize('text, expected', [
+        ('+12.34%', (12.34, '%')),
+        ('-5.15%', (-5.15, '%')),
+        ('−0.5%', (-0.5, '%')),
+        ('$1.2K', (1200.0, 'USD')),
+        ('-$1,234.50', (-1234.5, 'USD')),
+        ('$-3.5', (-3.5, 'USD')),
+        ('HK$10.39', (10.39, 'HKD')),
+        ('-SEK1,234.5', (-1234.5, 'SEK')),
+        ('1.234,50 €', (1234.5, 'EUR')),
+        ('12,5%', (12.5, '%')),
+        ('12 345,6', (12345.6, None)),
+        ('1,234', (1234.0, None)),
+        ('1.234.567', (1234567.0, None)),
+        ('4.35K', (4350.0, None)),
+        ('1.2M', (1200000.0, None)),
+        ('3 Mio.', (3000000.0, None)),
+        ('2023', (2023.0, None)),
+    ])
+    def test_numbers(self, text, expected):
+        assert parse_value(text) == expected
+
+    @pytest.mark.parametrize('text', ['N/A', '-', '', '3 Months', 'Jan 2020', None, '1.2.3,4,5'])
+    def test_not_numbers(self, text):
+        assert parse_value(text) is None
+        assert parse_number(text) is None
+
+    def test_explicit_locale(self):
+        assert parse_number('1.234') == 1.234
+        assert parse_number('1.234', 'de') == 1234.0
+        assert parse_number('1,5', 'en') == 15.0
+        with pytest.raises(ValueError):
+            parse_number('1', 'fr')
+
+    def test_typed_value(self):
+        assert typed_value('$42.56') == {'raw': '$42.56', 'value': 42.56, 'unit': 'USD'}
+        assert typed_value(3) == {'raw': None, 'value': 3.0, 'unit': None}
+        assert typed_value('Jan 2020') == 'Jan 2020'
+        assert typed_value(None) is None
+
+    def test_typed_values_keys(self):
+        data = [{'ticker': '1810', 'gain_percent': '3.30%'}]
+
+        assert typed_values(data, keys=('gain_percent',)) == [
+            {'ticker': '1810', 'gain_percent': {'raw': '3.30%', 'value': 3.3, 'unit': '%'}},
+        ]
+
+    def test_raw_values_undo_typed_values(self):
+        data = {'rows': [{'ticker': '1810', 'gain_percent': '3.30%', 'api': 1.5}], 'note': 'n/a'}
+
+        assert raw_values(typed_values(data)) == {'rows': [{'ticker': '1810', 'gain_percent': '3.30%', 'api': 1.5}],
+                                                  'note': 'n/a'}
+        assert raw_values(data) == data
+
+
+class TestTypedExtraction:
+    """Test cases for typed values next to the raw text in the extractors' output."""
+
+    def test_portfolio(self):
+        html = load_pages()['portfolio']
+        plain, typed = extract_portfolio_data(html), extract_portfolio_data(html, typed=True)
+
+        assert typed[0]['ticker'] == plain[0]['ticker']
+        assert typed[0]['net_value'] == {'raw': '$42.56', 'value': plain[0]['net_value'], 'unit': 'USD'}
+        assert typed[0]['asset_pnl'] == {'raw': 'HK$10.39', 'value': 10.39, 'unit': 'HKD'}
+        assert (plain[0]['asset_pnl'], plain[0]['market_exposure']) == (10.39, 331.17)
+        for plain_row, typed_row in zip(plain, typed):
+            for key in ('price', 'asset_pnl', 'change_percent', 'daily_pnl', 'gain_percent', 'market_exposure'):
+                assert (typed_row[key] or {}).get('value') == plain_row[key]
+        assert list(iter_portfolio_rows(io.StringIO(html), typed=True)) == typed
+
+    def test_stats_and_performance(self):
+        pages = load_pages()
+
+        stats = extract_stats_data(pages['stats'], typed=True)
+        performance = extract_performance_data(pages['profile'], typed=True)
+
+        assert stats['performance']['user_vs_spx500']['user'] == {'raw': '+15.91%', 'value': 15.91, 'unit': '%'}
+        assert performance['additionalMetrics']['renditeYTD']['value'] == 19.08
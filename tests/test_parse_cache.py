@@ -0,0 +1,122 @@
+import os
+import shutil
+import time
+from unittest.mock import patch
+
+from src.parse_cache import ParseCache, extractor_version, get_parse_cache
+from src.pipeline import extract_person_data
+from src.snapshot_store import save_page_snapshot
+
+EXAMPLE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'example')
+
+
+def age(path, seconds=60):
+    """Backdate a file, so it is past the window in which its hash is not remembered."""
+    past = time.time() - seconds
+    os.utime(path, (past, past))
+
+
+class TestParseCache:
+    """Test cases for the content-hash keyed parse result cache."""
+
+    def test_result_is_computed_once(self):
+        cache = ParseCache()
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return {'rows': [1, 2.5, None]}
+
+        assert cache.cached('abc', 'stats.html', compute) == {'rows': [1, 2.5, None]}
+        assert cache.cached('abc', 'stats.html', compute) == {'rows': [1, 2.5, None]}
+        assert len(calls) == 1
+        assert cache.cached('abc', 'portfolio.html', compute) and len(calls) == 2
+        assert (cache.hits, cache.misses) == (1, 2)
+
+    def test_none_results_are_cached(self):
+        cache = ParseCache()
+        cache.put('abc', 'stats.api', None)
+
+        assert cache.cached('abc', 'stats.api', lambda: 1 / 0) is None
+
+    def test_extractor_versions(self):
+        assert extractor_version('stats.api') == extractor_version('stats.html')
+        assert extractor_version('stats.html') != extractor_version('portfolio.html')
+
+    def test_file_digest_skips_unchanged_files(self, tmp_path):
+        path = tmp_path / 'page.html'
+        path.write_text('<p>one</p>', encoding='utf-8')
+        age(path)
+        cache = ParseCache(str(tmp_path / 'cache.sqlite'))
+        digest = cache.file_digest(str(path))
+
+        # Same mtime and size: trusted without reading the file
+        stat = os.stat(path)
+        path.write_text('<p>two</p>', encoding='utf-8')
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        assert cache.file_digest(str(path)) == digest
+
+        path.write_text('<p>three</p>', encoding='utf-8')
+        age(path)
+        assert cache.file_digest(str(path)) != digest
+
+    def test_recently_modified_files_are_always_hashed(self, tmp_path):
+        path = tmp_path / 'page.html'
+        path.write_text('<p>one</p>', encoding='utf-8')
+        cache = ParseCache(str(tmp_path / 'cache.sqlite'))
+        cache.file_digest(str(path))
+
+        assert cache.stats()['files'] == 0
+
+    def test_least_recently_used_results_are_evicted(self):
+        cache = ParseCache(max_bytes=10 ** 6)
+        for digest in ('a', 'b', 'c'):
+            cache.put(digest, 'stats.html', {'value': digest * 1000})
+            time.sleep(0.01)
+        cache.get('a', 'stats.html')
+        one = cache.stats()['bytes'] // 3
+
+        assert cache.evict(max_bytes=one * 2 + 1) == 1
+        assert cache.get('b', 'stats.html') is None
+        assert cache.get('a', 'stats.html') and cache.get('c', 'stats.html')
+        # Within the budget: nothing to drop
+        assert cache.evict() == 0
+
+    def test_persists_and_recovers_from_corruption(self, tmp_path):
+        path = str(tmp_path / 'cache.sqlite')
+        cache = ParseCache(path)
+        cache.put('abc', 'stats.html', [1])
+        cache.close()
+        assert ParseCache(path).get('abc', 'stats.html') == [1]
+
+        with open(path, 'wb') as f:
+            f.write(b'not a database' * 100)
+        cache = ParseCache(path)
+        assert cache.get('abc', 'stats.html') is None
+        cache.put('abc', 'stats.html', [2])
+        assert cache.get('abc', 'stats.html') == [2]
+
+    def test_can_be_turned_off(self, monkeypatch):
+        monkeypatch.setenv('ETOROHELPER_PARSE_CACHE', 'off')
+
+        assert get_parse_cache() is None
+
+
+def test_unchanged_pages_are_not_parsed_again(tmp_path):
+    folder = tmp_path / 'alice' / '2026-01-01'
+    folder.mkdir(parents=True)
+    shutil.copy(os.path.join(EXAMPLE_DIR, 'portfolio', 'person-url-statts.txt'), folder / 'stats.html')
+    age(folder / 'stats.html')
+    with open(os.path.join(EXAMPLE_DIR, 'input', 'InputContent.txt'), encoding='utf-8') as f:
+        save_page_snapshot(str(folder), 'portfolio', f.read())
+
+    first = extract_person_data('alice', str(folder), ['stats', 'portfolio'])
+    with patch('src.stats_parser.extract_stats_data', side_effect=AssertionError('parsed again')), \
+            patch('src.pipeline._read_portfolio_rows', side_effect=AssertionError('parsed again')):
+        assert extract_person_data('alice', str(folder), ['stats', 'portfolio']) == first
+    assert first['stats']['performance']['user_vs_spx500']['user'] == '+15.91%'
+    assert len(first['portfolio']) == 50
+
+    # A changed page is parsed again
+    (folder / 'stats.html').write_text('<html></html>', encoding='utf-8')
+    assert extract_person_data('alice', str(folder), ['stats'])['stats'] != first['stats']
@@ -0,0 +1,110 @@
+import os
+
+import pytest
+
+from src import parsed_page
+from src.parsed_page import EXTRACTORS, ParsedPage, as_parsed_page, register_extractor
+from src.performance_parser import extract_performance_data, find_profitable_weeks, lazy_performance_data
+from src.snapshot_store import save_page_snapshot
+from src.stats_parser import extract_stats_data, lazy_stats_data
+
+EXAMPLE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'example')
+STATS_PATH = os.path.join(EXAMPLE_DIR, 'portfolio', 'person-url-statts.txt')
+
+
+@pytest.fixture
+def parse_count(monkeypatch):
+    calls = []
+    make_soup = parsed_page.make_soup
+
+    def counting_make_soup(html, backend=None):
+        calls.append(backend)
+        return make_soup(html, backend)
+
+    monkeypatch.setattr(parsed_page, 'make_soup', counting_make_soup)
+    return calls
+
+
+class TestParsedPage:
+    """Test cases for the shared, parse-once page object."""
+
+    def test_extractors_share_one_parse(self, parse_count):
+        page = ParsedPage.from_file(STATS_PATH)
+
+        results = page.extract('performance', 'stats')
+
+        assert len(parse_count) == 1
+        with open(STATS_PATH, encoding='utf-8') as f:
+            html = f.read()
+        assert results['stats'] == extract_stats_data(html)
+        assert results['performance'] == extract_performance_data(html)
+
+    def test_registered_extractor_runs_on_the_same_parse(self, parse_count, monkeypatch):
+        monkeypatch.setitem(EXTRACTORS, 'profitable_weeks', find_profitable_weeks)
+        page = ParsedPage.from_file(STATS_PATH)
+
+        results = page.extract('stats', 'profitable_weeks')
+
+        assert len(parse_count) == 1
+        assert results['profitable_weeks'] == results['stats']['additional_stats'].get('profitable_weeks')
+
+    def test_register_extractor_by_path(self, monkeypatch):
+        monkeypatch.setattr(parsed_page, 'EXTRACTORS', {})
+        register_extractor('weeks', 'src.performance_parser:find_profitable_weeks')
+
+        assert ParsedPage('<p>nothing</p>').extract() == {'weeks': None}
+
+    def test_as_parsed_page(self):
+        page = ParsedPage('<p>x</p>')
+
+        assert as_parsed_page(page) is page
+        assert as_parsed_page('<p>x</p>').html == '<p>x</p>'
+
+    def test_from_download(self, tmp_path):
+        download_dir = str(tmp_path / 'alice' / '2026-02-23')
+        save_page_snapshot(download_dir, 'stats', '<div automation-id="copiers-value">7</div>')
+
+        page = ParsedPage.from_download(download_dir, 'stats')
+
+        assert page.soup.find(attrs={'automation-id': 'copiers-value'}).text == '7'
+        assert ParsedPage.from_download(download_dir, 'profile') is None
+
+
+class TestLazySections:
+    """Test cases for section-selective and lazy extraction."""
+
+    def test_selected_sections_only(self):
+        page = ParsedPage.from_file(STATS_PATH)
+        full = extract_stats_data(page)
+
+        data = extract_stats_data(page, sections=['trading_statistics', 'performance'])
+
+        assert list(data) == ['performance', 'trading_statistics']
+        assert data['performance'] == full['performance']
+        assert data['trading_statistics'] == full['trading_statistics']
+
+    def test_sections_are_computed_on_first_access(self):
+        page = ParsedPage.from_file(STATS_PATH)
+        stats = lazy_stats_data(page)
+
+        assert stats['performance']['user_vs_spx500']['user'] == '+15.91%'
+        assert stats.computed() == ['performance']
+        # No label search was needed for the performance section.
+        assert page._labels == {}
+        assert dict(stats) == extract_stats_data(page)
+        assert len(stats.computed()) == len(stats)
+
+    def test_performance_sections(self):
+        with open(os.path.join(EXAMPLE_DIR, 'portfolio', 'person-url-1.txt'), encoding='utf-8') as f:
+            html = f.read()
+
+        metrics = lazy_performance_data(html)['additionalMetrics']
+
+        assert metrics['renditeYTD'] == '19.08%'
+        assert extract_performance_data(html, sections=['additionalMetrics']) == {'additionalMetrics': metrics}
+
+    def test_unknown_section(self):
+        with pytest.raises(ValueError):
+            extract_stats_data('<p></p>', sections=['copiers'])
+        with pytest.raises(KeyError):
+            lazy_stats_data('<p></p>', sections=['performance'])['dividends']
@@ -0,0 +1,107 @@
+import json
+import os
+import shutil
+import threading
+from unittest.mock import MagicMock, patch
+
+from src.pipeline import Pipeline, run_pipeline
+
+EXAMPLE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'example')
+
+FIXTURES = {
+    'profile': os.path.join('portfolio', 'person-url-1.txt'),
+    'stats': os.path.join('portfolio', 'person-url-statts.txt'),
+    'portfolio': os.path.join('input', 'InputContent.txt'),
+}
+
+
+def fixture_download(person, download_dir, pages=None, **kwargs):
+    """Pretend to download a user by copying the example pages."""
+    os.makedirs(download_dir, exist_ok=True)
+    results = {}
+    for page_type, fixture in FIXTURES.items():
+        path = os.path.join(download_dir, f'{page_type}.html')
+        shutil.copy(os.path.join(EXAMPLE_DIR, fixture), path)
+        results[page_type] = {'status': 'ok', 'source': 'http', 'path': path, 'seconds': 0.01}
+    results['chart'] = {'status': 'failed', 'source': 'http', 'path': None, 'seconds': 0.01}
+    return results
+
+
+@patch('src.downloader.download_person_data', side_effect=fixture_download)
+def test_users_are_parsed_and_written_by_the_pipeline(mock_download, tmp_path):
+    summary = run_pipeline(['alice', 'bob'], downloads_root=str(tmp_path), date='2026-02-23',
+                           parse_workers=2, workers=2, driver_factory=MagicMock(), max_attempts=1)
+
+    for person in ('alice', 'bob'):
+        folder = tmp_path / person / '2026-02-23'
+        with open(folder / 'performance.json', encoding='utf-8') as f:
+            assert json.load(f)['additionalMetrics']['renditeYTD'] == '19.08%'
+        with open(folder / 'stats.json', encoding='utf-8') as f:
+            assert json.load(f)['performance']['user_vs_spx500']['user'] == '+15.91%'
+        with open(folder / 'portfolio.json', encoding='utf-8') as f:
+            assert len(json.load(f)) == 50
+    assert summary['stages']['download']['items'] == 2
+    assert summary['stages']['parse']['items'] == 2
+    assert summary['stages']['write']['items'] == 2
+    assert summary['parse_errors'] == {}
+
+
+@patch('src.downloader.download_person_data', side_effect=fixture_download)
+def test_typed_values_are_written(mock_download, tmp_path):
+    run_pipeline(['alice'], downloads_root=str(tmp_path), date='2026-02-23', parse_workers=1, use_processes=False,
+                 typed=True, workers=1, driver_factory=MagicMock(), max_attempts=1)
+
+    folder = tmp_path / 'alice' / '2026-02-23'
+    with open(folder / 'stats.json', encoding='utf-8') as f:
+        assert json.load(f)['performance']['user_vs_spx500']['user'] == {'raw': '+15.91%', 'value': 15.91, 'unit': '%'}
+    with open(folder / 'portfolio.json', encoding='utf-8') as f:
+        assert json.load(f)[0]['asset_pnl'] == {'raw': 'HK$10.39', 'value': 10.39, 'unit': 'HKD'}
+    # The Markdown shows the text as displayed
+    assert 'HK$10.39' in (folder / 'portfolio.md').read_text(encoding='utf-8')
+    assert "'raw'" not in (folder / 'stats.md').read_text(encoding='utf-8')
+
+
+def test_full_parse_queue_blocks_the_download_stage(tmp_path):
+    pipeline = Pipeline(parse_workers=1, queue_size=1, use_processes=False)
+    pipeline.submit('alice', str(tmp_path), ['profile'])
+
+    blocked = threading.Thread(target=pipeline.submit, args=('bob', str(tmp_path), ['profile']))
+    blocked.start()
+    blocked.join(timeout=0.2)
+    assert blocked.is_alive()
+
+    pipeline.start()
+    blocked.join(timeout=5)
+    pipeline.close()
+    assert not blocked.is_alive()
+    assert pipeline.counters['parse'].items == 2
+
+
+def run_and_close(pipeline, folder, people):
+    """Submit users and close the pipeline, failing instead of hanging if it stalls."""
+    def run():
+        for person in people:
+            pipeline.submit(person, str(folder), ['stats'])
+        pipeline.close()
+
+    runner = threading.Thread(target=run, daemon=True)
+    runner.start()
+    runner.join(timeout=5)
+    assert not runner.is_alive(), 'pipeline stalled'
+
+
+@patch('src.pipeline._timed_extract', return_value=({'stats': {}}, 0.01, {}))
+@patch('src.pipeline.write_person_data', side_effect=ValueError('cannot format'))
+def test_failing_writer_does_not_stall_the_pipeline(mock_write, mock_extract, tmp_path):
+    pipeline = Pipeline(parse_workers=1, queue_size=1, use_processes=False).start()
+    run_and_close(pipeline, tmp_path, ['alice', 'bob', 'carol'])
+
+    assert pipeline.errors == {person: 'cannot format' for person in ('alice', 'bob', 'carol')}
+
+
+def test_failing_dispatch_does_not_stall_the_pipeline(tmp_path):
+    pipeline = Pipeline(parse_workers=1, queue_size=1, use_processes=False).start()
+    pipeline._executor.submit = MagicMock(side_effect=RuntimeError('pool broken'))
+    run_and_close(pipeline, tmp_path, ['alice', 'bob', 'carol'])
+
+    assert pipeline.errors == {person: 'pool broken' for person in ('alice', 'bob', 'carol')}
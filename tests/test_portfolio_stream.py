@@ -0,0 +1,85 @@
+import io
+import os
+
+from src.parser import extract_portfolio_data
+from src.portfolio_stream import iter_portfolio_rows, measure
+from src.snapshot_store import open_page, save_page_snapshot
+
+EXAMPLE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'example')
+INPUT_PATH = os.path.join(EXAMPLE_DIR, 'input', 'InputContent.txt')
+
+
+def read_input():
+    with open(INPUT_PATH, encoding='utf-8') as f:
+        return f.read()
+
+
+class CountingReader(io.StringIO):
+    def __init__(self, content):
+        super().__init__(content)
+        self.reads = 0
+
+    def read(self, size=-1):
+        self.reads += 1
+        return super().read(size)
+
+
+class TestPortfolioStream:
+    """Test cases for the streaming portfolio row extractor."""
+
+    def test_matches_tree_extractor_on_example(self):
+        expected = extract_portfolio_data(read_input())
+
+        assert list(iter_portfolio_rows(INPUT_PATH)) == expected
+        # Chunk boundaries falling inside tags and text don't matter.
+        assert list(iter_portfolio_rows(INPUT_PATH, chunk_size=997)) == expected
+
+    def test_rows_are_yielded_while_reading(self):
+        source = CountingReader(read_input())
+
+        rows = iter_portfolio_rows(source, chunk_size=4096)
+        first = next(rows)
+
+        assert first['ticker'] == extract_portfolio_data(read_input())[0]['ticker']
+        assert source.reads < len(read_input()) // 4096 / 2
+
+    def test_void_and_stray_tags(self):
+        html = ('<div class="et-table-row"><div class="et-table-first-cell"><img src="x.svg">'
+                '<div automation-id="portfolio-overview-table-body-cell-market-name">ABC<br></span></div></div>'
+                '<div class="et-table-body-slot"></div></div>')
+
+        assert list(iter_portfolio_rows(io.StringIO(html))) == extract_portfolio_data(html)
+
+    def test_nested_rows_are_rows_of_their_own(self):
+        html = ('<div class="et-table-row"><div class="et-table-first-cell">'
+                '<div automation-id="portfolio-overview-table-body-cell-market-name">OUT</div></div>'
+                '<div class="et-table-body-slot"></div>'
+                '<div class="et-table-row"><div class="et-table-first-cell">'
+                '<div automation-id="portfolio-overview-table-body-cell-market-name">IN</div></div>'
+                '<div class="et-table-body-slot"></div></div></div>')
+
+        rows = list(iter_portfolio_rows(io.StringIO(html)))
+
+        assert [row['ticker'] for row in rows] == ['OUT', 'IN']
+        assert rows == extract_portfolio_data(html)
+
+    def test_peak_memory_does_not_grow_with_page_size(self, tmp_path):
+        content = read_input()
+        small, large = tmp_path / 'small.html', tmp_path / 'large.html'
+        small.write_text(content, encoding='utf-8')
+        large.write_text(content * 4, encoding='utf-8')
+
+        _, small_peak = measure(lambda: sum(1 for _ in iter_portfolio_rows(str(small))))
+        _, large_peak = measure(lambda: sum(1 for _ in iter_portfolio_rows(str(large))))
+
+        assert large_peak < small_peak * 1.5
+
+    def test_streams_from_snapshot_store(self, tmp_path):
+        download_dir = str(tmp_path / 'alice' / '2026-02-23')
+        save_page_snapshot(download_dir, 'portfolio', read_input())
+
+        with open_page(download_dir, 'portfolio') as stream:
+            rows = list(iter_portfolio_rows(stream))
+
+        assert rows == extract_portfolio_data(read_input())
+        assert open_page(download_dir, 'stats') is None
@@ -0,0 +1,90 @@
+import json
+import math
+import os
+
+import pytest
+
+from src.parser import extract_portfolio_data, generate_json, generate_markdown
+from src.portfolio_stream import iter_portfolio_rows
+from src.portfolio_types import PORTFOLIO_FIELDS, PortfolioRow, PortfolioTable, convert, retained_memory, to_dicts
+
+INPUT_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                          'example', 'input', 'InputContent.txt')
+
+
+@pytest.fixture(scope='module')
+def positions():
+    with open(INPUT_FILE, encoding='utf-8') as f:
+        return extract_portfolio_data(f.read())
+
+
+class TestPortfolioTypes:
+    """Test cases for the compact portfolio row and table types."""
+
+    def test_row_round_trip(self, positions):
+        row = PortfolioRow.from_dict(positions[0])
+
+        assert row.ticker == '0992.HK'
+        assert row.net_value == 42.56
+        assert row.to_dict() == positions[0]
+        assert list(row.to_dict()) == list(PORTFOLIO_FIELDS)
+
+    def test_row_defaults_missing_fields_to_none(self):
+        row = PortfolioRow.from_dict({'ticker': 'AAPL', 'extra': 1})
+
+        assert row.ticker == 'AAPL' and row.price is None
+
+    def test_table_round_trip(self, positions):
+        table = PortfolioTable(positions)
+
+        assert len(table) == len(positions) == 50
+        assert table.to_dicts() == positions
+        assert table[0] == PortfolioRow.from_dict(positions[0])
+        assert to_dicts(convert(positions, 'rows')) == positions
+
+    def test_table_columns(self):
+        table = PortfolioTable([{'ticker': 'AAPL', 'price': 1.5}, {'ticker': 'AAPL', 'price': None}])
+
+        price = table.column('price')
+        assert price.typecode == 'd'
+        assert price[0] == 1.5 and math.isnan(price[1])
+        assert table[1].price is None
+        # Tickers are interned: one string object for every row that repeats it
+        assert table.column('ticker')[0] is table.column('ticker')[1]
+
+    def test_table_rejects_typed_values(self):
+        with pytest.raises(ValueError):
+            PortfolioTable([{'ticker': 'AAPL', 'price': {'raw': '$1', 'value': 1.0, 'unit': 'USD'}}])
+
+    def test_unknown_output(self, positions):
+        with pytest.raises(ValueError):
+            convert(positions, 'frame')
+
+    def test_extractors_return_the_types(self, positions):
+        with open(INPUT_FILE, encoding='utf-8') as f:
+            html = f.read()
+
+        table = extract_portfolio_data(html, output='table')
+        assert isinstance(table, PortfolioTable) and table.to_dicts() == positions
+        assert extract_portfolio_data(html, output='rows') == convert(positions, 'rows')
+        assert list(iter_portfolio_rows(INPUT_FILE, output='rows')) == convert(positions, 'rows')
+        assert PortfolioTable(iter_portfolio_rows(INPUT_FILE)) == table
+
+    def test_compact_types_hold_less_memory(self, positions):
+        _, dicts = retained_memory(lambda: [dict(row) for row in positions])
+        _, table = retained_memory(PortfolioTable, positions)
+
+        assert table < dicts
+
+
+@pytest.mark.parametrize('output', ['rows', 'table'])
+def test_generators_accept_compact_types(tmp_path, positions, output):
+    portfolio = convert(positions, output)
+    generate_json(positions, tmp_path / 'dicts.json')
+    generate_markdown(positions, tmp_path / 'dicts.md')
+
+    generate_json(portfolio, tmp_path / 'compact.json')
+    generate_markdown(portfolio, tmp_path / 'compact.md')
+
+    assert json.loads((tmp_path / 'compact.json').read_text(encoding='utf-8')) == positions
+    assert (tmp_path / 'compact.md').read_text(encoding='utf-8') == (tmp_path / 'dicts.md').read_text(encoding='utf-8')
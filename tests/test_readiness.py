@@ -0,0 +1,135 @@
+import json
+import shutil
+import subprocess
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+from bs4 import BeautifulSoup
+
+from src.pages import REQUIRED_SELECTORS
+from src.readiness import READINESS_PROBE_JS, ReadinessTracker, wait_until_ready
+
+
+EXAMPLE_DIR = Path(__file__).resolve().parents[1] / 'example'
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestReadinessTracker:
+    """Test cases for the DOM-quiescence readiness decision."""
+
+    def test_waits_for_required_selectors(self):
+        clock = FakeClock()
+        tracker = ReadinessTracker('stats', timeout=30, quiet_period=0.5, clock=clock)
+
+        clock.now = 1.0
+        assert not tracker.update({'missing': ['et-card-content'], 'quietMs': 5000})
+        clock.now = 1.2
+        assert tracker.update({'missing': [], 'quietMs': 600})
+
+        assert tracker.result() == {'ready': True, 'time_to_ready': 1.2, 'method': 'mutation', 'missing': []}
+
+    def test_waits_for_mutations_to_stop(self):
+        clock = FakeClock()
+        tracker = ReadinessTracker('stats', quiet_period=0.5, clock=clock)
+
+        assert not tracker.update({'missing': [], 'quietMs': 100})
+        clock.now = 0.6
+        assert tracker.update({'missing': [], 'quietMs': 500})
+
+    def test_size_stability_fallback(self):
+        clock = FakeClock()
+        tracker = ReadinessTracker('chart', quiet_period=0.5, clock=clock)
+
+        for now, size in [(0.0, 100), (0.3, 200), (0.6, 200)]:
+            clock.now = now
+            assert not tracker.update({'missing': [], 'quietMs': None, 'size': size})
+        clock.now = 0.8
+        assert tracker.update({'missing': [], 'quietMs': None, 'size': 200})
+        assert tracker.method == 'size'
+
+    def test_hard_cap(self):
+        clock = FakeClock()
+        tracker = ReadinessTracker('profile', timeout=10, clock=clock)
+
+        clock.now = 10.0
+        assert not tracker.update({'missing': ['x'], 'quietMs': 0})
+        assert tracker.expired()
+        assert tracker.result()['ready'] is False
+        assert tracker.result()['missing'] == ['x']
+
+
+class TestWaitUntilReady:
+    """Test cases for polling a driver until the page is ready."""
+
+    def test_returns_as_soon_as_page_settles(self):
+        driver = MagicMock()
+        driver.execute_script.side_effect = [
+            {'missing': ['et-card-content'], 'quietMs': 0, 'size': 10, 'readyState': 'interactive'},
+            {'missing': [], 'quietMs': 0, 'size': 20, 'readyState': 'complete'},
+            {'missing': [], 'quietMs': 1000, 'size': 20, 'readyState': 'complete'},
+        ]
+
+        result = wait_until_ready(driver, 'stats', poll_interval=0)
+
+        assert result['ready'] is True
+        assert driver.execute_script.call_count == 3
+        assert result['time_to_ready'] < 5
+
+    def test_unsupported_driver(self):
+        driver = MagicMock()
+
+        assert wait_until_ready(driver, 'stats', poll_interval=0) is None
+
+
+@pytest.mark.parametrize('page_type, fixture', [
+    ('profile', 'portfolio/person-url-1.txt'),
+    ('stats', 'portfolio/person-url-statts.txt'),
+    ('portfolio', 'input/InputContent.txt'),
+])
+def test_required_selectors_match_saved_pages(page_type, fixture):
+    """Every required selector must be present in a real saved page."""
+    html = (EXAMPLE_DIR / fixture).read_text(encoding='utf-8')
+    soup = BeautifulSoup(html, 'html.parser')
+
+    for selector in REQUIRED_SELECTORS[page_type]:
+        assert soup.select_one(selector) is not None, selector
+
+
+# A document whose outerHTML counts how often it is serialized, for running the probe under Node.
+PROBE_HARNESS = """
+var serialized = 0;
+var window = {};
+var document = {
+    readyState: 'complete',
+    querySelector: function () { return {}; },
+    documentElement: {get outerHTML() { serialized++; return '<html></html>'; }}
+};
+%s
+var probe = function () { %s };
+var snapshots = [probe(['body']), probe(['body'])];
+console.log(JSON.stringify({snapshots: snapshots, serialized: serialized}));
+"""
+
+
+@pytest.mark.skipif(shutil.which('node') is None, reason='requires Node.js')
+@pytest.mark.parametrize('observer', [True, False])
+def test_probe_serializes_the_dom_only_without_mutation_observer(observer):
+    observer_js = 'function MutationObserver() {} MutationObserver.prototype.observe = function () {};' if observer else ''
+    output = subprocess.run(['node', '-e', PROBE_HARNESS % (observer_js, READINESS_PROBE_JS)],
+                            capture_output=True, text=True, check=True).stdout
+    result = json.loads(output)
+
+    if observer:
+        assert result['serialized'] == 0
+        assert all(snapshot['size'] is None and snapshot['quietMs'] is not None for snapshot in result['snapshots'])
+    else:
+        assert result['serialized'] == 2
+        assert [snapshot['size'] for snapshot in result['snapshots']] == [13, 13]
@@ -0,0 +1,86 @@
+import os
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.refresh import parse_duration, parse_pages, parse_ttls, plan_refresh, reuse_snapshots
+
+
+def write_snapshot(directory, page_type, age_seconds, content='<html></html>'):
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f'{page_type}.html')
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    mtime = time.time() - age_seconds
+    os.utime(path, (mtime, mtime))
+    return path
+
+
+class TestParsing:
+    """Test cases for the --pages and --ttl option values."""
+
+    def test_durations(self):
+        assert parse_duration('90') == 90
+        assert parse_duration('15m') == 900
+        assert parse_duration('2h') == 7200
+        assert parse_duration('1d') == 86400
+        with pytest.raises(ValueError):
+            parse_duration('soon')
+
+    def test_pages_keep_download_order(self):
+        assert parse_pages('stats, profile') == ['profile', 'stats']
+        assert parse_pages('all') == ['profile', 'stats', 'portfolio', 'chart']
+        with pytest.raises(ValueError, match='Unknown page'):
+            parse_pages('profile,wallet')
+
+    def test_ttls(self):
+        assert parse_ttls(['all=2h', 'chart=1d']) == {
+            'profile': 7200, 'stats': 7200, 'portfolio': 7200, 'chart': 86400
+        }
+        with pytest.raises(ValueError):
+            parse_ttls(['profile'])
+
+
+class TestPlanRefresh:
+    """Test cases for the per-page refresh planner."""
+
+    def test_fresh_pages_are_reused(self, tmp_path):
+        download_dir = str(tmp_path / 'alice' / '2026-02-23')
+        write_snapshot(download_dir, 'profile', age_seconds=5 * 60)
+        write_snapshot(download_dir, 'stats', age_seconds=2 * 60 * 60)
+        write_snapshot(download_dir, 'portfolio', age_seconds=2 * 60 * 60)
+
+        plan = plan_refresh(download_dir)
+
+        assert {page: entry['action'] for page, entry in plan.items()} == {
+            'profile': 'reuse', 'stats': 'fetch', 'portfolio': 'reuse', 'chart': 'fetch'
+        }
+
+    def test_snapshot_from_earlier_day_is_copied(self, tmp_path):
+        yesterday = str(tmp_path / 'alice' / '2026-02-22')
+        today = str(tmp_path / 'alice' / '2026-02-23')
+        write_snapshot(yesterday, 'portfolio', age_seconds=60 * 60, content='<html>old</html>')
+        os.makedirs(today)
+
+        plan = plan_refresh(today, pages=['portfolio'])
+        results = reuse_snapshots(plan, today)
+
+        assert results['portfolio']['source'] == 'cache'
+        with open(os.path.join(today, 'portfolio.html'), encoding='utf-8') as f:
+            assert f.read() == '<html>old</html>'
+
+
+def test_download_skips_browser_when_everything_is_fresh(tmp_path):
+    from src.downloader import download_person_data
+
+    download_dir = str(tmp_path / 'alice' / '2026-02-23')
+    for page_type in ('profile', 'stats'):
+        write_snapshot(download_dir, page_type, age_seconds=60)
+    provider = MagicMock()
+
+    results = download_person_data('alice', download_dir, driver_provider=provider,
+                                   pages=['profile', 'stats'], ttls={})
+
+    provider.assert_not_called()
+    assert {result['source'] for result in results.values()} == {'cache'}
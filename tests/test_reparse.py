@@ -0,0 +1,73 @@
+import json
+import os
+import shutil
+
+from src.reparse import _reparse_folder, default_chunk_size, find_snapshot_folders, reparse_downloads
+from src.strategy_cache import get_strategy_cache
+
+EXAMPLE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'example')
+
+FIXTURES = {
+    'profile': os.path.join('portfolio', 'person-url-1.txt'),
+    'stats': os.path.join('portfolio', 'person-url-statts.txt'),
+    'portfolio': os.path.join('input', 'InputContent.txt'),
+}
+
+
+def make_snapshot(root, person, date, page_types=tuple(FIXTURES)):
+    folder = root / person / date
+    folder.mkdir(parents=True)
+    for page_type in page_types:
+        shutil.copy(os.path.join(EXAMPLE_DIR, FIXTURES[page_type]), folder / f'{page_type}.html')
+    return folder
+
+
+def test_find_snapshot_folders(tmp_path):
+    make_snapshot(tmp_path, 'bob', '2026-01-02', ['stats'])
+    make_snapshot(tmp_path, 'alice', '2026-01-01', ['stats'])
+    (tmp_path / '.snapshots' / 'ab').mkdir(parents=True)
+    (tmp_path / 'notes.txt').write_text('', encoding='utf-8')
+
+    assert find_snapshot_folders(str(tmp_path)) == [
+        ('alice', str(tmp_path / 'alice' / '2026-01-01')),
+        ('bob', str(tmp_path / 'bob' / '2026-01-02')),
+    ]
+    assert [user for user, _ in find_snapshot_folders(str(tmp_path), users=['bob'])] == ['bob']
+    assert find_snapshot_folders(str(tmp_path / 'missing')) == []
+
+
+def test_reparse_folder_writes_outputs(tmp_path):
+    folder = make_snapshot(tmp_path, 'alice', '2026-01-01')
+
+    result = _reparse_folder(('alice', str(folder), False))
+
+    assert result['files'] == 3 and result['error'] is None
+    with open(folder / 'performance.json', encoding='utf-8') as f:
+        assert json.load(f)['additionalMetrics']['renditeYTD'] == '19.08%'
+    with open(folder / 'stats.json', encoding='utf-8') as f:
+        assert json.load(f)['performance']['user_vs_spx500']['user'] == '+15.91%'
+    with open(folder / 'portfolio.json', encoding='utf-8') as f:
+        assert len(json.load(f)) == 50
+
+
+def test_reparse_downloads_in_worker_processes(tmp_path, monkeypatch):
+    # Every folder parsed (the pages are identical), to count the strategy attempts
+    monkeypatch.setenv('ETOROHELPER_PARSE_CACHE', 'off')
+    for person, date in (('alice', '2026-01-01'), ('alice', '2026-01-02'), ('bob', '2026-01-01')):
+        make_snapshot(tmp_path, person, date, ['stats', 'portfolio'])
+
+    summary = reparse_downloads(str(tmp_path), workers=2, chunk_size=1)
+
+    assert summary['folders'] == 3 and summary['files'] == 6
+    assert summary['errors'] == {}
+    assert sum(worker['folders'] for worker in summary['workers']) == 3
+    assert all(os.path.exists(tmp_path / person / date / 'portfolio.json')
+               for person, date in (('alice', '2026-01-01'), ('alice', '2026-01-02'), ('bob', '2026-01-01')))
+    # The workers' strategy counters are saved once, by the parent
+    with open(get_strategy_cache().path, encoding='utf-8') as f:
+        assert json.load(f)['fields']['stats.copiers']['chart-copiers-value'] == {'hits': 0, 'misses': 3}
+
+
+def test_default_chunk_size():
+    assert default_chunk_size(1000, 4) == 63
+    assert default_chunk_size(3, 8) == 1
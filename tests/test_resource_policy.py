@@ -0,0 +1,96 @@
+import urllib.request
+from unittest.mock import MagicMock
+
+import pytest
+
+from conftest import requires_browser
+from src.network_capture import NetworkCapture
+from src.resource_policy import BLOCK_CATEGORIES, build_policy, parse_block_option
+from src.standin import HEAVY_ASSETS, StandinServer, fixture_routes
+from test_network_capture import FakeLoggingDriver, log_entry
+
+
+class TestPolicy:
+    """Test cases for the resource blocking policy."""
+
+    def test_parse_block_option(self):
+        assert parse_block_option('default') is True
+        assert parse_block_option('none') is None
+        assert parse_block_option('images, trackers') == ['images', 'trackers']
+        with pytest.raises(ValueError, match='Unknown resource category'):
+            parse_block_option('scripts')
+
+    def test_default_policy_per_page_type(self):
+        policy = build_policy(True)
+
+        assert '*.woff2' in policy['profile']
+        assert '*.png?*' in policy['profile']
+        assert '*googletagmanager.com*' in policy['stats']
+        # The chart page keeps its images.
+        assert '*.png' not in policy['chart']
+        assert build_policy(None) is None
+
+    def test_categories_apply_to_every_page(self):
+        policy = build_policy(['fonts'])
+
+        assert all(patterns == list(BLOCK_CATEGORIES['fonts']) for patterns in policy.values())
+
+
+def test_traffic_counts_bytes_and_blocked_requests():
+    driver = FakeLoggingDriver([
+        log_entry('Network.requestWillBeSent', requestId='1', documentURL='http://x/people/a',
+                  request={'url': 'http://x/people/a'}),
+        log_entry('Network.loadingFinished', requestId='1', encodedDataLength=5000),
+        log_entry('Network.requestWillBeSent', requestId='2', documentURL='http://x/people/a',
+                  request={'url': 'http://x/hero.jpg'}),
+        log_entry('Network.loadingFailed', requestId='2', blockedReason='inspector'),
+        log_entry('Network.requestWillBeSent', requestId='3', documentURL='http://x/people/b',
+                  request={'url': 'http://x/people/b'}),
+        log_entry('Network.loadingFinished', requestId='3', encodedDataLength=700),
+    ], bodies={})
+    capture = NetworkCapture(driver, collect_responses=False)
+
+    capture.poll()
+
+    assert capture.traffic() == {'requests': 2, 'bytes': 5700, 'blocked_requests': 1}
+    assert capture.traffic({'http://x/people/a'}) == {'requests': 1, 'bytes': 5000, 'blocked_requests': 1}
+
+
+def test_block_list_is_set_before_each_page_loads(tmp_path):
+    from src.downloader import download_person_data
+
+    calls = []
+    driver = MagicMock()
+    driver.page_source = '<html></html>'
+    driver.get_log.return_value = []
+    driver.execute_cdp_cmd.side_effect = lambda cmd, params: calls.append((cmd, params))
+    driver.get.side_effect = lambda url: calls.append(('get', url))
+
+    download_person_data('alice', str(tmp_path), driver=driver, pages=['profile', 'chart'],
+                         block_resources=True, timeout=0.1)
+
+    blocked = [(cmd, params) for cmd, params in calls if cmd in ('Network.setBlockedURLs', 'get')]
+    assert [cmd for cmd, _ in blocked] == ['Network.setBlockedURLs', 'get', 'Network.setBlockedURLs', 'get']
+    assert '*.jpg' in blocked[0][1]['urls']
+    assert '*.jpg' not in blocked[2][1]['urls']
+
+
+def test_heavy_asset_standin_counts_served_bytes():
+    with StandinServer(fixture_routes('someone', heavy_assets=True)) as server:
+        with urllib.request.urlopen(f'{server.base_url}/people/someone', timeout=10) as response:
+            page = response.read().decode('utf-8')
+        with urllib.request.urlopen(f'{server.base_url}/assets/hero.jpg', timeout=10) as response:
+            response.read()
+
+    assert '/assets/intro.mp4' in page
+    assert server.bytes_served == len(page.encode('utf-8')) + HEAVY_ASSETS['/assets/hero.jpg'][1]
+
+
+@requires_browser
+def test_blocking_saves_bytes_against_heavy_standin():
+    from src.resource_policy import benchmark
+
+    averages = benchmark(runs=1)
+
+    assert averages['on']['bytes'] < averages['off']['bytes']
+    assert averages['on']['blocked_requests'] > 0
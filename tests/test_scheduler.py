@@ -0,0 +1,95 @@
+from src.scheduler import AdaptiveRateLimiter, RetryScheduler, backoff_delay
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class TestAdaptiveRateLimiter:
+    """Test cases for the shared token bucket."""
+
+    def test_burst_then_paced(self):
+        clock = FakeClock()
+        limiter = AdaptiveRateLimiter(rate=2.0, burst=2, clock=clock, sleep=clock.sleep)
+
+        for _ in range(4):
+            limiter.acquire()
+
+        # Two tokens up front, then one every half second.
+        assert clock.now == 1.0
+
+    def test_rate_adapts_additively_and_multiplicatively(self):
+        limiter = AdaptiveRateLimiter(rate=4.0, min_rate=1.0, max_rate=4.3, increase=0.2, decrease=0.5)
+
+        limiter.record_success()
+        limiter.record_success()
+        assert limiter.rate == 4.3
+        limiter.record_failure()
+        assert limiter.rate == 2.15
+        limiter.record_failure()
+        limiter.record_failure()
+        assert limiter.rate == 1.0
+
+
+def test_backoff_grows_exponentially_up_to_cap():
+    assert [backoff_delay(n, base_delay=1.0, max_delay=5.0, rng=lambda: 1.0) for n in (1, 2, 3, 4)] == [1, 2, 4, 5]
+    assert backoff_delay(3, rng=lambda: 0.0) == 0.0
+
+
+class TestRetryScheduler:
+    """Test cases for the retrying work queue."""
+
+    def test_retries_run_after_all_first_attempts(self):
+        scheduler = RetryScheduler(max_attempts=3, base_delay=0.001)
+        calls = []
+
+        def handler(key, payload, attempt):
+            calls.append((key, attempt))
+            return payload if key == 'a' and attempt == 0 else None
+
+        for key in ('a', 'b', 'c'):
+            scheduler.submit(key, ['stats'])
+        scheduler.run(handler, workers=1)
+
+        assert calls == [('a', 0), ('b', 0), ('c', 0), ('a', 1)]
+        assert scheduler.retries == 1
+        assert scheduler.gave_up == []
+
+    def test_gives_up_after_max_attempts(self):
+        scheduler = RetryScheduler(max_attempts=2, base_delay=0.001)
+        attempts = []
+
+        def handler(key, payload, attempt):
+            attempts.append(attempt)
+            raise RuntimeError('always down')
+
+        scheduler.submit('a', ['profile'])
+        scheduler.run(handler, workers=2)
+
+        assert attempts == [0, 1]
+        assert scheduler.gave_up == [('a', ['profile'])]
+
+    def test_failed_job_without_payload_is_retried(self):
+        scheduler = RetryScheduler(max_attempts=3, base_delay=0.001)
+        calls = []
+
+        def handler(key, payload, attempt):
+            calls.append((payload, attempt))
+            if attempt == 0:
+                raise RuntimeError('browser crashed')
+            return []
+
+        # None means "all pages" to the batch downloader
+        scheduler.submit('a', None)
+        scheduler.run(handler)
+
+        assert calls == [(None, 0), (None, 1)]
+        assert scheduler.retries == 1
+        assert scheduler.gave_up == []
@@ -0,0 +1,89 @@
+import os
+
+from src.performance_parser import extract_performance_data
+from src.refresh import plan_refresh, reuse_snapshots
+from src.snapshot_store import (
+    SnapshotStore,
+    load_manifest,
+    load_page,
+    pack_downloads,
+    save_page_snapshot,
+)
+
+EXAMPLE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'example')
+
+
+def read_example(*parts):
+    with open(os.path.join(EXAMPLE_DIR, *parts), encoding='utf-8') as f:
+        return f.read()
+
+
+def count_blobs(store_root):
+    return sum(len(files) for _, _, files in os.walk(os.path.join(store_root, 'objects')))
+
+
+class TestSnapshotStore:
+    """Test cases for the compressed, content-addressed page store."""
+
+    def test_pages_differing_only_in_angular_ids_are_stored_once(self, tmp_path):
+        profile = read_example('portfolio', 'person-url-1.txt')
+        rebuilt = profile.replace('_ngcontent-ng-c1273128201', '_ngcontent-ng-c999')
+        monday = str(tmp_path / 'alice' / '2026-02-23')
+        tuesday = str(tmp_path / 'alice' / '2026-02-24')
+
+        save_page_snapshot(monday, 'profile', profile)
+        save_page_snapshot(tuesday, 'profile', rebuilt)
+
+        store_root = str(tmp_path / '.snapshots')
+        assert count_blobs(store_root) == 1
+        assert not os.path.exists(os.path.join(monday, 'profile.html'))
+        entry = load_manifest(tuesday)['pages']['profile']
+        assert entry['stored_size'] < entry['size'] / 3
+
+    def test_stored_page_parses_like_the_original(self, tmp_path):
+        profile = read_example('portfolio', 'person-url-1.txt')
+        download_dir = str(tmp_path / 'alice' / '2026-02-23')
+
+        save_page_snapshot(download_dir, 'profile', profile)
+
+        assert extract_performance_data(load_page(download_dir, 'profile')) == extract_performance_data(profile)
+
+    def test_missing_page(self, tmp_path):
+        assert load_page(str(tmp_path), 'stats') is None
+
+    def test_plain_gzip_codec_round_trip(self, tmp_path):
+        store = SnapshotStore(str(tmp_path), codec='gzip')
+        entry = store.put('<html>hello</html>')
+
+        assert entry['codec'] == 'gzip'
+        assert store.get(entry['sha256']) == '<html>hello</html>'
+
+
+def test_pack_downloads_moves_html_into_store(tmp_path):
+    stats = read_example('portfolio', 'person-url-statts.txt')
+    for date in ('2026-02-23', '2026-02-24'):
+        folder = tmp_path / 'alice' / date
+        folder.mkdir(parents=True)
+        (folder / 'stats.html').write_text(stats, encoding='utf-8')
+
+    packed, before, stored = pack_downloads(str(tmp_path))
+
+    assert packed == 2
+    assert stored < before / 10
+    for date in ('2026-02-23', '2026-02-24'):
+        folder = str(tmp_path / 'alice' / date)
+        assert not os.path.exists(os.path.join(folder, 'stats.html'))
+        assert 'compare-user-performance-value' in load_page(folder, 'stats')
+
+
+def test_refresh_reuses_stored_snapshot_without_copying(tmp_path):
+    yesterday = str(tmp_path / 'alice' / '2026-02-23')
+    today = str(tmp_path / 'alice' / '2026-02-24')
+    save_page_snapshot(yesterday, 'portfolio', '<html>portfolio</html>')
+    os.makedirs(today)
+
+    results = reuse_snapshots(plan_refresh(today, pages=['portfolio']), today)
+
+    assert results['portfolio']['source'] == 'cache'
+    assert load_page(today, 'portfolio') == '<html>portfolio</html>'
+    assert count_blobs(str(tmp_path / '.snapshots')) == 1
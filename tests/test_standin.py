@@ -0,0 +1,70 @@
+import os
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from conftest import requires_browser
+from src.standin import StandinServer, fixture_routes
+
+
+def fetch(url):
+    with urllib.request.urlopen(url, timeout=10) as response:
+        return response.read().decode('utf-8')
+
+
+class TestStandinServer:
+    """Test cases for the local eToro stand-in server."""
+
+    def test_serves_fixture_pages(self):
+        with StandinServer(fixture_routes('someone')) as server:
+            profile = fetch(f'{server.base_url}/people/someone')
+            stats = fetch(f'{server.base_url}/people/someone/stats')
+
+        assert 'automation-id="user-stats-chart-container"' in profile
+        assert 'automation-id="compare-user-performance-value"' in stats
+        assert server.requests == ['/people/someone', '/people/someone/stats']
+
+    def test_unknown_path_is_404(self):
+        with StandinServer() as server:
+            with pytest.raises(urllib.error.HTTPError) as exc_info:
+                fetch(f'{server.base_url}/people/nobody')
+
+        assert exc_info.value.code == 404
+
+    def test_delayed_pages_are_served_concurrently(self):
+        delays = {'profile': 0.3, 'stats': 0.3, 'portfolio': 0.3, 'chart': 0.3}
+        with StandinServer(fixture_routes('someone', delays)) as server:
+            urls = [f'{server.base_url}/people/someone{suffix}'
+                    for suffix in ('', '/stats', '/portfolio', '/chart')]
+            started = time.monotonic()
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                pages = list(executor.map(fetch, urls))
+            elapsed = time.monotonic() - started
+
+        assert len(pages) == 4
+        assert elapsed < 1.0
+
+
+@requires_browser
+def test_parallel_tabs_take_about_as_long_as_the_slowest_page(tmp_path):
+    from src.downloader import create_driver, download_person_data
+
+    delays = {'profile': 1.0, 'stats': 1.0, 'portfolio': 1.0, 'chart': 1.0}
+    driver = create_driver()
+    try:
+        with StandinServer(fixture_routes('someone', delays)) as server:
+            started = time.monotonic()
+            results = download_person_data('someone', str(tmp_path), driver=driver, parallel_tabs=True,
+                                           base_url=server.base_url, quiet_period=0.2)
+            elapsed = time.monotonic() - started
+    finally:
+        driver.quit()
+
+    assert all(result['status'] == 'ok' for result in results.values())
+    for page_type in results:
+        assert os.path.exists(tmp_path / f'{page_type}.html')
+    # Sequential loading would need at least the sum of the delays.
+    assert elapsed < sum(delays.values()) - 1
@@ -0,0 +1,152 @@
+import json
+import os
+import threading
+
+from src import strategy_cache
+from src.stats_parser import extract_stats_data
+from src.strategy_cache import StrategyCache, get_strategy_cache, run_strategies
+
+EXAMPLE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'example')
+
+
+def names(pairs):
+    return [name for name, _ in pairs]
+
+
+class TestStrategyCache:
+    """Test cases for the self-tuning strategy hit-rate cache."""
+
+    def test_fresh_cache_keeps_declared_order(self):
+        cache = StrategyCache()
+
+        assert names(cache.order('f', [('a', None), ('b', None), ('c', None)])) == ['a', 'b', 'c']
+
+    def test_winning_strategy_is_tried_first(self):
+        cache = StrategyCache()
+        calls = []
+        strategies = [('old', lambda: calls.append('old')), ('new', lambda: calls.append('new') or 'value')]
+
+        assert run_strategies('f', strategies, cache) == 'value'
+        assert calls == ['old', 'new']
+
+        calls.clear()
+        assert run_strategies('f', strategies, cache) == 'value'
+        assert calls == ['new']
+
+    def test_all_strategies_missing(self):
+        cache = StrategyCache()
+
+        assert run_strategies('f', [('a', lambda: None), ('b', lambda: {})], cache) is None
+        assert cache.stats() == {'f': {'a': {'hits': 0, 'misses': 1, 'hit_rate': 0.0},
+                                       'b': {'hits': 0, 'misses': 1, 'hit_rate': 0.0}}}
+
+    def test_save_merges_with_other_processes(self, tmp_path):
+        path = str(tmp_path / 'strategies.json')
+        first, second = StrategyCache(path), StrategyCache(path)
+        first.record('f', 'a', True)
+        second.record('f', 'a', False)
+        second.record('f', 'b', True)
+
+        first.save()
+        second.save()
+
+        assert StrategyCache(path).stats()['f'] == {'a': {'hits': 1, 'misses': 1, 'hit_rate': 0.5},
+                                                    'b': {'hits': 1, 'misses': 0, 'hit_rate': 1.0}}
+        # Saving again adds nothing twice.
+        second.save()
+        with open(path, encoding='utf-8') as f:
+            assert json.load(f)['fields']['f']['a'] == {'hits': 1, 'misses': 1}
+
+    def test_concurrent_saves_lose_nothing(self, tmp_path):
+        path = str(tmp_path / 'strategies.json')
+
+        def record_and_save():
+            for _ in range(20):
+                cache = StrategyCache(path)
+                cache.record('f', 'a', True)
+                cache.save()
+
+        threads = [threading.Thread(target=record_and_save) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert StrategyCache(path).stats()['f']['a']['hits'] == 80
+
+    def test_worker_counts_are_merged_into_the_parent(self, tmp_path):
+        worker, parent = StrategyCache(), StrategyCache(str(tmp_path / 'strategies.json'))
+        worker.record('f', 'a', True)
+        worker.record('f', 'b', False)
+
+        parent.merge(worker.take_unsaved())
+        parent.save()
+
+        assert worker.take_unsaved() == {}
+        assert StrategyCache(parent.path).stats()['f'] == {'a': {'hits': 1, 'misses': 0, 'hit_rate': 1.0},
+                                                           'b': {'hits': 0, 'misses': 1, 'hit_rate': 0.0}}
+
+    def test_reset(self, tmp_path):
+        path = tmp_path / 'strategies.json'
+        cache = StrategyCache(str(path))
+        cache.record('f', 'a', True)
+        cache.save()
+
+        cache.reset()
+
+        assert cache.stats() == {}
+        assert not path.exists()
+
+    def test_corrupt_file_is_ignored(self, tmp_path):
+        path = tmp_path / 'strategies.json'
+        path.write_text('{not json', encoding='utf-8')
+
+        assert StrategyCache(str(path)).stats() == {}
+
+    def test_default_cache_lives_in_cache_dir(self, tmp_path, monkeypatch):
+        monkeypatch.setenv('ETOROHELPER_CACHE_DIR', str(tmp_path))
+        monkeypatch.setattr(strategy_cache, '_default', None)
+
+        assert get_strategy_cache().path == str(tmp_path / 'strategy_cache.json')
+        assert get_strategy_cache() is get_strategy_cache()
+
+
+def test_stats_extraction_records_strategies():
+    with open(os.path.join(EXAMPLE_DIR, 'portfolio', 'person-url-statts.txt'), encoding='utf-8') as f:
+        html = f.read()
+
+    first = extract_stats_data(html)
+
+    stats = get_strategy_cache().stats()
+    assert 'stats.copiers' in stats and 'stats.asset_allocation' in stats
+    # What was learned on the first page doesn't change what is extracted from it.
+    assert extract_stats_data(html) == first
+
+
+def test_allocation_fallback_does_not_take_over_container_pages():
+    without_container = '<html><body><div><div><span>Stocks</span> 40%</div></div></body></html>'
+    with_container = ('<html><body><div automation-id="stats-portfolio-allocation-container">'
+                      '<div class="bar"><span class="name">Stocks</span><span class="value">50%</span></div>'
+                      '<div class="bar"><span class="name">Bonds</span><span class="value">3%</span></div>'
+                      '</div></body></html>')
+
+    assert extract_stats_data(without_container)['asset_allocation'] == {'Stocks': '40%'}
+    assert extract_stats_data(with_container)['asset_allocation'] == {'Stocks': '50%', 'Bonds': '3%'}
+
+
+def test_allocation_labels_are_searched_when_the_container_is_empty():
+    html = ('<html><body><div automation-id="stats-portfolio-allocation-container"><p>loading</p></div>'
+            '<div><span>Stocks</span> 45.5%</div></body></html>')
+
+    assert extract_stats_data(html)['asset_allocation'] == {'Stocks': '45.5%'}
+
+
+def test_unordered_strategies_keep_declared_order():
+    cache = StrategyCache()
+    cache.record('f', 'b', True)
+    cache.record('f', 'a', False)
+    calls = []
+    strategies = [('a', lambda: calls.append('a')), ('b', lambda: calls.append('b') or 'value')]
+
+    assert run_strategies('f', strategies, cache, reorder=False) == 'value'
+    assert calls == ['a', 'b']